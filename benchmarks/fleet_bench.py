@@ -0,0 +1,247 @@
+"""End-to-end fleet benchmark: drive ``scatter run`` against a simulated fleet.
+
+A ``benchmarks.simfleet`` server process serves ``--hosts`` loopback SSH hosts.
+For each ``--limit`` value, ``python -m scatter run`` is launched against an
+inventory of those hosts and measured as a whole:
+
+- ``hosts_per_sec``: hosts completed over the run's wall-clock time.
+- ``p50_ms``/``p95_ms``/``p99_ms``: per-host durations from the run's
+  ``--log-file`` (as scatter records them, so queue time behind ``--limit``
+  is included).
+- ``peak_rss_mib``: peak resident memory of the scatter process.
+- ``cpu_ms_per_host``: user+system CPU of the scatter process per host.
+
+The simulated fleet runs in its own process so its cost is not counted.
+
+Usage::
+
+    python -m benchmarks.fleet_bench --hosts 500 --limit 50 --limit 200 \\
+        --latency 0.05 --output-bytes 4096 --save-baseline bench.json
+    python -m benchmarks.fleet_bench ... --compare bench.json --tolerance 0.2
+
+``--compare`` exits 1 when any metric is worse than the baseline by more than
+the tolerance (a fraction; ``0.2`` allows 20%).
+
+Faults from ``benchmarks.simfleet`` (``--fault reset=0.05 --seed 7``) show how
+``--connect-timeout``, ``--command-timeout`` and ``--retry-attempts`` shape
+total run time and tail latency; those options are passed through to scatter.
+Failed hosts are expected then, and reported per error type.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+# Metric name -> True when larger is better
+METRICS: Dict[str, bool] = {
+    "hosts_per_sec": True,
+    "p50_ms": False,
+    "p95_ms": False,
+    "p99_ms": False,
+    "peak_rss_mib": False,
+    "cpu_ms_per_host": False,
+}
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """Nearest-rank percentile of ``values`` (``q`` in 0..100)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * q // 100))
+    return ordered[int(rank) - 1]
+
+
+def start_fleet_process(args: argparse.Namespace) -> tuple[subprocess.Popen, List[List[Any]]]:
+    """Launch ``benchmarks.simfleet`` and wait for its READY line."""
+    cmd = [
+        sys.executable, "-m", "benchmarks.simfleet",
+        "--hosts", str(args.hosts),
+        "--latency", str(args.latency),
+        "--output-bytes", str(args.output_bytes),
+        "--handshake", str(args.handshake),
+    ]
+    if args.ports:
+        cmd.append("--ports")
+    for fault in args.fault:
+        cmd.extend(["--fault", fault])
+    cmd.extend(["--seed", str(args.seed), "--fault-attempts", str(args.fault_attempts), "--stall", str(args.stall)])
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, text=True, cwd=_project_root())
+    assert proc.stdout is not None
+    line = proc.stdout.readline()
+    if not line.startswith("READY "):
+        proc.kill()
+        raise RuntimeError(f"simulated fleet failed to start: {line.strip() or 'no output'}")
+    return proc, json.loads(line[len("READY "):])["targets"]
+
+
+def write_inventory(path: Path, targets: List[List[Any]]) -> None:
+    lines = ["defaults:", "  username: bench", "  password: bench", "  known_hosts: off", "hosts:"]
+    lines.extend(f"  - {{host: '{host}', port: {port}}}" for host, port in targets)
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def _project_root() -> str:
+    return str(Path(__file__).resolve().parent.parent)
+
+
+def _wait_rusage(proc: subprocess.Popen) -> tuple[int, Optional[float], Optional[float]]:
+    """Wait for ``proc``; return (exit status, peak RSS MiB, CPU seconds)."""
+    if not hasattr(os, "wait4"):  # Windows: no per-child rusage
+        return proc.wait(), None, None
+    _, status, usage = os.wait4(proc.pid, 0)
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss = usage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    return proc.returncode, rss, usage.ru_utime + usage.ru_stime
+
+
+def run_scenario(
+    inventory: Path, limit: int, command: str, workdir: Path, scatter_args: Sequence[str] = ()
+) -> Dict[str, Any]:
+    """Run scatter once at ``limit`` and return its metrics."""
+    log_file = workdir / f"limit-{limit}.jsonl"
+    cmd = [
+        sys.executable, "-m", "scatter", "run", command,
+        "--inventory", str(inventory),
+        "--limit", str(limit),
+        "--quiet", "--no-progress", "--no-inventory-cache",
+        "--log-file", str(log_file),
+        *scatter_args,
+    ]
+    started = time.perf_counter()
+    proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, cwd=_project_root())
+    code, rss, cpu = _wait_rusage(proc)
+    wall = time.perf_counter() - started
+
+    durations: List[float] = []
+    errors: Dict[str, int] = {}
+    with log_file.open(encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            durations.append(float(record.get("duration_sec") or 0.0) * 1000)
+            if not record.get("ok"):
+                kind = (record.get("error") or f"exit {record.get('exit_status')}").split(":")[0]
+                errors[kind] = errors.get(kind, 0) + 1
+    hosts = len(durations)
+    return {
+        "limit": limit,
+        "hosts": hosts,
+        "failed": sum(errors.values()),
+        "errors": errors,
+        "exit_code": code,
+        "wall_sec": round(wall, 3),
+        "hosts_per_sec": round(hosts / wall, 1) if wall else 0.0,
+        "p50_ms": round(percentile(durations, 50), 1),
+        "p95_ms": round(percentile(durations, 95), 1),
+        "p99_ms": round(percentile(durations, 99), 1),
+        "peak_rss_mib": round(rss, 1) if rss is not None else None,
+        "cpu_ms_per_host": round(cpu * 1000 / hosts, 2) if cpu is not None and hosts else None,
+    }
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Regressions of ``results`` against ``baseline`` beyond ``tolerance``."""
+    previous = {s["limit"]: s for s in baseline.get("scenarios", [])}
+    problems: List[str] = []
+    for scenario in results["scenarios"]:
+        base = previous.get(scenario["limit"])
+        if base is None:
+            continue
+        for metric, higher_is_better in METRICS.items():
+            new, old = scenario.get(metric), base.get(metric)
+            if new is None or not old:
+                continue
+            change = (new - old) / old
+            if (-change if higher_is_better else change) > tolerance:
+                problems.append(f"limit={scenario['limit']} {metric}: {old} -> {new} ({change:+.0%})")
+    return problems
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark scatter against a simulated SSH fleet")
+    parser.add_argument("--hosts", type=int, default=200, help="Simulated hosts")
+    parser.add_argument("--limit", type=int, action="append", help="--limit value to run (repeatable; default 50)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Command run time on each host (seconds)")
+    parser.add_argument("--output-bytes", type=int, default=64, help="Stdout bytes per host")
+    parser.add_argument("--handshake", type=float, default=0.0, help="Extra auth delay per connection (seconds)")
+    parser.add_argument("--ports", action="store_true", help="One port per host on 127.0.0.1 (e.g. macOS)")
+    parser.add_argument("--fault", action="append", default=[], help="Simulated fault kind=rate (repeatable)")
+    parser.add_argument("--seed", type=int, default=0, help="Fault schedule seed")
+    parser.add_argument(
+        "--fault-attempts", type=int, default=0, help="Connections per host affected by connection faults (0: all)"
+    )
+    parser.add_argument("--stall", type=float, default=3600.0, help="Seconds a stalled command hangs")
+    parser.add_argument("--connect-timeout", type=float, help="Passed to scatter run")
+    parser.add_argument("--command-timeout", type=float, help="Passed to scatter run")
+    parser.add_argument("--retry-attempts", type=int, help="Passed to scatter run")
+    parser.add_argument("--command", default="true", help="Command passed to scatter run")
+    parser.add_argument("--save-baseline", type=Path, help="Write results to this JSON file")
+    parser.add_argument("--compare", type=Path, help="Compare against a baseline JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed regression fraction for --compare")
+    args = parser.parse_args(argv)
+
+    results: Dict[str, Any] = {
+        "config": {
+            "hosts": args.hosts,
+            "latency": args.latency,
+            "output_bytes": args.output_bytes,
+            "handshake": args.handshake,
+            "command": args.command,
+            "faults": args.fault,
+            "seed": args.seed,
+            "fault_attempts": args.fault_attempts,
+            "connect_timeout": args.connect_timeout,
+            "command_timeout": args.command_timeout,
+            "retry_attempts": args.retry_attempts,
+        },
+        "platform": {"python": platform.python_version(), "system": platform.system(), "cpus": os.cpu_count()},
+        "scenarios": [],
+    }
+    scatter_args: List[str] = []
+    for option in ("connect_timeout", "command_timeout", "retry_attempts"):
+        value = getattr(args, option)
+        if value is not None:
+            scatter_args.extend([f"--{option.replace('_', '-')}", str(value)])
+    fleet, targets = start_fleet_process(args)
+    try:
+        with tempfile.TemporaryDirectory(prefix="scatter-bench-") as tmp:
+            workdir = Path(tmp)
+            inventory = workdir / "inventory.yaml"
+            write_inventory(inventory, targets)
+            for limit in args.limit or [50]:
+                scenario = run_scenario(inventory, limit, args.command, workdir, scatter_args)
+                results["scenarios"].append(scenario)
+                print(
+                    f"limit={limit:<5} {scenario['hosts_per_sec']:>8} hosts/s  "
+                    f"p50={scenario['p50_ms']}ms p95={scenario['p95_ms']}ms p99={scenario['p99_ms']}ms  "
+                    f"rss={scenario['peak_rss_mib']}MiB cpu/host={scenario['cpu_ms_per_host']}ms  "
+                    f"failed={scenario['failed']} {scenario['errors'] or ''}"
+                )
+    finally:
+        fleet.terminate()
+        fleet.wait()
+
+    if args.save_baseline:
+        args.save_baseline.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+    if args.compare:
+        problems = compare(results, json.loads(args.compare.read_text(encoding="utf-8")), args.tolerance)
+        for problem in problems:
+            print(f"REGRESSION {problem}")
+        if problems:
+            return 1
+    # Failures are the point of a fault run; otherwise they mean the harness is broken
+    return 1 if not args.fault and any(s["failed"] for s in results["scenarios"]) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,263 @@
+"""Memory footprint per host and per output byte, with budgets.
+
+Each stage is measured with ``tracemalloc`` (bytes allocated by Python code)
+while a background thread samples the process RSS (what the OS sees,
+including allocator slack and C extensions):
+
+- ``inventory``: retained by ``load_inventory`` for an N-host YAML file.
+- ``host_specs``: retained by the per-host ``(host, command, ExecOptions)``
+  list that ``scatter run`` builds.
+- ``results``: retained by N ``ExecResult`` objects with ``--output-bytes`` of
+  stdout each; ``results_overhead`` is the part not accounted for by the
+  output text itself.
+- ``run``: peak during a whole in-process ``scatter run`` (inventory, specs,
+  execution with a stub transport, the ``--log-file`` sink and the results
+  table). Rendering a table for more than ``--render-max-hosts`` hosts takes
+  minutes, so larger runs use ``--quiet`` and skip it.
+
+Figures are bytes per host. A stage over its budget fails the run::
+
+    python -m benchmarks.memory_bench --hosts 1000 --hosts 10000 --hosts 100000
+    python -m benchmarks.memory_bench --hosts 10000 --budget run=20000 --json mem.json
+
+The same check runs at 1k hosts in the test suite
+(``tests/test_memory_budget.py``).
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+# Bytes per host. Roughly 2x what 10k-100k hosts measure, so growth fails loudly
+# while allocator and Python-version noise does not.
+DEFAULT_BUDGETS: Dict[str, float] = {
+    "inventory": 600,
+    "host_specs": 200,
+    "results_overhead": 400,
+    "run": 12000,
+}
+
+
+def _rss_bytes() -> Optional[int]:
+    """Current resident set size, or ``None`` where ``/proc`` is unavailable."""
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class RssSampler:
+    """Record the peak RSS seen by a background thread while active."""
+
+    def __init__(self, interval: float = 0.005) -> None:
+        self.interval = interval
+        self.start_rss: Optional[int] = None
+        self.peak: Optional[int] = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def _sample(self) -> None:
+        while True:
+            rss = _rss_bytes()
+            if rss is not None and (self.peak is None or rss > self.peak):
+                self.peak = rss
+            if self._stop.wait(self.interval):
+                return
+
+    def __enter__(self) -> "RssSampler":
+        self.start_rss = _rss_bytes()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    @property
+    def growth(self) -> Optional[int]:
+        if self.start_rss is None or self.peak is None:
+            return None
+        return self.peak - self.start_rss
+
+
+@contextmanager
+def measure(stage: Dict[str, Any]) -> Iterator[None]:
+    """Fill ``stage`` with retained/peak tracemalloc bytes and RSS growth for the block."""
+    gc.collect()
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    before = tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+    with RssSampler() as rss:
+        yield
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    stage["retained"] = current - before
+    stage["peak"] = peak - before
+    stage["rss_growth"] = rss.growth
+    stage["seconds"] = round(time.perf_counter() - started, 3)
+
+
+def write_inventory(path: Path, hosts: int) -> None:
+    """A representative inventory: distinct names, a few tags, some per-host overrides."""
+    with path.open("w", encoding="utf-8") as f:
+        f.write("defaults:\n  username: deploy\n  known_hosts: off\nhosts:\n")
+        for i in range(hosts):
+            extra = f", port: {2200 + i % 4}" if i % 10 == 0 else ""
+            f.write(f"  - {{host: node{i:06d}.dc{i % 3}.example.com, tags: [dc{i % 3}, role{i % 8}]{extra}}}\n")
+
+
+def _payload(host: str, size: int) -> str:
+    # Distinct per host, as real outputs are
+    line = (host + " " + "x" * 62)[:63] + "\n"
+    return (line * (size // 64 + 1))[:size]
+
+
+def _stub_run_on_host(output_bytes: int) -> Callable[..., Any]:
+    from scatter.models import ExecResult
+
+    async def run_on_host(host: str, command: str, options: Any, semaphore: asyncio.Semaphore) -> ExecResult:
+        async with semaphore:
+            now = time.perf_counter()
+            return ExecResult(host, 0, _payload(host, output_bytes), "", True, now, now)
+
+    return run_on_host
+
+
+def _run_cli(inventory: Path, workdir: Path, output_bytes: int, render: bool = True) -> None:
+    import scatter.ssh
+    from rich.console import Console
+
+    from scatter import cli
+
+    saved = scatter.ssh.run_on_host, cli.console
+    scatter.ssh.run_on_host = _stub_run_on_host(output_bytes)
+    with open(os.devnull, "w", encoding="utf-8") as devnull:
+        cli.console = Console(file=devnull, width=200)
+        try:
+            cli.app(
+                [
+                    "run", "true",
+                    "--inventory", str(inventory),
+                    "--no-inventory-cache", "--no-progress",
+                    "--limit", "200",
+                    "--log-file", str(workdir / "run.jsonl"),
+                    *([] if render else ["--quiet"]),
+                ],
+                standalone_mode=False,
+            )
+        finally:
+            scatter.ssh.run_on_host, cli.console = saved
+
+
+def measure_hosts(hosts: int, output_bytes: int, render: bool = True) -> Dict[str, Dict[str, Any]]:
+    """Measure every stage at ``hosts`` hosts."""
+    from dataclasses import replace
+
+    from scatter.cli import _HostSpecBuilder
+    from scatter.config import load_inventory
+    from scatter.models import ExecOptions, ExecResult
+
+    stages: Dict[str, Dict[str, Any]] = {name: {} for name in ("inventory", "host_specs", "results", "run")}
+    with tempfile.TemporaryDirectory(prefix="scatter-mem-") as tmp:
+        workdir = Path(tmp)
+        inventory = workdir / "inventory.yaml"
+        write_inventory(inventory, hosts)
+
+        with measure(stages["inventory"]):
+            inv = load_inventory(inventory)
+
+        base = ExecOptions(
+            username="deploy", port=None, identity=None, password=None,
+            known_hosts="off", connect_timeout=10.0, pty=False, limit=50,
+        )
+        with measure(stages["host_specs"]):
+            specs = _HostSpecBuilder(replace(base))
+            host_specs = [(h.host, h.command or "true", specs.options(h)) for h in inv.hosts]
+
+        with measure(stages["results"]):
+            now = time.perf_counter()
+            results = [ExecResult(h, 0, _payload(h, output_bytes), "", True, now, now) for h, _, _ in host_specs]
+        del inv, host_specs, results
+
+        # Warm up so one-time imports and caches are not charged to the measured run
+        warmup = workdir / "warmup.yaml"
+        write_inventory(warmup, 10)
+        _run_cli(warmup, workdir, output_bytes, render)
+        with measure(stages["run"]):
+            _run_cli(inventory, workdir, output_bytes, render)
+        stages["run"]["rendered"] = render
+
+    for stage in stages.values():
+        stage["per_host"] = round(stage["peak" if stage is stages["run"] else "retained"] / hosts, 1)
+        if stage["rss_growth"] is not None:
+            stage["rss_per_host"] = round(stage["rss_growth"] / hosts, 1)
+    results_stage = stages["results"]
+    results_stage["per_output_byte"] = round(results_stage["retained"] / (hosts * output_bytes), 3) if output_bytes else None
+    stages["results_overhead"] = {"per_host": round(results_stage["per_host"] - output_bytes, 1)}
+    return stages
+
+
+def check_budgets(report: Dict[int, Dict[str, Dict[str, Any]]], budgets: Dict[str, float]) -> List[str]:
+    """Stages whose bytes per host exceed their budget."""
+    problems: List[str] = []
+    for hosts, stages in report.items():
+        for name, budget in budgets.items():
+            value = stages.get(name, {}).get("per_host")
+            if value is not None and value > budget:
+                problems.append(f"{hosts} hosts: {name} uses {value:.0f} B/host (budget {budget:.0f})")
+    return problems
+
+
+def _parse_budget(spec: str) -> tuple[str, float]:
+    name, sep, value = spec.partition("=")
+    if not sep or name not in DEFAULT_BUDGETS:
+        raise argparse.ArgumentTypeError(f"expected one of {', '.join(DEFAULT_BUDGETS)} as stage=bytes")
+    return name, float(value)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure scatter's memory use per host against budgets")
+    parser.add_argument("--hosts", type=int, action="append", help="Fleet size (repeatable; default 1k, 10k, 100k)")
+    parser.add_argument("--output-bytes", type=int, default=256, help="Stdout bytes per simulated host")
+    parser.add_argument(
+        "--render-max-hosts", type=int, default=10_000, help="Largest fleet whose run stage renders the results table"
+    )
+    parser.add_argument("--budget", type=_parse_budget, action="append", default=[], help="stage=bytes per host")
+    parser.add_argument("--json", type=Path, help="Write the full report to this file")
+    args = parser.parse_args(argv)
+    budgets = {**DEFAULT_BUDGETS, **dict(args.budget)}
+
+    report: Dict[int, Dict[str, Dict[str, Any]]] = {}
+    for hosts in args.hosts or [1_000, 10_000, 100_000]:
+        report[hosts] = stages = measure_hosts(hosts, args.output_bytes, render=hosts <= args.render_max_hosts)
+        print(f"{hosts} hosts:")
+        for name, stage in stages.items():
+            rss = f"  rss {stage['rss_per_host']:>8.0f} B/host" if stage.get("rss_per_host") is not None else ""
+            budget = f"  (budget {budgets[name]:.0f})" if name in budgets else ""
+            print(f"  {name:<17} {stage['per_host']:>8.0f} B/host{rss}{budget}")
+
+    if args.json:
+        args.json.write_text(json.dumps({"budgets": budgets, "hosts": report}, indent=2) + "\n", encoding="utf-8")
+    problems = check_budgets(report, budgets)
+    for problem in problems:
+        print(f"OVER BUDGET {problem}")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
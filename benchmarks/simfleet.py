@@ -0,0 +1,306 @@
+"""Simulated SSH fleet: many local asyncssh servers with tunable costs.
+
+Every simulated host is an asyncssh listener on its own loopback address
+(``127.0.1.1``, ``127.0.1.2``, ... sharing one port) so scatter sees distinct
+host names exactly as in a real fleet. Platforms without the full ``127/8``
+loopback range (macOS) use ``--ports`` mode instead: one address, one port per
+host.
+
+Knobs (per fleet)
+- ``latency``: seconds each command runs before exiting.
+- ``output_bytes``: size of each command's stdout.
+- ``handshake``: extra seconds spent in password authentication, standing in
+  for slow key exchange or PAM.
+
+Any password is accepted and any command succeeds; stdout is ``output_bytes``
+of filler.
+
+Faults
+``faults`` maps a fault kind to the fraction of hosts that get it. Hosts are
+assigned from a ``random.Random(seed)`` schedule, so a seed reproduces the same
+bad day. Connection faults hit the first ``fault_attempts`` connections to a
+host (``0``: every connection), which lets retries recover from transient ones.
+
+- ``blackhole``: accept the TCP connection and never answer, as when SYNs or
+  replies are silently dropped; only ``connect_timeout`` ends it.
+- ``reset``: reset the connection before the SSH banner, like sshd refusing
+  connections over ``MaxStartups``.
+- ``drop``: send the banner, then close mid key exchange.
+- ``stall``: write half the output, then hang for ``stall`` seconds; only
+  ``command_timeout`` ends it.
+- ``huge``: write ``huge_bytes`` of output instead of ``output_bytes``.
+
+Run standalone to serve a fleet for manual experiments::
+
+    python -m benchmarks.simfleet --hosts 200 --latency 0.05 --output-bytes 4096 \\
+        --fault reset=0.05 --fault blackhole=0.01 --seed 7
+
+It prints one ``READY <json>`` line with the host list and port once
+listening, then serves until interrupted.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import socket
+import struct
+import sys
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import asyncssh
+
+FAULTS = ("blackhole", "reset", "drop", "stall", "huge")
+_CONNECTION_FAULTS = ("blackhole", "reset", "drop")
+
+
+@dataclass
+class FleetConfig:
+    hosts: int = 10
+    latency: float = 0.0
+    output_bytes: int = 64
+    handshake: float = 0.0
+    port: int = 0
+    ports: bool = False  # one port per host on 127.0.0.1 instead of one address per host
+    # fault kind -> fraction of hosts
+    faults: Dict[str, float] = field(default_factory=dict)
+    seed: int = 0
+    fault_attempts: int = 0
+    stall: float = 3600.0
+    huge_bytes: int = 16 * 1024 * 1024
+
+
+@dataclass
+class Fleet:
+    """A running simulated fleet."""
+    config: FleetConfig
+    # (host, port) per simulated host
+    targets: List[Tuple[str, int]] = field(default_factory=list)
+    # fault kind (or None) per simulated host
+    schedule: List[Optional[str]] = field(default_factory=list)
+    # connections accepted per simulated host
+    attempts: List[int] = field(default_factory=list)
+    _listeners: List[socket.socket] = field(default_factory=list, repr=False)
+    _tasks: Set["asyncio.Task[Any]"] = field(default_factory=set, repr=False)
+    _held: List[socket.socket] = field(default_factory=list, repr=False)
+
+    def close(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        for sock in self._listeners + self._held:
+            sock.close()
+
+    async def wait_closed(self) -> None:
+        self.close()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+
+def loopback_address(i: int) -> str:
+    """The ``i``-th simulated host address, avoiding ``127.0.0.1`` and ``.0``/``.255``."""
+    return f"127.{1 + i // 64516}.{(i // 254) % 254 + 1}.{i % 254 + 1}"
+
+
+def fault_schedule(hosts: int, faults: Dict[str, float], seed: int = 0) -> List[Optional[str]]:
+    """Assign at most one fault per host; each kind gets ``round(rate * hosts)`` hosts."""
+    unknown = set(faults) - set(FAULTS)
+    if unknown:
+        raise ValueError(f"Unknown fault kind(s): {', '.join(sorted(unknown))}")
+    schedule: List[Optional[str]] = [None] * hosts
+    free = list(range(hosts))
+    random.Random(seed).shuffle(free)
+    for kind in FAULTS:
+        for _ in range(min(round(faults.get(kind, 0.0) * hosts), len(free))):
+            schedule[free.pop()] = kind
+    return schedule
+
+
+def _listen(address: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((address, port))
+    sock.listen(1024)
+    sock.setblocking(False)
+    return sock
+
+
+class _Server(asyncssh.SSHServer):
+    def __init__(self, config: FleetConfig) -> None:
+        self._config = config
+
+    def begin_auth(self, username: str) -> bool:
+        return True
+
+    def password_auth_supported(self) -> bool:
+        return True
+
+    async def validate_password(self, username: str, password: str) -> bool:
+        if self._config.handshake:
+            await asyncio.sleep(self._config.handshake)
+        return True
+
+
+def _filler(size: int) -> str:
+    return ("x" * 63 + "\n") * (size // 64) + "x" * (size % 64)
+
+
+def _process_factory(config: FleetConfig, fault: Optional[str]):
+    payload = _filler(config.huge_bytes if fault == "huge" else config.output_bytes)
+
+    async def handle(process: asyncssh.SSHServerProcess) -> None:
+        if config.latency:
+            await asyncio.sleep(config.latency)
+        if fault == "stall":
+            process.stdout.write(payload[: len(payload) // 2])
+            await asyncio.sleep(config.stall)
+        process.stdout.write(payload)
+        process.exit(0)
+
+    return handle
+
+
+async def _inject(fleet: Fleet, sock: socket.socket, fault: str) -> None:
+    loop = asyncio.get_running_loop()
+    if fault == "blackhole":
+        # Keep the socket open without ever reading or writing
+        fleet._held.append(sock)
+        return
+    try:
+        if fault == "drop":
+            await loop.sock_sendall(sock, b"SSH-2.0-OpenSSH_9.6 simfleet\r\n")
+            await loop.sock_recv(sock, 4096)
+        else:  # reset: abortive close sends RST instead of FIN
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+    except OSError:
+        pass
+    finally:
+        sock.close()
+
+
+async def _serve(fleet: Fleet, index: int, listener: socket.socket, key: asyncssh.SSHKey) -> None:
+    config = fleet.config
+    fault = fleet.schedule[index]
+    options = asyncssh.SSHServerConnectionOptions(
+        server_factory=lambda: _Server(config),
+        server_host_keys=[key],
+        process_factory=_process_factory(config, fault),
+    )
+    loop = asyncio.get_running_loop()
+    while True:
+        sock, _ = await loop.sock_accept(listener)
+        fleet.attempts[index] += 1
+        attempt = fleet.attempts[index]
+        if fault in _CONNECTION_FAULTS and (not config.fault_attempts or attempt <= config.fault_attempts):
+            coro = _inject(fleet, sock, fault)
+        else:
+            coro = _run_ssh(sock, options)
+        task = asyncio.ensure_future(coro)
+        fleet._tasks.add(task)
+        task.add_done_callback(fleet._tasks.discard)
+
+
+async def _run_ssh(sock: socket.socket, options: asyncssh.SSHServerConnectionOptions) -> None:
+    try:
+        conn = await asyncssh.run_server(sock, options=options)
+    except (OSError, asyncssh.Error):
+        sock.close()
+        return
+    try:
+        await conn.wait_closed()
+    finally:
+        conn.close()
+
+
+async def start_fleet(config: FleetConfig, host_key: Optional[asyncssh.SSHKey] = None) -> Fleet:
+    """Start listeners for ``config.hosts`` simulated hosts."""
+    key = host_key or asyncssh.generate_private_key("ssh-ed25519")
+    fleet = Fleet(
+        config=config,
+        schedule=fault_schedule(config.hosts, config.faults, config.seed),
+        attempts=[0] * config.hosts,
+    )
+    port = config.port
+    try:
+        for i in range(config.hosts):
+            if config.ports:
+                listener = _listen("127.0.0.1", config.port + i if config.port else 0)
+            else:
+                listener = _listen(loopback_address(i), port)
+                port = listener.getsockname()[1]
+            fleet._listeners.append(listener)
+            fleet.targets.append(listener.getsockname()[:2])
+    except OSError:
+        fleet.close()
+        raise
+    for i, listener in enumerate(fleet._listeners):
+        task = asyncio.ensure_future(_serve(fleet, i, listener, key))
+        fleet._tasks.add(task)
+        task.add_done_callback(fleet._tasks.discard)
+    return fleet
+
+
+def parse_faults(specs: List[str]) -> Dict[str, float]:
+    """Parse ``kind=rate`` items (e.g. ``reset=0.05``)."""
+    faults: Dict[str, float] = {}
+    for spec in specs:
+        kind, sep, rate = spec.partition("=")
+        if not sep or kind not in FAULTS:
+            raise ValueError(f"Invalid fault {spec!r}; expected one of {', '.join(FAULTS)} as kind=rate")
+        faults[kind] = float(rate)
+    return faults
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Serve a simulated SSH fleet on loopback")
+    parser.add_argument("--hosts", type=int, default=FleetConfig.hosts)
+    parser.add_argument("--latency", type=float, default=FleetConfig.latency, help="Command run time (seconds)")
+    parser.add_argument("--output-bytes", type=int, default=FleetConfig.output_bytes)
+    parser.add_argument("--handshake", type=float, default=FleetConfig.handshake, help="Extra auth delay (seconds)")
+    parser.add_argument("--port", type=int, default=0, help="Listen port (default: any free port)")
+    parser.add_argument("--ports", action="store_true", help="One port per host on 127.0.0.1")
+    parser.add_argument("--fault", action="append", default=[], help=f"kind=rate, kind one of {', '.join(FAULTS)}")
+    parser.add_argument("--seed", type=int, default=0, help="Fault schedule seed")
+    parser.add_argument(
+        "--fault-attempts", type=int, default=0, help="Connections per host affected by connection faults (0: all)"
+    )
+    parser.add_argument("--stall", type=float, default=FleetConfig.stall, help="Seconds a stalled command hangs")
+    parser.add_argument("--huge-bytes", type=int, default=FleetConfig.huge_bytes, help="Output size for huge faults")
+    args = parser.parse_args(argv)
+    try:
+        faults = parse_faults(args.fault)
+    except ValueError as exc:
+        parser.error(str(exc))
+    config = FleetConfig(
+        hosts=args.hosts,
+        latency=args.latency,
+        output_bytes=args.output_bytes,
+        handshake=args.handshake,
+        port=args.port,
+        ports=args.ports,
+        faults=faults,
+        seed=args.seed,
+        fault_attempts=args.fault_attempts,
+        stall=args.stall,
+        huge_bytes=args.huge_bytes,
+    )
+
+    async def serve() -> None:
+        fleet = await start_fleet(config)
+        ready = {"config": asdict(config), "targets": fleet.targets, "schedule": fleet.schedule}
+        print("READY " + json.dumps(ready), flush=True)
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await fleet.wait_closed()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
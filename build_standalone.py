@@ -6,8 +6,14 @@ This script creates:
 1. Standalone executable using PyInstaller (binary)
 2. Portable tarball with Python files and dependencies (source)
 
+Binary modes:
+- onefile: a single executable. PyInstaller unpacks the bundled runtime into
+  a temporary directory on every launch, which costs a second or more.
+- onedir: the same bundle as an unpacked directory, shipped as a tarball. It
+  starts without any extraction step.
+
 Usage:
-    python build_standalone.py [--type=binary|tarball|both]
+    python build_standalone.py [--type=binary|tarball|both] [--binary-mode=onefile|onedir]
 """
 
 import argparse
@@ -89,13 +95,13 @@ def create_version_info(version):
     print("✅ Skipping Windows version info (Linux build)")
 
 
-def build_executable():
-    """Build standalone executable using PyInstaller."""
+def build_executable(mode="onefile"):
+    """Build standalone executable using PyInstaller (``mode``: onefile or onedir)."""
     version = get_version()
     platform_suffix = get_platform_suffix()
     exe_name = f"scatter-{version}-{platform_suffix}"
 
-    print(f"Building {exe_name}...")
+    print(f"Building {exe_name} ({mode})...")
 
     # No Windows-specific setup needed for Linux builds
     create_version_info(version)
@@ -103,7 +109,7 @@ def build_executable():
     # Linux-optimized PyInstaller options
     cmd = [
         sys.executable, "-m", "PyInstaller",
-        "--onefile",
+        f"--{mode}",
         "--name", exe_name,
         "--console",
         "--clean",
@@ -154,7 +160,8 @@ def build_executable():
             print("STDERR:", e.stderr[-1000:])
         sys.exit(1)
 
-    exe_path = Path("dist") / exe_name
+    # onedir builds put the executable inside dist/<name>/ next to its libraries
+    exe_path = Path("dist") / exe_name / exe_name if mode == "onedir" else Path("dist") / exe_name
     if not exe_path.exists():
         print(f"❌ Expected executable not found: {exe_path}")
         print("Files in dist/:", list(Path("dist").glob("*"))
@@ -164,6 +171,16 @@ def build_executable():
     return str(exe_path)
 
 
+def package_onedir(exe_path):
+    """Pack a onedir build into a tarball; the launcher sits at the top of the tree."""
+    app_dir = Path(exe_path).parent
+    tarball_path = app_dir.parent / f"{app_dir.name}-onedir.tar.gz"
+    print(f"📦 Packing onedir build: {tarball_path}")
+    with tarfile.open(tarball_path, "w:gz") as tar:
+        tar.add(app_dir, arcname=app_dir.name)
+    return str(tarball_path)
+
+
 def test_executable(exe_path):
     """Test the built executable."""
     print(f"Testing executable: {exe_path}")
@@ -405,6 +422,8 @@ def main():
     parser = argparse.ArgumentParser(description="Build Scatter distributions")
     parser.add_argument("--type", choices=["binary", "tarball", "both"], 
                        default="both", help="Type of distribution to build")
+    parser.add_argument("--binary-mode", choices=["onefile", "onedir"], default="onefile",
+                        help="onedir skips the per-launch extraction of onefile builds")
     args = parser.parse_args()
 
     if not Path("pyproject.toml").exists():
@@ -426,9 +445,14 @@ def main():
         # Build binary executable
         if args.type in ["binary", "both"]:
             print("🔨 Building standalone binary executable...")
-            exe_path = build_executable()
+            exe_path = build_executable(args.binary_mode)
             
             if test_executable(exe_path):
+                from test_build import benchmark_startup
+
+                benchmark_startup([exe_path])
+                if args.binary_mode == "onedir":
+                    exe_path = package_onedir(exe_path)
                 size_mb = Path(exe_path).stat().st_size / (1024 * 1024)
                 print(f"✅ Binary executable: {exe_path} ({size_mb:.1f} MB)")
                 results.append(f"Binary: {exe_path}")
@@ -459,7 +483,10 @@ def main():
         if args.type in ["binary", "both"]:
             print("📋 Binary Usage:")
             print("  - Users don't need Python installed")
-            print("  - Single file download and run")
+            if args.binary_mode == "onedir":
+                print("  - Extract once and run: tar -xzf *-onedir.tar.gz && ./scatter-*/scatter-* --help")
+            else:
+                print("  - Single file download and run")
         
         if args.type in ["tarball", "both"]:
             print("📋 Tarball Usage:")
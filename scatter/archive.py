@@ -0,0 +1,164 @@
+"""Single-file, append-only archive sink for per-host outputs.
+
+An alternative to ``--save-dir`` that writes every host's stdout/stderr into one
+file as hosts complete instead of two small files per host.
+
+File layout
+- ``MAGIC`` file header.
+- One record per host, appended in completion order. Each record is a fixed
+  header (``_RECORD``) followed by a small JSON metadata blob and the
+  independently zlib-compressed stdout and stderr payloads.
+- On close, a zlib-compressed JSON index mapping hosts to record offsets and a
+  fixed trailer (``_TRAILER``) pointing at the index.
+
+Readers use the trailer index to seek straight to one host's record and only
+decompress the requested stream. Archives left without a trailer (e.g. an
+interrupted run) are still readable: the record headers are walked without
+decompressing any payloads to rebuild the index.
+"""
+
+from __future__ import annotations
+
+import json
+import struct
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional
+
+MAGIC = b"SCATARC1"
+_RECORD = struct.Struct(">4sIII")  # tag, meta_len, stdout_len, stderr_len
+_RECORD_TAG = b"SREC"
+_TRAILER = struct.Struct(">8sQQ")  # tag, index_offset, index_len
+_TRAILER_TAG = b"SCATIDX1"
+
+
+@dataclass
+class ArchiveEntry:
+    """Index entry for one host record inside an archive."""
+    host: str
+    offset: int
+    meta_len: int
+    stdout_len: int
+    stderr_len: int
+
+    @property
+    def _payload_offset(self) -> int:
+        return self.offset + _RECORD.size + self.meta_len
+
+
+class ArchiveWriter:
+    """Append per-host results to a single archive file as they complete."""
+
+    def __init__(self, path: Path | str, level: int = 6) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._level = level
+        self._fh: Optional[BinaryIO] = self.path.open("wb")
+        self._fh.write(MAGIC)
+        self._offset = len(MAGIC)
+        self._entries: List[ArchiveEntry] = []
+
+    def add(self, host: str, stdout: str, stderr: str, meta: Optional[Dict[str, Any]] = None) -> None:
+        """Append one host record. Output is compressed per stream."""
+        if self._fh is None:
+            raise ValueError("Archive is closed")
+        meta_blob = json.dumps(dict(meta or {}, host=host)).encode("utf-8")
+        out_blob = zlib.compress((stdout or "").encode("utf-8"), self._level)
+        err_blob = zlib.compress((stderr or "").encode("utf-8"), self._level)
+        header = _RECORD.pack(_RECORD_TAG, len(meta_blob), len(out_blob), len(err_blob))
+        self._fh.write(b"".join((header, meta_blob, out_blob, err_blob)))
+        self._entries.append(ArchiveEntry(host, self._offset, len(meta_blob), len(out_blob), len(err_blob)))
+        self._offset += len(header) + len(meta_blob) + len(out_blob) + len(err_blob)
+
+    def close(self) -> None:
+        """Write the index and trailer. Safe to call more than once."""
+        if self._fh is None:
+            return
+        index = zlib.compress(
+            json.dumps([[e.host, e.offset, e.meta_len, e.stdout_len, e.stderr_len] for e in self._entries]).encode("utf-8")
+        )
+        self._fh.write(index)
+        self._fh.write(_TRAILER.pack(_TRAILER_TAG, self._offset, len(index)))
+        self._fh.close()
+        self._fh = None
+
+    def __enter__(self) -> "ArchiveWriter":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+class ArchiveReader:
+    """Random-access reader for archives written by ``ArchiveWriter``."""
+
+    def __init__(self, path: Path | str) -> None:
+        self.path = Path(path)
+        if not self.path.exists():
+            raise FileNotFoundError(f"Archive not found: {self.path}")
+        self._fh: BinaryIO = self.path.open("rb")
+        if self._fh.read(len(MAGIC)) != MAGIC:
+            self._fh.close()
+            raise ValueError(f"Not a scatter archive: {self.path}")
+        self.entries: List[ArchiveEntry] = self._read_index()
+        self._by_host: Dict[str, ArchiveEntry] = {}
+        for e in self.entries:
+            self._by_host.setdefault(e.host, e)
+
+    def _read_index(self) -> List[ArchiveEntry]:
+        size = self._fh.seek(0, 2)
+        if size >= len(MAGIC) + _TRAILER.size:
+            self._fh.seek(size - _TRAILER.size)
+            tag, offset, length = _TRAILER.unpack(self._fh.read(_TRAILER.size))
+            if tag == _TRAILER_TAG:
+                self._fh.seek(offset)
+                raw = json.loads(zlib.decompress(self._fh.read(length)))
+                return [ArchiveEntry(*item) for item in raw]
+        return list(self._scan(size))
+
+    def _scan(self, size: int) -> Iterator[ArchiveEntry]:
+        # No trailer: walk record headers, skipping payloads without decompressing
+        offset = len(MAGIC)
+        while offset + _RECORD.size <= size:
+            self._fh.seek(offset)
+            tag, meta_len, out_len, err_len = _RECORD.unpack(self._fh.read(_RECORD.size))
+            end = offset + _RECORD.size + meta_len + out_len + err_len
+            if tag != _RECORD_TAG or end > size:
+                break
+            meta = json.loads(self._fh.read(meta_len))
+            yield ArchiveEntry(str(meta["host"]), offset, meta_len, out_len, err_len)
+            offset = end
+
+    def hosts(self) -> List[str]:
+        return [e.host for e in self.entries]
+
+    def _entry(self, host: str) -> ArchiveEntry:
+        try:
+            return self._by_host[host]
+        except KeyError:
+            raise KeyError(f"Host not found in archive: {host}") from None
+
+    def meta(self, host: str) -> Dict[str, Any]:
+        e = self._entry(host)
+        self._fh.seek(e.offset + _RECORD.size)
+        return json.loads(self._fh.read(e.meta_len))
+
+    def stdout(self, host: str) -> str:
+        e = self._entry(host)
+        self._fh.seek(e._payload_offset)
+        return zlib.decompress(self._fh.read(e.stdout_len)).decode("utf-8")
+
+    def stderr(self, host: str) -> str:
+        e = self._entry(host)
+        self._fh.seek(e._payload_offset + e.stdout_len)
+        return zlib.decompress(self._fh.read(e.stderr_len)).decode("utf-8")
+
+    def close(self) -> None:
+        self._fh.close()
+
+    def __enter__(self) -> "ArchiveReader":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
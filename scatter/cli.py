@@ -11,43 +11,120 @@ Key behaviors
   - Default prints a results table (and per-host progress when enabled).
   - `--quiet` prints a single summary line.
   - `-v/-vv` increase verbosity; `-vv` also prints stdout/stderr blocks.
-- Artifacts: `--save-dir` writes per-host output files; `--log-file` writes JSONL records per host.
+- Artifacts: `--save-dir` writes per-host output files; `--log-file` writes JSONL records per host;
+  `--archive` streams all outputs into one indexed file, read back with `scatter show`;
+  `--store` records deduplicated outputs per run, compared with `scatter diff`;
+  `--history-db` records runs in SQLite, queried with `scatter history`.
+- Drift: `--changed-only` renders only hosts whose output fingerprint differs from the last recorded run of
+  the same command (fingerprints live in the history database); `--show-diff` adds unified diffs.
+- Targets: `--hosts` takes host names or range expressions (`web[001-020]`) instead of inventory hosts;
+  failure summaries fold host names back into ranges.
+- Search: `--index` builds a trigram index next to `--save-dir`/`--archive` outputs, queried with `scatter grep`.
 """
 
 from __future__ import annotations
 
-import asyncio
 import sys
 from enum import Enum
 import os
 import json
+import re
+from dataclasses import replace
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Optional, List
+from typing import Dict, Optional, List
 
 import typer
 from rich.console import Console
-from rich.table import Table
 
-from .config import Inventory, HostEntry, load_inventory
-from .ssh import ExecOptions, execute_on_hosts
+from .config import Inventory, InventoryDefaults, HostEntry, load_inventory
+from .dynamic import is_source
+from .models import ExecOptions, HostUsage
 
 app = typer.Typer(add_completion=False, help="Concurrent SSH executor for 100+ hosts")
 console = Console()
 
 
+def _sanitize_host(name: str) -> str:
+    """File-name-safe form of a host, as used for ``--save-dir`` files."""
+    return "".join(c if c.isalnum() or c in ("-", "_", ".") else "_" for c in name)
+
+
+def _format_bytes(n: float) -> str:
+    """``1536`` -> ``"1.5 KiB"``."""
+    if n < 1024:
+        return f"{n:.0f} B"
+    for unit in ("KiB", "MiB", "GiB"):
+        n /= 1024
+        if n < 1024:
+            break
+    return f"{n:.1f} {unit}"
+
+
+class _HostSpecBuilder:
+    """Resolve per-host ``ExecOptions`` over a run-wide base.
+
+    Hosts with the same effective settings share a single (immutable) options
+    object, and each distinct identity path is expanded once.
+    """
+
+    def __init__(self, base: ExecOptions) -> None:
+        self.base = base
+        self._options: Dict[tuple, ExecOptions] = {}
+        self._paths: Dict[str, Path] = {}
+
+    def expand_path(self, value: str) -> Path:
+        path = self._paths.get(value)
+        if path is None:
+            path = self._paths[value] = Path(os.path.expandvars(os.path.expanduser(value)))
+        return path
+
+    def options(self, h: HostEntry) -> ExecOptions:
+        key = (h.username, h.port, h.identity, h.password)
+        opts = self._options.get(key)
+        if opts is None:
+            base = self.base
+            opts = self._options[key] = replace(
+                base,
+                username=h.username or base.username,
+                port=h.port or base.port,
+                identity=self.expand_path(h.identity) if h.identity else base.identity,
+                password=h.password or base.password,
+            )
+        return opts
+
+
 class KnownHostsPolicy(str, Enum):
     strict = "strict"
     off = "off"
 
 
-@app.callback()
-def _setup() -> None:
+class Schedule(str, Enum):
+    inventory = "inventory"
+    lpt = "lpt"
+
+
+class InventoryFormat(str, Enum):
+    auto = "auto"
+    yaml = "yaml"
+    json = "json"
+    ndjson = "ndjson"
+    csv = "csv"
+    tsv = "tsv"
+    lines = "lines"
+
+
+def _setup_event_loop() -> None:
     """Set a sane asyncio event loop policy for the current platform.
 
     - On Windows, prefer ``WindowsSelectorEventLoopPolicy`` for wide compatibility.
     - On non-Windows, attempt to use ``uvloop`` if available (best-effort).
+
+    Called just before hosts are executed, so commands and paths that never
+    start an event loop (``--help``, ``--dry-run``, ``show``) skip importing it.
     """
+    import asyncio
+
     # Ensure a safe loop policy on Windows
     if sys.platform == "win32":
         try:
@@ -66,8 +143,9 @@ def _setup() -> None:
 
 @app.command()
 def run(
+    ctx: typer.Context,
     command: Optional[str] = typer.Argument(None, help="Shell command to run on all hosts (overridden by per-host 'command' in inventory)"),
-    inventory: Path = typer.Option(Path("inventory.yaml"), exists=False, dir_okay=False, help="Path to inventory YAML"),
+    inventory: str = typer.Option("inventory.yaml", help="Path to inventory file (YAML, JSON, NDJSON, CSV/TSV or host-per-line), or an exec:/py: dynamic source"),
     limit: int = typer.Option(50, min=1, help="Max concurrent SSH sessions"),
     identity: Optional[Path] = typer.Option(None, help="Path to private key file to use"),
     username: Optional[str] = typer.Option(None, help="Override SSH username for all hosts"),
@@ -91,10 +169,73 @@ def run(
     verbose: int = typer.Option(0, "--verbose", "-v", count=True, help="Increase verbosity (repeat for more detail)"),
     quiet: bool = typer.Option(False, help="Minimal output: only summary and exit code"),
     log_file: Optional[Path] = typer.Option(None, help="Write JSON lines log with per-host results"),
+    archive: Optional[Path] = typer.Option(None, help="Stream all per-host outputs into a single indexed archive file"),
+    store: Optional[Path] = typer.Option(None, help="Record outputs in a deduplicating content-addressed store directory"),
+    history_db: Optional[Path] = typer.Option(None, help="Record the run and per-host results in a SQLite history database"),
+    group_limit: Optional[List[str]] = typer.Option(None, help="Per-group concurrency cap under --limit: tag:NAME=N (globs cap each matching tag), cidr:NETWORK=N or attr:username|port|domain=N (repeatable)"),
+    schedule: Schedule = typer.Option(Schedule.inventory, help="Host start order: inventory order, or lpt (longest expected duration first, from --history-db)"),
+    changed_only: bool = typer.Option(False, help="Only show hosts whose output changed since the last recorded run of the same command"),
+    show_diff: bool = typer.Option(False, help="Print unified diffs against the previous output (implies --changed-only)"),
+    index: bool = typer.Option(False, help="Build a trigram search index over outputs in --save-dir/--archive (see 'scatter grep')"),
+    inventory_cache: bool = typer.Option(True, "--inventory-cache/--no-inventory-cache", help="Reuse a compiled copy of an unchanged inventory and cached dynamic source results"),
+    inventory_format: InventoryFormat = typer.Option(InventoryFormat.auto, help="Inventory file format (auto: by file extension)"),
+    inventory_ttl: Optional[float] = typer.Option(None, min=0.0, help="Seconds to reuse a dynamic --inventory source's cached result (default 300; 0 fetches it now)"),
+    tags: Optional[str] = typer.Option(None, help="Only hosts matching a tag expression, e.g. 'web,db' or 'web & !canary'"),
+    exclude_tags: Optional[str] = typer.Option(None, help="Skip hosts matching a tag expression"),
+    host_filter: Optional[List[str]] = typer.Option(None, help="Only hosts whose name matches a glob, or a regex prefixed with '~' (repeatable)"),
+    hosts: Optional[str] = typer.Option(None, help="Run on these hosts instead of the inventory's, e.g. 'web[001-020].dc1,db{a,b}1' (inventory defaults still apply if the file exists)"),
+    profile: Optional[Path] = typer.Option(None, help="Profile the run: write pstats to this path and collapsed stacks (for flamegraphs) next to it, then print a summary"),
+    trace: Optional[Path] = typer.Option(None, help="Write a Chrome trace-event timeline (open in Perfetto) of each host's queue, connect, auth, exec and close phases per concurrency slot"),
+    metrics_listen: Optional[str] = typer.Option(None, help="Serve Prometheus metrics at http://[HOST:]PORT/metrics while the run lasts (HOST defaults to 127.0.0.1)"),
+    metrics_textfile: Optional[Path] = typer.Option(None, help="Write Prometheus metrics for the run to this file when it ends (node-exporter textfile collector)"),
+    watchdog: Optional[float] = typer.Option(None, min=1.0, help="Report event-loop stalls longer than this many milliseconds, with the stack that caused them"),
 ) -> None:
     """Run COMMAND across all hosts in the inventory."""
 
-    inv: Inventory = load_inventory(inventory)
+    profiler = None
+    if profile is not None:
+        from .profiling import RunProfiler
+
+        profiler = RunProfiler(Path(os.path.expandvars(os.path.expanduser(str(profile)))))
+        profiler.start()
+
+        def _report_profile() -> None:
+            # Runs when the command finishes, including via typer.Exit or an error
+            for line in profiler.stop():
+                console.print(line, markup=False, highlight=False)
+
+        ctx.call_on_close(_report_profile)
+
+    inv_fmt = None if inventory_format is InventoryFormat.auto else inventory_format.value
+    # Taken as text: a Path would collapse the "//" in e.g. "exec:curl https://cmdb/..."
+    inventory_source: str | Path = inventory if is_source(inventory) else Path(inventory)
+    if hosts is not None:
+        from .hostrange import expand_list
+
+        inv_defaults = InventoryDefaults()
+        if not isinstance(inventory_source, Path) or inventory_source.exists():
+            inv_defaults = load_inventory(
+                inventory_source, use_cache=inventory_cache, fmt=inv_fmt,
+                dynamic_ttl=inventory_ttl, dynamic_cache=inventory_cache, require_hosts=False,
+            ).defaults
+        inv = Inventory(defaults=inv_defaults, hosts=[HostEntry(host=name) for name in expand_list(hosts)])
+        if not inv.hosts:
+            raise typer.BadParameter("--hosts did not name any hosts")
+    else:
+        inv = load_inventory(
+            inventory_source, use_cache=inventory_cache, fmt=inv_fmt,
+            dynamic_ttl=inventory_ttl, dynamic_cache=inventory_cache,
+        )
+
+    if tags or exclude_tags or host_filter:
+        from .selection import HostIndex
+
+        try:
+            inv.hosts = HostIndex(inv.hosts).select(tags=tags, exclude_tags=exclude_tags, patterns=host_filter or ())
+        except (ValueError, re.error) as exc:
+            raise typer.BadParameter(f"Invalid host selection: {exc}")
+        if not inv.hosts:
+            raise typer.BadParameter("No hosts match the given --tags/--exclude-tags/--host-filter")
 
     # Effective known-hosts: CLI overrides inventory defaults
     effective_known_hosts = (known_hosts.value if known_hosts else inv.defaults.known_hosts).lower()
@@ -135,52 +276,30 @@ def run(
         username_candidates=username_candidates,
     )
 
-    # Build per-host command and auth. Precedence: host.command > --command-file > CLI command
-    host_specs: List[tuple[str, str, ExecOptions]] = []
     # Preload password list once, reused across hosts
     password_candidates: Optional[List[str]] = None
-    if 'password_list' in locals() and password_list is not None:
-        pass
+    if password_list is not None:
+        try:
+            password_candidates = [ln.strip() for ln in Path(os.path.expandvars(os.path.expanduser(str(password_list)))).read_text(encoding="utf-8").splitlines() if ln.strip()]
+        except Exception as exc:
+            raise typer.BadParameter(f"Failed reading password list: {exc}")
 
+    # Build per-host command and auth. Precedence: host.command > --command-file > CLI command
+    specs = _HostSpecBuilder(
+        replace(options, password=inv.defaults.password or options.password, password_candidates=password_candidates)
+    )
+    host_specs: List[tuple[str, str, ExecOptions]] = []
     for h in inv.hosts:
         host_command = h.command or file_command or command
         if not host_command:
             raise typer.BadParameter(f"No command provided for host {h.host}. Provide CLI 'command' or 'command' in inventory.")
-
-        # Expand any per-host identity path and fall back to CLI/global
-        per_host_identity = (
-            Path(os.path.expandvars(os.path.expanduser(h.identity))) if h.identity else options.identity
-        )
-
-        # Build per-host password candidates
-        ph_password_candidates: Optional[List[str]] = None
-        # Load password list lazily on first use
-        if password_candidates is None and password_list is not None:
-            try:
-                password_candidates = [ln.strip() for ln in Path(os.path.expandvars(os.path.expanduser(str(password_list)))).read_text(encoding="utf-8").splitlines() if ln.strip()]
-            except Exception as exc:
-                raise typer.BadParameter(f"Failed reading password list: {exc}")
-        ph_password_candidates = password_candidates
-
-        per_host_options = ExecOptions(
-            username=h.username or options.username,
-            port=h.port or options.port,
-            identity=per_host_identity,
-            password=h.password if h.password else inv.defaults.password if inv.defaults.password else options.password,
-            known_hosts=options.known_hosts,
-            connect_timeout=options.connect_timeout,
-            pty=options.pty,
-            limit=options.limit,
-            command_timeout=options.command_timeout,
-            retry_attempts=options.retry_attempts,
-            username_candidates=options.username_candidates,
-            password_candidates=ph_password_candidates,
-        )
-        host_specs.append((h.host, host_command, per_host_options))
+        host_specs.append((h.host, host_command, specs.options(h)))
 
     # Dry run: show plan and exit
     if dry_run:
         if not quiet:
+            from rich.table import Table
+
             plan = Table(title="Planned SSH Execution", show_lines=False)
             plan.add_column("Host", style="bold")
             plan.add_column("User")
@@ -211,13 +330,43 @@ def run(
         show_output = True
         show_stderr = True
 
+    group_limits = []
+    if group_limit:
+        from .limits import GroupLimiter, host_groups, parse_group_limit
+
+        try:
+            group_limits = [parse_group_limit(spec) for spec in group_limit]
+        except ValueError as exc:
+            raise typer.BadParameter(str(exc))
+        host_group_names, group_capacities = host_groups(
+            inv.hosts,
+            group_limits,
+            default_port=options.port or inv.defaults.port,
+            options=[opts for _, _, opts in host_specs],
+        )
+
     if not quiet and not progress:
         console.print(f"Running on {len(host_specs)} hosts with concurrency={limit}...")
 
+    # The event loop and SSH stack are only imported once there is work to execute
+    import asyncio
+
+    _setup_event_loop()
+
     # Execute per-host, but reuse the same concurrency limit by running a wrapper.
     async def _run_all():
+        if profiler is not None:
+            profiler.lag.start()
+        if loop_watchdog is not None:
+            loop_watchdog.start()
         semaphore = asyncio.Semaphore(limit)
-        tasks = [asyncio.create_task(_run_one(h, cmd, opts, semaphore)) for h, cmd, opts in host_specs]
+        limiter = GroupLimiter(limit, group_capacities) if group_limits else None
+        # Hosts queue for a slot in the order their tasks start; results keep inventory order
+        tasks: List = [None] * len(host_specs)
+        for i in run_order:
+            h, cmd, opts = host_specs[i]
+            slot = semaphore if limiter is None else limiter.slot(host_group_names[i])
+            tasks[i] = asyncio.create_task(_run_one(h, cmd, opts, slot))
         if progress and not quiet:
             from rich.progress import Progress, SpinnerColumn, BarColumn, TextColumn, TimeElapsedColumn
 
@@ -236,6 +385,8 @@ def run(
                     res = await coro
                     results_local.append(res)
                     prog.advance(task_id)
+                    if changes is not None and res.host not in changes:
+                        continue
                     status = "[green]OK[/green]" if res.ok else "[red]FAIL[/red]"
                     exit_text = "" if res.exit_status is None else str(res.exit_status)
                     first_line = (res.stdout.strip().splitlines() or [""])[0]
@@ -250,15 +401,170 @@ def run(
 
     async def _run_one(host: str, host_command: str, host_options: ExecOptions, semaphore: asyncio.Semaphore):
         from .ssh import run_on_host  # reuse implementation
-        return await run_on_host(host, host_command, host_options, semaphore)
-
-    results = asyncio.run(_run_all())
+        res = await run_on_host(host, host_command, host_options, semaphore)
+        # Fingerprint before the history sink overwrites the stored one
+        if tracker is not None:
+            change = tracker.check(res.host, host_command, res.exit_status, res.stdout, res.stderr)
+            if change is not None:
+                changes[res.host] = change
+        if metrics is not None:
+            metrics.observe_result(res)
+        # Per-result sinks are written incrementally as hosts complete
+        if sinks:
+            meta = {
+                "ok": res.ok,
+                "exit_status": res.exit_status,
+                "duration_sec": res.duration,
+                "error": res.error,
+                "command": host_command,
+            }
+            if res.usage is not None:
+                meta["slot_sec"] = res.usage.slot_time
+            for sink in sinks:
+                sink.add(res.host, res.stdout, res.stderr, meta)
+        return res
+
+    # Checked before any sink exists: ArchiveWriter truncates the --archive file
+    if index and save_dir is None and archive is None:
+        raise typer.BadParameter("--index requires --save-dir or --archive")
+
+    # Sinks share an ``add(host, stdout, stderr, meta)`` / ``close()`` interface
+    sinks: List = []
+    if archive is not None:
+        from .archive import ArchiveWriter
+
+        sinks.append(ArchiveWriter(Path(os.path.expandvars(os.path.expanduser(str(archive))))))
+    run_recorder = None
+    if store is not None:
+        from .store import OutputStore
+
+        run_recorder = OutputStore(Path(os.path.expandvars(os.path.expanduser(str(store))))).start_run()
+        sinks.append(run_recorder)
+    if index:
+        from .textindex import SAVE_DIR_INDEX, IndexWriter
+
+        index_paths: List[Path] = []
+        if save_dir is not None:
+            index_paths.append(Path(os.path.expandvars(os.path.expanduser(str(save_dir)))) / SAVE_DIR_INDEX)
+        if archive is not None:
+            index_paths.append(Path(os.path.expandvars(os.path.expanduser(str(archive) + ".idx"))))
+        sinks.append(IndexWriter(index_paths))
+
+    metrics = None
+    if metrics_listen is not None or metrics_textfile is not None:
+        from .metrics import RunMetrics
+
+        metrics = RunMetrics()
+
+    # --changed-only needs somewhere to keep fingerprints: default to the per-user history DB
+    tracker = None
+    changes = None
+    if changed_only or show_diff:
+        from .drift import ChangeTracker
+        from .history import default_path
+
+        history_db = history_db or default_path()
+        history_path = Path(os.path.expandvars(os.path.expanduser(str(history_db))))
+        tracker = ChangeTracker(history_path, {cmd for _, cmd, _ in host_specs}, with_previous_output=show_diff)
+        changes = {}
+    run_order = range(len(host_specs))
+    if schedule is Schedule.lpt:
+        from .history import default_path
+        from .scheduling import load_estimates, lpt_order
+
+        history_db = history_db or default_path()
+        estimates = load_estimates(
+            Path(os.path.expandvars(os.path.expanduser(str(history_db)))), [cmd for _, cmd, _ in host_specs]
+        )
+        run_order, fill = lpt_order(host_specs, estimates)
+        if not quiet:
+            known = sum(1 for h, cmd, _ in host_specs if (h, cmd) in estimates)
+            if fill is None:
+                console.print("No recorded durations yet: starting hosts in inventory order")
+            else:
+                console.print(
+                    f"Starting longest expected first: {known}/{len(host_specs)} hosts have recorded durations"
+                    f" (others placed at the median, {fill:.2f}s)",
+                    highlight=False,
+                )
+    history_recorder = None
+    if history_db is not None:
+        from .history import HistoryRecorder
+
+        history_recorder = HistoryRecorder(
+            Path(os.path.expandvars(os.path.expanduser(str(history_db)))), keep_outputs=show_diff
+        )
+        sinks.append(history_recorder)
+
+    # Per-phase timing observers (see scatter.ssh.phase_observer)
+    observers: List = []
+    tracer = None
+    if trace is not None:
+        from .tracing import TraceRecorder
+
+        tracer = TraceRecorder()
+        observers.append(tracer)
+    metrics_server = None
+    if metrics is not None:
+        observers.append(metrics.observe_phase)
+        if metrics_listen is not None:
+            try:
+                metrics_server = metrics.serve(metrics_listen)
+            except (OSError, ValueError) as exc:
+                raise typer.BadParameter(f"Cannot serve metrics on {metrics_listen}: {exc}")
+    if observers:
+        from .ssh import phase_observer
+
+        def _observe(host: str, phase: str, start: float, end: float) -> None:
+            for observer in observers:
+                observer(host, phase, start, end)
+
+        observer_token = phase_observer.set(observers[0] if len(observers) == 1 else _observe)
+    loop_watchdog = None
+    if watchdog is not None:
+        from .profiling import LoopWatchdog
+
+        loop_watchdog = LoopWatchdog(threshold=watchdog / 1000)
+    # History is best-effort: a failed write is reported after the results, not raised mid-run
+    history_error: Optional[Exception] = None
+    sink_error: Optional[Exception] = None
+    try:
+        results = asyncio.run(_run_all())
+    finally:
+        if loop_watchdog is not None:
+            loop_watchdog.stop()
+        if observers:
+            phase_observer.reset(observer_token)
+        for sink in sinks:
+            try:
+                sink.close()
+            except Exception as exc:  # noqa: BLE001 - every sink still gets closed
+                if sink is history_recorder:
+                    history_error = exc
+                elif sink_error is None:
+                    sink_error = exc
+        if tracker is not None:
+            tracker.close()
+        if metrics is not None:
+            metrics.finish()
+            if metrics_textfile is not None:
+                metrics.write_textfile(Path(os.path.expandvars(os.path.expanduser(str(metrics_textfile)))))
+        if metrics_server is not None:
+            metrics_server.close()
+    if sink_error is not None:
+        raise sink_error
+    if tracer is not None:
+        tracer.write(Path(os.path.expandvars(os.path.expanduser(str(trace)))), results)
 
     ok_count = sum(1 for r in results if r.ok)
     failed_count = len(results) - ok_count
     exit_code = 0 if failed_count == 0 else 1
+    # Rendering is limited to changed hosts with --changed-only; counts and exit code cover all hosts
+    shown = results if changes is None else [r for r in results if r.host in changes]
 
     if not quiet:
+        from rich.table import Table
+
         table = Table(title="SSH Results", show_lines=False)
         table.add_column("Host", style="bold")
         table.add_column("Status")
@@ -267,7 +573,7 @@ def run(
         table.add_column("Stdout (first line)")
         table.add_column("Error")
 
-        for r in results:
+        for r in shown:
             status = "OK" if r.ok else "FAIL"
             exit_text = "" if r.exit_status is None else str(r.exit_status)
             first_line = (r.stdout.strip().splitlines() or [""])[0]
@@ -282,11 +588,16 @@ def run(
     if not quiet:
         if failed_count:
             console.print(f"[red]Failed: {failed_count}[/red], Succeeded: {ok_count}")
-            # Print concise list of failures with reasons
-            for r in results:
+            # Print concise list of failures with reasons, folding hosts that share a reason into ranges
+            from .hostrange import compact
+
+            by_reason: dict[str, List[str]] = {}
+            for r in shown:
                 if not r.ok:
                     reason = r.error or (r.stderr.strip().splitlines() or [""])[0]
-                    console.print(f"[red]- {r.host}[/red]: {reason}")
+                    by_reason.setdefault(reason, []).append(r.host)
+            for reason, failed_hosts in by_reason.items():
+                console.print(f"[red]- {','.join(compact(failed_hosts))}[/red]: {reason}")
         else:
             console.print(f"[green]Succeeded: {ok_count}[/green]")
     else:
@@ -295,10 +606,28 @@ def run(
             console.print(f"Failed: {failed_count}, Succeeded: {ok_count}")
         else:
             console.print(f"Succeeded: {ok_count}")
+    if changes is not None:
+        console.print(f"Changed: {len(shown)}, Unchanged: {len(results) - len(shown)}")
+
+    if run_recorder is not None and not quiet:
+        console.print(f"Stored run: {run_recorder.run_id}")
+
+    if not quiet and any(r.usage is not None for r in results):
+        usage = HostUsage.total(results)
+        console.print(
+            f"Traffic: {_format_bytes(usage.bytes_sent)} out, {_format_bytes(usage.bytes_received)} in "
+            f"({_format_bytes(usage.stdout_bytes + usage.stderr_bytes)} output), "
+            f"{usage.attempts} connections, {usage.cpu_time:.2f}s CPU",
+            highlight=False,
+        )
+
+    if loop_watchdog is not None and not quiet:
+        for line in loop_watchdog.summary_lines():
+            console.print(line, markup=False, highlight=False)
 
     # Optionally print full outputs
     if (show_output or show_stderr) and not quiet:
-        for r in results:
+        for r in shown:
             if show_output and r.stdout:
                 console.rule(f"[bold]STDOUT[/bold] - {r.host}")
                 console.print(r.stdout)
@@ -306,16 +635,24 @@ def run(
                 console.rule(f"[bold red]STDERR[/bold red] - {r.host}")
                 console.print(r.stderr)
 
+    if show_diff and changes and not quiet:
+        from .drift import unified_diff
+
+        for r in shown:
+            change = changes[r.host]
+            console.rule(f"[bold]DIFF[/bold] - {r.host} ({change.status})")
+            lines = unified_diff(change, r.stdout, r.stderr)
+            if lines:
+                console.print("\n".join(lines), markup=False, highlight=False)
+            else:
+                console.print("(no previous output recorded)")
+
     # Optionally save outputs to files
     if save_dir is not None:
         save_dir = Path(os.path.expandvars(os.path.expanduser(str(save_dir))))
         save_dir.mkdir(parents=True, exist_ok=True)
-
-        def _sanitize(name: str) -> str:
-            return "".join(c if c.isalnum() or c in ("-", "_", ".") else "_" for c in name)
-
         for r in results:
-            base = _sanitize(r.host)
+            base = _sanitize_host(r.host)
             (save_dir / f"{base}.stdout.txt").write_text(r.stdout or "", encoding="utf-8")
             (save_dir / f"{base}.stderr.txt").write_text(r.stderr or "", encoding="utf-8")
 
@@ -354,8 +691,210 @@ def run(
                     "stderr": r.stderr,
                     "command": host_to_command.get(r.host),
                 }
+                if r.usage is not None:
+                    record["usage"] = {
+                        "bytes_sent": r.usage.bytes_sent,
+                        "bytes_received": r.usage.bytes_received,
+                        "stdout_bytes": r.usage.stdout_bytes,
+                        "stderr_bytes": r.usage.stderr_bytes,
+                        "attempts": r.usage.attempts,
+                        "cpu_sec": round(r.usage.cpu_time, 6),
+                        "slot_sec": r.usage.slot_time,
+                    }
+                if loop_watchdog is not None:
+                    record["loop_stall_ms"] = round(loop_watchdog.stalled_during(r.started_at, r.ended_at) * 1000, 1)
                 f.write(json.dumps(record) + "\n")
+            if loop_watchdog is not None:
+                f.write(json.dumps({"timestamp": datetime.now(timezone.utc).isoformat(), "watchdog": loop_watchdog.report()}) + "\n")
+
+    if history_error is not None:
+        console.print(f"[red]History not recorded:[/red] {history_error}", highlight=False)
+        exit_code = exit_code or 1
 
     raise typer.Exit(code=exit_code)
 
 
+@app.command()
+def show(
+    archive: Path = typer.Argument(..., help="Archive written by 'scatter run --archive'"),
+    host: Optional[str] = typer.Argument(None, help="Host to print output for (omit to list hosts)"),
+    stderr: bool = typer.Option(False, "--stderr", help="Print stderr instead of stdout"),
+) -> None:
+    """Show one host's output from an archive, or list the hosts it contains."""
+    from .archive import ArchiveReader
+
+    try:
+        reader = ArchiveReader(Path(os.path.expandvars(os.path.expanduser(str(archive)))))
+    except (FileNotFoundError, ValueError) as exc:
+        raise typer.BadParameter(str(exc))
+
+    with reader:
+        if host is None:
+            from rich.table import Table
+
+            table = Table(title=f"Archive: {archive}", show_lines=False)
+            table.add_column("Host", style="bold")
+            table.add_column("Status")
+            table.add_column("Exit")
+            table.add_column("Duration (s)")
+            for h in reader.hosts():
+                meta = reader.meta(h)
+                exit_status = meta.get("exit_status")
+                table.add_row(
+                    h,
+                    "OK" if meta.get("ok") else "FAIL",
+                    "" if exit_status is None else str(exit_status),
+                    f"{float(meta.get('duration_sec') or 0.0):.2f}",
+                )
+            console.print(table)
+            return
+
+        try:
+            text = reader.stderr(host) if stderr else reader.stdout(host)
+        except KeyError as exc:
+            raise typer.BadParameter(str(exc.args[0]))
+        # Raw output, not markup-interpreted
+        sys.stdout.write(text)
+        sys.stdout.flush()
+
+
+@app.command()
+def diff(
+    store: Path = typer.Option(..., help="Store directory written by 'scatter run --store'"),
+    old_run: Optional[str] = typer.Argument(None, help="Older run id (default: second most recent run)"),
+    new_run: Optional[str] = typer.Argument(None, help="Newer run id (default: most recent run)"),
+) -> None:
+    """List hosts whose output changed between two stored runs."""
+    from .store import OutputStore
+
+    out_store = OutputStore(Path(os.path.expandvars(os.path.expanduser(str(store)))))
+    runs = out_store.runs()
+    if new_run is None:
+        new_run = runs[-1] if runs else None
+    if old_run is None:
+        earlier = [r for r in runs if new_run is not None and r < new_run]
+        old_run = earlier[-1] if earlier else None
+    if old_run is None or new_run is None:
+        raise typer.BadParameter("Need two stored runs to compare.")
+
+    try:
+        changes = out_store.diff(old_run, new_run)
+    except KeyError as exc:
+        raise typer.BadParameter(str(exc.args[0]))
+
+    console.print(f"Comparing {old_run} -> {new_run}")
+    for host in sorted(changes):
+        console.print(f"{changes[host]}: {host}", markup=False)
+    console.print(f"Changed hosts: {len(changes)}")
+
+
+@app.command()
+def history(
+    db: Path = typer.Option(..., help="History database written by 'scatter run --history-db'"),
+    host: Optional[str] = typer.Option(None, help="Host name or glob (e.g. 'web*')"),
+    failed: bool = typer.Option(False, help="Only failed results"),
+    exit_status: Optional[int] = typer.Option(None, "--exit", help="Only results with this exit status"),
+    error_class: Optional[str] = typer.Option(None, help="Only results with this error class (e.g. 'TimeoutError')"),
+    since: Optional[str] = typer.Option(None, help="Only results newer than this (e.g. 7d, 12h, 30m or an ISO date)"),
+    run_id: Optional[int] = typer.Option(None, help="Only results from this run"),
+    limit: int = typer.Option(50, min=1, help="Max rows to show"),
+) -> None:
+    """Query recorded per-host results, newest first."""
+    from .history import parse_since, query
+
+    try:
+        since_ts = parse_since(since) if since else None
+        rows = query(
+            Path(os.path.expandvars(os.path.expanduser(str(db)))),
+            host=host,
+            failed=failed,
+            exit_status=exit_status,
+            error_cls=error_class,
+            since=since_ts,
+            run_id=run_id,
+            limit=limit,
+        )
+    except (FileNotFoundError, ValueError) as exc:
+        raise typer.BadParameter(str(exc))
+
+    from rich.table import Table
+
+    table = Table(title="Run History", show_lines=False)
+    table.add_column("Finished (UTC)")
+    table.add_column("Run")
+    table.add_column("Host", style="bold")
+    table.add_column("Status")
+    table.add_column("Exit")
+    table.add_column("Duration (s)")
+    table.add_column("Error / stdout (first line)")
+    for row in rows:
+        finished = datetime.fromtimestamp(row["finished_at"], timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+        detail = row["error"] or ((row["stdout_preview"] or "").strip().splitlines() or [""])[0]
+        table.add_row(
+            finished,
+            str(row["run_id"]),
+            row["host"],
+            "OK" if row["ok"] else "FAIL",
+            "" if row["exit_status"] is None else str(row["exit_status"]),
+            "" if row["duration"] is None else f"{row['duration']:.2f}",
+            detail[:120],
+        )
+    console.print(table)
+    console.print(f"Rows: {len(rows)}")
+
+
+@app.command()
+def grep(
+    run_path: Path = typer.Argument(..., metavar="RUN", help="A --save-dir directory or --archive file written with --index"),
+    pattern: str = typer.Argument(..., help="Regular expression (or fixed string with -F)"),
+    ignore_case: bool = typer.Option(False, "--ignore-case", "-i", help="Case-insensitive match"),
+    fixed_strings: bool = typer.Option(False, "--fixed-strings", "-F", help="Treat PATTERN as a literal string"),
+    hosts_only: bool = typer.Option(False, "--hosts-only", "-l", help="Only print matching host names"),
+) -> None:
+    """Search indexed run outputs; exits 1 when nothing matches."""
+    from .textindex import SAVE_DIR_INDEX, IndexReader, search
+
+    run_path = Path(os.path.expandvars(os.path.expanduser(str(run_path))))
+    reader = None
+    if run_path.is_dir():
+        index_path = run_path / SAVE_DIR_INDEX
+
+        def read_doc(host: str, stream: str) -> str:
+            return (run_path / f"{_sanitize_host(host)}.{stream}.txt").read_text(encoding="utf-8")
+    else:
+        from .archive import ArchiveReader
+
+        index_path = Path(str(run_path) + ".idx")
+        try:
+            reader = ArchiveReader(run_path)
+        except (FileNotFoundError, ValueError) as exc:
+            raise typer.BadParameter(str(exc))
+
+        def read_doc(host: str, stream: str) -> str:
+            return reader.stderr(host) if stream == "stderr" else reader.stdout(host)
+
+    try:
+        idx = IndexReader(index_path)
+    except (FileNotFoundError, ValueError) as exc:
+        if reader is not None:
+            reader.close()
+        raise typer.BadParameter(f"{exc} (was the run made with --index?)")
+
+    matched = set()
+    try:
+        with idx:
+            for host, stream, line in search(idx, pattern, read_doc, ignore_case=ignore_case, fixed=fixed_strings):
+                if hosts_only:
+                    if host not in matched:
+                        console.print(host, markup=False, highlight=False)
+                else:
+                    label = host if stream == "stdout" else f"{host} [stderr]"
+                    console.print(f"{label}: {line}", markup=False, highlight=False)
+                matched.add(host)
+    except re.error as exc:
+        raise typer.BadParameter(f"Invalid pattern: {exc}")
+    finally:
+        if reader is not None:
+            reader.close()
+
+    raise typer.Exit(code=0 if matched else 1)
@@ -8,17 +8,52 @@ Highlights
   (e.g., ``false``, ``no``, ``0`` → ``off``; ``true``, ``on``, ``1`` → ``strict``).
 - Validation: raises ``FileNotFoundError`` for missing files and ``ValueError``
   when the inventory contains no hosts.
+- Streaming: the ``hosts`` sequence is parsed event-by-event (with libyaml's
+  ``CSafeLoader`` when available) so ``iter_hosts`` can hand hosts on as they
+  are parsed; host records use ``__slots__`` and share repeated strings.
+- Formats: besides YAML, inventories may be JSON, NDJSON, CSV/TSV or plain
+  host-per-line files (see ``FORMATS``), chosen by file extension or ``fmt``.
+  All formats share the same defaults/override semantics.
+- Host ranges: a ``host`` such as ``web[001-500].dc1`` or ``db{a,b}[1-8]``
+  expands into one host per name, all sharing the entry's settings (see
+  ``scatter.hostrange``).
+- Composition: ``include`` lists files or globs (relative to the including
+  file, e.g. ``inventory.d/*.yaml``) whose hosts, defaults and groups are
+  merged in; uncached files are parsed in parallel worker processes. The
+  including file's ``defaults`` win over those of included files.
+- Dynamic sources: ``include`` entries (or the inventory path itself) may be
+  ``exec:<command>`` or ``py:<module>:<function>`` sources returning JSON,
+  cached for a TTL and refreshed in the background (see ``scatter.dynamic``).
+- Groups: ``groups`` maps a name to an optional ``parent``, group ``defaults``
+  (``username``, ``port``, ``identity``, ``password``, ``command``, ``tags``)
+  and ``hosts``; hosts elsewhere join with ``group: <name>``. Settings resolve
+  host > group > parent group > global defaults and are flattened into each
+  host at load time; a host's tags gain its group names.
+- Caching: ``load_inventory(..., use_cache=True)`` reuses a compiled copy of an
+  unchanged file (see ``scatter.invcache``); ``env:`` references are still
+  resolved on every load.
 """
 
 from __future__ import annotations
 
+import csv
+import glob
+import json
 import os
+import sys
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
 import yaml
 
+from . import dynamic, hostrange, invcache
+
+# libyaml's C parser is several times faster than the pure-Python one
+_Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+_MERGE_TAG = "tag:yaml.org,2002:merge"
+_STR_TAG = "tag:yaml.org,2002:str"
+
 
 @dataclass
 class InventoryDefaults:
@@ -32,7 +67,7 @@ class InventoryDefaults:
     password: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class HostEntry:
     """A single host specification from the inventory."""
     host: str
@@ -65,42 +100,56 @@ class Inventory:
     hosts: List[HostEntry]
 
 
-def load_inventory(path: Path | str) -> Inventory:
-    """Load and parse an inventory YAML file into an ``Inventory``.
-
-    Expands ``env:VAR`` references for supported fields, normalizes known-hosts,
-    and validates that at least one host is present.
-    """
-    path = Path(path)
-    if not path.exists():
-        raise FileNotFoundError(f"Inventory file not found: {path}")
-
-    with path.open("r", encoding="utf-8") as f:
-        data = yaml.safe_load(f) or {}
-
-    def _resolve_env(value: Optional[str]) -> Optional[str]:
-        if not isinstance(value, str):
-            return value
-        value = value.strip()
-        if value.startswith("env:"):
-            env_key = value[4:].strip()
-            return os.environ.get(env_key)
+def _resolve_env(value: Optional[str]) -> Optional[str]:
+    if not isinstance(value, str):
         return value
+    value = value.strip()
+    if value.startswith("env:"):
+        env_key = value[4:].strip()
+        return os.environ.get(env_key)
+    return value
 
-    raw_defaults: Dict[str, Any] = data.get("defaults", {}) or {}
-
-    def _normalize_known_hosts(value: Any) -> str:
-        # Accept YAML booleans (off -> False) and strings
-        if isinstance(value, bool):
-            return "off" if value is False else "strict"
-        val = str(value).strip().lower()
-        if val in {"off", "no", "false", "0"}:
-            return "off"
-        if val in {"strict", "on", "true", "1"}:
-            return "strict"
-        # Default to strict if unknown
+
+def _normalize_known_hosts(value: Any) -> str:
+    # Accept YAML booleans (off -> False) and strings
+    if isinstance(value, bool):
+        return "off" if value is False else "strict"
+    val = str(value).strip().lower()
+    if val in {"off", "no", "false", "0"}:
+        return "off"
+    if val in {"strict", "on", "true", "1"}:
         return "strict"
-    defaults = InventoryDefaults(
+    # Default to strict if unknown
+    return "strict"
+
+
+_DEFAULT_KEYS = ("username", "port", "connect_timeout", "known_hosts", "pty", "identity", "password")
+
+_GROUP_KEYS = ("username", "port", "identity", "password", "command")
+
+# Raw host row, before env resolution: (host, username, port, tags, identity, password, command, group)
+HostRow = Tuple[str, Any, Any, Tuple[Any, ...], Any, Any, Any, Optional[str]]
+
+# Raw parsed file: (defaults, host rows, group definitions, include patterns)
+RawInventory = Tuple[Dict[str, Any], List[HostRow], Dict[str, Dict[str, Any]], List[str]]
+
+
+def _host_row(item: Dict[str, Any], group: Optional[str] = None) -> HostRow:
+    group = group or item.get("group")
+    return (
+        str(item["host"]),
+        item.get("username"),
+        item.get("port"),
+        tuple(item.get("tags", []) or ()),
+        item.get("identity"),
+        item.get("password"),
+        item.get("command"),
+        None if group is None else str(group),
+    )
+
+
+def _build_defaults(raw_defaults: Dict[str, Any]) -> InventoryDefaults:
+    return InventoryDefaults(
         username=raw_defaults.get("username"),
         port=int(raw_defaults.get("port", 22)),
         connect_timeout=float(raw_defaults.get("connect_timeout", 10.0)),
@@ -110,24 +159,589 @@ def load_inventory(path: Path | str) -> Inventory:
         password=_resolve_env(raw_defaults.get("password")),
     )
 
-    raw_hosts: List[Dict[str, Any]] = data.get("hosts", []) or []
-    hosts: List[HostEntry] = []
-    for item in raw_hosts:
-        hosts.append(
-            HostEntry(
-                host=str(item["host"]),
-                username=item.get("username"),
-                port=item.get("port"),
-                tags=list(item.get("tags", []) or []),
-                identity=_resolve_env(item.get("identity")),
-                password=_resolve_env(item.get("password")),
-                command=item.get("command"),
+
+class _HostBuilder:
+    """Build ``HostEntry`` records, sharing repeated values across hosts."""
+
+    def __init__(self) -> None:
+        self._values: Dict[Any, Any] = {}
+
+    def __call__(self, row: HostRow) -> HostEntry:
+        share = self._values.setdefault
+        host, username, port, tags, identity, password, command, _ = row
+        if identity is not None:
+            identity = _resolve_env(identity)
+        if password is not None:
+            password = _resolve_env(password)
+        return HostEntry(
+            host=sys.intern(host),
+            username=share(username, username),
+            port=port,
+            tags=list(share(tags, tags)),
+            identity=share(identity, identity),
+            password=share(password, password),
+            command=share(command, command),
+        )
+
+    def expand(self, row: HostRow) -> Iterator[HostEntry]:
+        """Build the entries for ``row``, one per name if its host is a range."""
+        template = self(row)
+        if not hostrange.has_range(template.host):
+            yield template
+            return
+        for name in hostrange.expand(template.host):
+            yield HostEntry(
+                host=sys.intern(name),
+                username=template.username,
+                port=template.port,
+                tags=list(template.tags),
+                identity=template.identity,
+                password=template.password,
+                command=template.command,
+            )
+
+
+def _construct(loader: Any, event: Any, anchors: Dict[str, Any]) -> Any:
+    """Build a Python value from the event stream starting at ``event``.
+
+    Mirrors ``SafeLoader`` semantics for plain data (implicit scalar typing,
+    anchors/aliases and ``<<`` merge keys) without composing a node graph for
+    the whole document.
+    """
+    if isinstance(event, yaml.AliasEvent):
+        try:
+            return anchors[event.anchor]
+        except KeyError:
+            raise yaml.composer.ComposerError(None, None, f"found undefined alias {event.anchor!r}", event.start_mark) from None
+    if isinstance(event, yaml.ScalarEvent):
+        tag = event.tag
+        if tag is None or tag == "!":
+            tag = loader.resolve(yaml.ScalarNode, event.value, event.implicit)
+        if tag == _STR_TAG:
+            value: Any = event.value
+        elif tag == _MERGE_TAG:
+            value = _MERGE_TAG
+        else:
+            node = yaml.ScalarNode(tag, event.value, event.start_mark, event.end_mark, style=event.style)
+            constructor = loader.yaml_constructors.get(tag) or loader.yaml_constructors[None]
+            value = constructor(loader, node)
+    elif isinstance(event, yaml.SequenceStartEvent):
+        value = []
+        while not loader.check_event(yaml.SequenceEndEvent):
+            value.append(_construct(loader, loader.get_event(), anchors))
+        loader.get_event()
+    elif isinstance(event, yaml.MappingStartEvent):
+        explicit: Dict[Any, Any] = {}
+        merged: Dict[Any, Any] = {}
+        while not loader.check_event(yaml.MappingEndEvent):
+            key = _construct(loader, loader.get_event(), anchors)
+            val = _construct(loader, loader.get_event(), anchors)
+            if key is _MERGE_TAG:
+                for source in val if isinstance(val, list) else [val]:
+                    for k, v in source.items():
+                        merged.setdefault(k, v)
+            else:
+                explicit[key] = val
+        loader.get_event()
+        value = {**merged, **explicit} if merged else explicit
+    else:
+        raise yaml.constructor.ConstructorError(None, None, f"unexpected event {event!r}", event.start_mark)
+    if getattr(event, "anchor", None):
+        anchors[event.anchor] = value
+    return value
+
+
+def _iter_yaml(path: Path) -> Iterator[Tuple[str, Any]]:
+    """Yield ``(key, value)`` for top-level inventory keys, and ``("host", item)``
+    for each entry of ``hosts`` as soon as it has been parsed."""
+    with path.open("rb") as f:
+        loader = _Loader(f)
+        anchors: Dict[str, Any] = {}
+        try:
+            loader.get_event()  # StreamStart
+            if loader.check_event(yaml.StreamEndEvent):
+                return
+            loader.get_event()  # DocumentStart
+            if not loader.check_event(yaml.MappingStartEvent):
+                if _construct(loader, loader.get_event(), anchors) is None:
+                    return
+                raise ValueError(f"Inventory must be a mapping: {path}")
+            loader.get_event()
+            while not loader.check_event(yaml.MappingEndEvent):
+                key = _construct(loader, loader.get_event(), anchors)
+                if key == "hosts" and loader.check_event(yaml.SequenceStartEvent):
+                    start = loader.get_event()
+                    # Kept only when anchored, so a later alias can refer to it
+                    items: Optional[List[Any]] = [] if start.anchor else None
+                    while not loader.check_event(yaml.SequenceEndEvent):
+                        item = _construct(loader, loader.get_event(), anchors)
+                        if items is not None:
+                            items.append(item)
+                        yield "host", item
+                    loader.get_event()
+                    if items is not None:
+                        anchors[start.anchor] = items
+                elif key == "hosts":
+                    # An alias (``hosts: *fleet``) or a value that is not a list
+                    yield from _host_items(_construct(loader, loader.get_event(), anchors), path)
+                else:
+                    yield str(key), _construct(loader, loader.get_event(), anchors)
+        finally:
+            loader.dispose()
+
+
+def _host_items(value: Any, origin: Any) -> Iterator[Tuple[str, Any]]:
+    """``("host", item)`` for each entry of a ``hosts`` value, which must be a list."""
+    if value is None:
+        return
+    if not isinstance(value, list):
+        raise ValueError(f"Inventory 'hosts' must be a list, not {type(value).__name__}: {origin}")
+    for item in value:
+        yield "host", item
+
+
+def _iter_json(path: Path) -> Iterator[Tuple[str, Any]]:
+    # The stdlib C decoder on the whole document beats any pure-Python
+    # incremental parser; use NDJSON for line-by-line streaming.
+    with path.open("r", encoding="utf-8") as f:
+        data = json.load(f)
+    return _iter_document(data, path)
+
+
+def _iter_document(data: Any, origin: Any) -> Iterator[Tuple[str, Any]]:
+    """Items of an already-decoded inventory: a mapping, or a bare list of hosts."""
+    if data is None:
+        return
+    if isinstance(data, list):
+        for item in data:
+            yield "host", item
+        return
+    if not isinstance(data, dict):
+        raise ValueError(f"Inventory must be a JSON object: {origin}")
+    for key, value in data.items():
+        if key == "hosts":
+            yield from _host_items(value, origin)
+        else:
+            yield key, value
+
+
+def _iter_ndjson(path: Path) -> Iterator[Tuple[str, Any]]:
+    """One JSON object per line: host entries, or ``{"defaults": {...}}``."""
+    with path.open("r", encoding="utf-8") as f:
+        for lineno, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            item = json.loads(line)
+            if not isinstance(item, dict):
+                raise ValueError(f"{path}:{lineno}: expected a JSON object")
+            if "defaults" in item and "host" not in item:
+                yield "defaults", item["defaults"]
+            else:
+                yield "host", item
+
+
+def _parse_directive(line: str) -> Optional[Dict[str, Any]]:
+    """Parse a ``# defaults: key=value ...`` comment used by CSV and line formats."""
+    body = line.lstrip("#").strip()
+    if not body.startswith("defaults:"):
+        return None
+    defaults: Dict[str, Any] = {}
+    for pair in body[len("defaults:"):].split():
+        key, sep, value = pair.partition("=")
+        if not sep:
+            raise ValueError(f"Invalid defaults directive (expected key=value): {pair!r}")
+        # YAML scalar typing so ``port=2222`` / ``known_hosts=off`` mean what they do in YAML
+        defaults[key] = yaml.load(value, Loader=_Loader)
+    return defaults
+
+
+def _split_tags(value: str) -> List[str]:
+    return [t for t in value.replace(";", " ").replace(",", " ").split() if t]
+
+
+def _iter_csv(path: Path, delimiter: str) -> Iterator[Tuple[str, Any]]:
+    """Header row names ``HostEntry`` fields; ``tags`` are ``;``/space separated."""
+    with path.open("r", encoding="utf-8", newline="") as f:
+
+        def data_lines() -> Iterator[str]:
+            for line in f:
+                if line.lstrip().startswith("#"):
+                    directive = _parse_directive(line)
+                    if directive is not None:
+                        pending.append(directive)
+                    continue
+                yield line
+
+        pending: List[Dict[str, Any]] = []
+        reader = csv.DictReader(data_lines(), delimiter=delimiter)
+        for record in reader:
+            while pending:
+                yield "defaults", pending.pop(0)
+            if reader.fieldnames is None or "host" not in reader.fieldnames:
+                raise ValueError(f"CSV inventory needs a 'host' column: {path}")
+            item: Dict[str, Any] = {k: v.strip() for k, v in record.items() if k and v is not None and v.strip()}
+            if "host" not in item:
+                continue
+            if "port" in item:
+                item["port"] = int(item["port"])
+            if "tags" in item:
+                item["tags"] = _split_tags(item["tags"])
+            yield "host", item
+        while pending:
+            yield "defaults", pending.pop(0)
+
+
+def _iter_lines(path: Path) -> Iterator[Tuple[str, Any]]:
+    """One ``[user@]host[:port]`` per line; ``#`` starts a comment."""
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            stripped = line.strip()
+            if not stripped:
+                continue
+            if stripped.startswith("#"):
+                directive = _parse_directive(stripped)
+                if directive is not None:
+                    yield "defaults", directive
+                continue
+            target = stripped.split("#", 1)[0].strip()
+            item: Dict[str, Any] = {}
+            user, sep, rest = target.rpartition("@")
+            if sep:
+                item["username"] = user
+                target = rest
+            # host:port, but leave bare IPv6 addresses alone
+            host, sep, port = target.rpartition(":")
+            if sep and port.isdigit() and ":" not in host:
+                item["port"] = int(port)
+                target = host
+            item["host"] = target
+            yield "host", item
+
+
+# Inventory formats and the extensions that select them
+FORMATS: Dict[str, Tuple[str, ...]] = {
+    "yaml": (".yaml", ".yml"),
+    "json": (".json",),
+    "ndjson": (".ndjson", ".jsonl"),
+    "csv": (".csv",),
+    "tsv": (".tsv",),
+    "lines": (".txt", ".list", ".hosts"),
+}
+
+
+def detect_format(path: Path) -> str:
+    """Format for ``path`` by extension; unknown extensions are treated as YAML."""
+    suffix = path.suffix.lower()
+    for fmt, suffixes in FORMATS.items():
+        if suffix in suffixes:
+            return fmt
+    return "yaml"
+
+
+def _iter_raw(path: Path, fmt: Optional[str] = None) -> Iterator[Tuple[str, Any]]:
+    fmt = fmt or detect_format(path)
+    if fmt == "yaml":
+        return _iter_yaml(path)
+    if fmt == "json":
+        return _iter_json(path)
+    if fmt == "ndjson":
+        return _iter_ndjson(path)
+    if fmt == "csv":
+        return _iter_csv(path, ",")
+    if fmt == "tsv":
+        return _iter_csv(path, "\t")
+    if fmt == "lines":
+        return _iter_lines(path)
+    raise ValueError(f"Unknown inventory format: {fmt!r} (expected one of {', '.join(FORMATS)})")
+
+
+def _parse_raw(path: Path, fmt: Optional[str] = None) -> RawInventory:
+    """Parse one inventory file into raw defaults, host rows, groups and includes (no env resolution)."""
+    return _collect_raw(_iter_raw(path, fmt), path)
+
+
+def _collect_raw(items: Iterable[Tuple[str, Any]], origin: Any) -> RawInventory:
+    raw_defaults: Dict[str, Any] = {}
+    rows: List[HostRow] = []
+    groups: Dict[str, Dict[str, Any]] = {}
+    includes: List[Any] = []
+    for key, value in items:
+        if key == "host":
+            rows.append(_host_row(value))
+        elif key == "defaults":
+            raw_defaults = {k: v for k, v in (value or {}).items() if k in _DEFAULT_KEYS}
+        elif key == "groups":
+            _add_groups(origin, groups, rows, value)
+        elif key == "include":
+            includes.extend(_include_entries(value))
+    return raw_defaults, rows, groups, includes
+
+
+def _include_entries(value: Any) -> List[Any]:
+    """``include`` as a list: one path/source string or ``{exec|py: ...}`` mapping, or a list of them."""
+    return [value] if isinstance(value, (str, dict)) else list(value or [])
+
+
+def _fetch_dynamic(source: dynamic.Source, use_cache: bool = True) -> RawInventory:
+    data = dynamic.fetch(source) if use_cache else dynamic.refresh(source)
+    raw_defaults, rows, groups, _ = _collect_raw(_iter_document(data, source), source)
+    # A dynamic source's output is data only; it cannot pull in further files
+    return raw_defaults, rows, groups, []
+
+
+# An inventory file, or a dynamic source
+_Node = Union[Path, dynamic.Source]
+
+
+def _add_groups(path: Any, groups: Dict[str, Dict[str, Any]], rows: List[HostRow], value: Any) -> None:
+    if not isinstance(value, dict):
+        raise ValueError(f"'groups' must be a mapping of group names: {path}")
+    for name, spec in value.items():
+        name = str(name)
+        spec = spec or {}
+        defaults = spec.get("defaults") or {}
+        groups[name] = {
+            "parent": None if spec.get("parent") is None else str(spec["parent"]),
+            "defaults": {k: v for k, v in defaults.items() if k in _GROUP_KEYS},
+            "tags": tuple(defaults.get("tags") or ()),
+            "source": str(path),
+        }
+        for item in spec.get("hosts") or []:
+            rows.append(_host_row(item, group=name))
+
+
+def _include_paths(base: _Node, patterns: List[Any]) -> List[_Node]:
+    if not isinstance(base, Path):
+        return []
+    paths: List[_Node] = []
+    for pattern in patterns:
+        if dynamic.is_source(pattern):
+            paths.append(dynamic.parse_source(pattern, base.parent))
+            continue
+        expanded = os.path.expandvars(os.path.expanduser(str(pattern)))
+        full = expanded if os.path.isabs(expanded) else str(base.parent / expanded)
+        if glob.has_magic(full):
+            paths.extend(Path(p) for p in sorted(glob.glob(full)) if os.path.isfile(p))
+        elif os.path.exists(full):
+            paths.append(Path(full))
+        else:
+            raise FileNotFoundError(f"Included inventory file not found: {full} (from {base})")
+    return paths
+
+
+# Below this much uncached input, worker start-up costs more than it saves
+_PARALLEL_MIN_BYTES = 1 << 20
+
+
+def _parse_files(files: List[Tuple[Path, str]]) -> List[RawInventory]:
+    """Parse several files, in worker processes when there is enough to do."""
+    workers = min(len(files), os.cpu_count() or 1)
+    if workers > 1 and sum(p.stat().st_size for p, _ in files) >= _PARALLEL_MIN_BYTES:
+        from concurrent.futures import ProcessPoolExecutor
+        from concurrent.futures.process import BrokenProcessPool
+
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                return list(pool.map(_parse_raw, [p for p, _ in files], [f for _, f in files]))
+        except (OSError, NotImplementedError, BrokenProcessPool):
+            # No usable process pool (e.g. restricted sandboxes): parse inline
+            pass
+    return [_parse_raw(p, f) for p, f in files]
+
+
+def _load_tree(
+    path: _Node,
+    fmt: str,
+    use_cache: bool,
+    cache_dir: Optional[Path],
+    first: Optional[RawInventory] = None,
+    dynamic_cache: bool = True,
+) -> Dict[_Node, RawInventory]:
+    """Raw contents of ``path`` and every file or source it includes, directly or not.
+
+    Files are loaded breadth-first; each level's cache misses are parsed together.
+    Dynamic sources are fetched through their TTL cache unless ``dynamic_cache``
+    is false.
+    """
+    loaded: Dict[_Node, RawInventory] = {}
+    level: List[Tuple[_Node, str]] = [(path, fmt)]
+    while level:
+        misses: List[Tuple[Path, str]] = []
+        for p, f in level:
+            if p == path and first is not None:
+                loaded[p] = first
+                continue
+            if not isinstance(p, Path):
+                loaded[p] = _fetch_dynamic(p, dynamic_cache)
+                continue
+            raw = invcache.load(p, variant=f, cache_dir=cache_dir) if use_cache else None
+            if raw is None:
+                misses.append((p, f))
+            else:
+                loaded[p] = raw
+        for (p, f), raw in zip(misses, _parse_files(misses)):
+            loaded[p] = raw
+            if use_cache:
+                invcache.store(p, raw, variant=f, cache_dir=cache_dir)
+        next_level: List[Tuple[_Node, str]] = []
+        for p, _ in level:
+            for inc in _include_paths(p, loaded[p][3]):
+                if isinstance(inc, Path):
+                    inc = inc.resolve()
+                if inc not in loaded and all(inc != q for q, _ in next_level):
+                    next_level.append((inc, detect_format(inc) if isinstance(inc, Path) else ""))
+        level = next_level
+    return loaded
+
+
+def _assemble(path: _Node, tree: Dict[_Node, RawInventory]) -> Tuple[Dict[str, Any], List[HostRow]]:
+    """Merge a loaded include tree and flatten group settings into host rows."""
+    defaults: Dict[str, Any] = {}
+    rows: List[HostRow] = []
+    groups: Dict[str, Dict[str, Any]] = {}
+    seen: set = set()
+
+    def visit(p: _Node) -> None:
+        if p in seen:
+            return
+        seen.add(p)
+        file_defaults, file_rows, file_groups, includes = tree[p]
+        rows.extend(file_rows)
+        for name, spec in file_groups.items():
+            if name in groups:
+                raise ValueError(f"Group {name!r} is defined in both {groups[name]['source']} and {spec['source']}")
+            groups[name] = spec
+        for inc in _include_paths(p, includes):
+            visit(inc.resolve() if isinstance(inc, Path) else inc)
+        # The including file's defaults take precedence over its includes'
+        defaults.update(file_defaults)
+
+    visit(path)
+    return defaults, _flatten(rows, groups) if groups or any(r[7] is not None for r in rows) else rows
+
+
+def _flatten(rows: List[HostRow], groups: Dict[str, Dict[str, Any]]) -> List[HostRow]:
+    resolved: Dict[str, Tuple[Dict[str, Any], Tuple[Any, ...]]] = {}
+
+    def resolve(name: str, chain: Tuple[str, ...] = ()) -> Tuple[Dict[str, Any], Tuple[Any, ...]]:
+        if name in resolved:
+            return resolved[name]
+        if name in chain:
+            raise ValueError(f"Group parent cycle: {' -> '.join(chain + (name,))}")
+        spec = groups.get(name)
+        if spec is None:
+            raise ValueError(f"Unknown inventory group: {name!r}")
+        fields: Dict[str, Any] = {}
+        tags: Tuple[Any, ...] = ()
+        if spec["parent"] is not None:
+            fields, tags = resolve(spec["parent"], chain + (name,))
+        fields = {**fields, **{k: v for k, v in spec["defaults"].items() if v is not None}}
+        tags = tags + (name,) + spec["tags"]
+        resolved[name] = (fields, tags)
+        return resolved[name]
+
+    for name in groups:
+        resolve(name)
+
+    flat: List[HostRow] = []
+    for row in rows:
+        group = row[7]
+        if group is None:
+            flat.append(row)
+            continue
+        fields, group_tags = resolve(group)
+        host, username, port, tags, identity, password, command, _ = row
+        flat.append(
+            (
+                host,
+                fields.get("username") if username is None else username,
+                fields.get("port") if port is None else port,
+                tuple(dict.fromkeys(tags + group_tags)),
+                fields.get("identity") if identity is None else identity,
+                fields.get("password") if password is None else password,
+                fields.get("command") if command is None else command,
+                group,
             )
         )
+    return flat
 
-    if not hosts:
-        raise ValueError("Inventory contains no hosts.")
 
-    return Inventory(defaults=defaults, hosts=hosts)
+def iter_hosts(path: Path | str, fmt: Optional[str] = None) -> Iterator[HostEntry]:
+    """Yield ``HostEntry`` records as they are parsed from an inventory file.
+
+    Use this to start work on early hosts before a large file is fully parsed.
+    Hosts that belong to a group, and hosts from included files, follow once
+    the top-level file has been read. Unlike ``load_inventory`` it does not
+    raise on an empty host list.
+    """
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"Inventory file not found: {path}")
+    fmt = fmt or detect_format(path)
+    build = _HostBuilder()
+    raw_defaults: Dict[str, Any] = {}
+    deferred: List[HostRow] = []
+    groups: Dict[str, Dict[str, Any]] = {}
+    includes: List[Any] = []
+    for key, value in _iter_raw(path, fmt):
+        if key == "host":
+            row = _host_row(value)
+            if row[7] is None:
+                yield from build.expand(row)
+            else:
+                deferred.append(row)
+        elif key == "defaults":
+            raw_defaults = {k: v for k, v in (value or {}).items() if k in _DEFAULT_KEYS}
+        elif key == "groups":
+            _add_groups(path, groups, deferred, value)
+        elif key == "include":
+            includes.extend(_include_entries(value))
+    if deferred or includes:
+        root = path.resolve()
+        tree = _load_tree(root, fmt, False, None, first=(raw_defaults, deferred, groups, includes))
+        for row in _assemble(root, tree)[1]:
+            yield from build.expand(row)
+
 
+def load_inventory(
+    path: Path | str,
+    use_cache: bool = False,
+    cache_dir: Optional[Path] = None,
+    fmt: Optional[str] = None,
+    dynamic_ttl: Optional[float] = None,
+    dynamic_cache: bool = True,
+    require_hosts: bool = True,
+) -> Inventory:
+    """Load and parse an inventory file into an ``Inventory``.
+
+    Expands ``env:VAR`` references for supported fields, normalizes known-hosts,
+    and validates that at least one host is present. ``fmt`` overrides format
+    detection by extension (see ``FORMATS``) for the top-level file. Included
+    files are merged and group settings flattened into each host. With
+    ``use_cache`` each parsed file is cached on disk and reused while it is
+    unchanged. ``path`` may also be a dynamic source (``exec:...``/``py:...``),
+    cached for ``dynamic_ttl`` seconds (0 fetches it now). With ``dynamic_cache``
+    false every dynamic source is fetched now, ignoring cached results. With
+    ``require_hosts`` false an inventory without hosts (e.g. only ``defaults``)
+    is accepted.
+    """
+    root: _Node
+    if dynamic.is_source(str(path)):
+        root = dynamic.parse_source(str(path), Path.cwd(), ttl=dynamic_ttl)
+        tree = _load_tree(root, "", use_cache, cache_dir, dynamic_cache=dynamic_cache)
+    else:
+        path = Path(path)
+        if not path.exists():
+            raise FileNotFoundError(f"Inventory file not found: {path}")
+        root = path.resolve()
+        tree = _load_tree(root, fmt or detect_format(path), use_cache, cache_dir, dynamic_cache=dynamic_cache)
+    raw_defaults, rows = _assemble(root, tree)
+
+    build = _HostBuilder()
+    hosts: List[HostEntry] = [entry for row in rows for entry in build.expand(row)]
+
+    if not hosts and require_hosts:
+        raise ValueError("Inventory contains no hosts.")
 
+    return Inventory(defaults=_build_defaults(raw_defaults), hosts=hosts)
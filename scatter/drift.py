@@ -0,0 +1,104 @@
+"""Changed-since-last-run detection for drift checks.
+
+Compares each host's result fingerprint as it arrives against the last
+fingerprint recorded for the same host and command in the history database
+(``scatter.history``'s ``last_outputs`` table). Only fingerprints are loaded up
+front; previous outputs are fetched per changed host, and only when diffs were
+requested.
+"""
+
+from __future__ import annotations
+
+import difflib
+import sqlite3
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .history import connect, fingerprint
+from .store import blob_hash
+
+
+@dataclass
+class Change:
+    """A host whose result differs from the previous run of the same command."""
+    host: str
+    status: str  # "new" | "changed"
+    previous_stdout: Optional[str] = None
+    previous_stderr: Optional[str] = None
+
+
+class ChangeTracker:
+    """Classify results as changed/unchanged against stored fingerprints."""
+
+    def __init__(self, db_path: Path | str, commands: Iterable[str], with_previous_output: bool = False) -> None:
+        self.with_previous_output = with_previous_output
+        self._conn: sqlite3.Connection = connect(db_path)
+        hashes = sorted({blob_hash(c) for c in commands})
+        self._previous: Dict[Tuple[str, str], str] = {}
+        # Chunked to stay under SQLite's bound-parameter limit
+        for i in range(0, len(hashes), 500):
+            chunk = hashes[i : i + 500]
+            rows = self._conn.execute(
+                "SELECT host, command_hash, fingerprint FROM last_outputs"
+                f" WHERE command_hash IN ({','.join('?' * len(chunk))})",
+                chunk,
+            )
+            for host, command_hash, fp in rows:
+                self._previous[(host, command_hash)] = fp
+        self._command_hashes: Dict[str, str] = {}
+        self.unchanged = 0
+
+    def check(self, host: str, command: str, exit_status: Optional[int], stdout: str, stderr: str) -> Optional[Change]:
+        """Return a ``Change`` for a new or changed host, ``None`` if unchanged."""
+        command_hash = self._command_hashes.get(command)
+        if command_hash is None:
+            command_hash = self._command_hashes.setdefault(command, blob_hash(command))
+        fp = fingerprint(exit_status, blob_hash(stdout or ""), blob_hash(stderr or ""))
+        previous = self._previous.get((host, command_hash))
+        if previous == fp:
+            self.unchanged += 1
+            return None
+        if previous is None:
+            return Change(host, "new")
+        change = Change(host, "changed")
+        if self.with_previous_output:
+            row = self._conn.execute(
+                "SELECT stdout_z, stderr_z FROM last_outputs WHERE host = ? AND command_hash = ?",
+                (host, command_hash),
+            ).fetchone()
+            if row is not None and row[0] is not None:
+                change.previous_stdout = zlib.decompress(row[0]).decode("utf-8")
+                change.previous_stderr = zlib.decompress(row[1]).decode("utf-8")
+        return change
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def unified_diff(change: Change, stdout: str, stderr: str) -> List[str]:
+    """Unified diff lines of stdout (and stderr, if it changed) against the previous run."""
+    lines: List[str] = []
+    if change.previous_stdout is None:
+        return lines
+    lines.extend(
+        difflib.unified_diff(
+            change.previous_stdout.splitlines(),
+            (stdout or "").splitlines(),
+            f"{change.host} stdout (previous)",
+            f"{change.host} stdout (current)",
+            lineterm="",
+        )
+    )
+    if (change.previous_stderr or "") != (stderr or ""):
+        lines.extend(
+            difflib.unified_diff(
+                (change.previous_stderr or "").splitlines(),
+                (stderr or "").splitlines(),
+                f"{change.host} stderr (previous)",
+                f"{change.host} stderr (current)",
+                lineterm="",
+            )
+        )
+    return lines
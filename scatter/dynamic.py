@@ -0,0 +1,234 @@
+"""Dynamic inventory sources with a TTL cache and background refresh.
+
+A dynamic source produces inventory data as JSON, in the same shapes the JSON
+file format accepts (an object with ``defaults``/``hosts``/``groups``, or a
+bare list of host objects):
+
+- ``exec:<command line>``: run an executable (e.g. a CMDB export script) and
+  read its stdout. Relative programs resolve against the including file.
+- ``py:<module>:<function>``: call a Python function returning the data (or a
+  JSON string). ``py:<name>`` looks up ``name`` in the ``scatter.inventory``
+  entry point group instead.
+
+Sources appear in an inventory's ``include`` list, either as a string or as a
+mapping with a ``ttl`` in seconds (``{exec: ./cmdb.sh, ttl: 600}``), or are
+passed directly as ``--inventory exec:...``.
+
+Caching
+- Results are stored under ``$XDG_CACHE_HOME/scatter/dynamic`` with the time
+  they were fetched, owner-only (directory 0700, files 0600).
+- Within the TTL the cached result is used as-is.
+- Past the TTL the cached result is still used, and a detached
+  ``python -m scatter.dynamic`` process (``scatter __refresh-inventory`` in
+  the standalone binary) refreshes it, so runs never wait on a slow source. A lock file keeps concurrent runs from starting more than one
+  refresh per source.
+- A source with no cached result, or a TTL of 0, is fetched synchronously.
+  ``scatter run --no-inventory-cache`` fetches every source synchronously too.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sys
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+DEFAULT_TTL = 300.0
+# Upper bound on a single source invocation
+EXEC_TIMEOUT = 600.0
+# A refresh lock older than this is assumed to belong to a crashed refresher
+_LOCK_STALE_AFTER = EXEC_TIMEOUT + 60.0
+ENTRY_POINT_GROUP = "scatter.inventory"
+PREFIXES = ("exec:", "py:")
+# First argument that makes the standalone binary run the background refresher
+REFRESH_COMMAND = "__refresh-inventory"
+
+
+@dataclass(frozen=True)
+class Source:
+    """A dynamic inventory source."""
+    kind: str  # "exec" | "py"
+    target: str
+    ttl: float = DEFAULT_TTL
+    cwd: Optional[str] = None
+
+    def __str__(self) -> str:
+        return f"{self.kind}:{self.target}"
+
+
+def is_source(spec: Any) -> bool:
+    """Whether an ``include`` entry or ``--inventory`` value names a dynamic source."""
+    if isinstance(spec, dict):
+        return "exec" in spec or "py" in spec
+    return isinstance(spec, str) and spec.startswith(PREFIXES)
+
+
+def parse_source(spec: Any, base_dir: Optional[Path] = None, ttl: Optional[float] = None) -> Source:
+    """Build a ``Source`` from ``exec:...``/``py:...`` or ``{exec|py: ..., ttl: N}``."""
+    cwd = str(base_dir) if base_dir is not None else None
+    if isinstance(spec, dict):
+        kind = "exec" if "exec" in spec else "py"
+        target = str(spec[kind])
+        spec_ttl = spec.get("ttl")
+        return Source(kind, target, float(ttl if ttl is not None else spec_ttl if spec_ttl is not None else DEFAULT_TTL), cwd)
+    kind, _, target = str(spec).partition(":")
+    if kind not in ("exec", "py") or not target.strip():
+        raise ValueError(f"Invalid dynamic inventory source: {spec!r}")
+    return Source(kind, target.strip(), float(ttl if ttl is not None else DEFAULT_TTL), cwd)
+
+
+def default_dir() -> Path:
+    """Per-user cache location (``$XDG_CACHE_HOME/scatter/dynamic``)."""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return Path(base) / "scatter" / "dynamic"
+
+
+def _entry_path(cache_dir: Path, source: Source) -> Path:
+    key = hashlib.sha256(f"{source.kind}\0{source.target}\0{source.cwd}".encode("utf-8")).hexdigest()[:32]
+    return cache_dir / f"{key}.json"
+
+
+def run_source(source: Source) -> Any:
+    """Invoke ``source`` and return its decoded data."""
+    import subprocess
+
+    if source.kind == "exec":
+        import shlex
+
+        argv = shlex.split(source.target)
+        if source.cwd and not os.path.isabs(argv[0]) and os.sep in argv[0]:
+            argv[0] = os.path.join(source.cwd, argv[0])
+        try:
+            proc = subprocess.run(argv, cwd=source.cwd, capture_output=True, text=True, timeout=EXEC_TIMEOUT)
+        except (OSError, subprocess.TimeoutExpired) as exc:
+            raise ValueError(f"Dynamic inventory {source} failed: {exc}") from exc
+        if proc.returncode != 0:
+            detail = (proc.stderr.strip().splitlines() or [""])[-1]
+            raise ValueError(f"Dynamic inventory {source} exited with {proc.returncode}: {detail}")
+        output: Any = proc.stdout
+    else:
+        func = _load_callable(source.target)
+        output = func()
+    if isinstance(output, (str, bytes)):
+        try:
+            return json.loads(output)
+        except ValueError as exc:
+            raise ValueError(f"Dynamic inventory {source} did not return JSON: {exc}") from exc
+    return output
+
+
+def _load_callable(target: str) -> Any:
+    import importlib
+
+    module_name, sep, attr = target.partition(":")
+    if sep:
+        return getattr(importlib.import_module(module_name), attr)
+    from importlib.metadata import entry_points
+
+    for ep in entry_points(group=ENTRY_POINT_GROUP):
+        if ep.name == target:
+            return ep.load()
+    raise ValueError(f"No '{ENTRY_POINT_GROUP}' entry point named {target!r}")
+
+
+def refresh(source: Source, cache_dir: Optional[Path] = None) -> Any:
+    """Invoke ``source`` now and store the result in the cache."""
+    data = run_source(source)
+    entry = _entry_path(cache_dir or default_dir(), source)
+    # Results may carry credentials: keep the cache owner-only
+    entry.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+    tmp = entry.with_name(f".{entry.name}.{os.getpid()}.tmp")
+    with os.fdopen(os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "w", encoding="utf-8") as f:
+        json.dump({"fetched_at": time.time(), "data": data}, f)
+    os.replace(tmp, entry)
+    return data
+
+
+def _read_cached(entry: Path) -> Optional[Dict[str, Any]]:
+    try:
+        cached = json.loads(entry.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if not isinstance(cached, dict) or "data" not in cached:
+        return None
+    return cached
+
+
+def refresher_command(*args: str) -> list[str]:
+    """Command line running ``refresher_main(args)`` in a new process.
+
+    A frozen (PyInstaller) build's ``sys.executable`` is the scatter binary
+    itself, which has no ``-m``: it is re-invoked with ``REFRESH_COMMAND``
+    instead (handled by ``standalone_entry.py``).
+    """
+    if getattr(sys, "frozen", False):
+        return [sys.executable, REFRESH_COMMAND, *args]
+    return [sys.executable, "-m", "scatter.dynamic", *args]
+
+
+def _start_refresh(source: Source, cache_dir: Path) -> bool:
+    """Spawn a detached refresher unless one is already running for ``source``."""
+    import subprocess
+
+    lock = _entry_path(cache_dir, source).with_suffix(".lock")
+    try:
+        if time.time() - lock.stat().st_mtime > _LOCK_STALE_AFTER:
+            lock.unlink()
+    except OSError:
+        pass
+    try:
+        fd = os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except OSError:
+        # Already locked by another run's refresher, or the cache is unwritable
+        return False
+    os.close(fd)
+    try:
+        subprocess.Popen(
+            refresher_command(json.dumps(asdict(source)), str(cache_dir), str(lock)),
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+    except OSError:
+        lock.unlink(missing_ok=True)
+        return False
+    return True
+
+
+def fetch(source: Source, cache_dir: Optional[Path] = None, background: bool = True) -> Any:
+    """Data for ``source``: cached when fresh, stale-while-refreshing when expired."""
+    cache_dir = cache_dir or default_dir()
+    if source.ttl <= 0:
+        return refresh(source, cache_dir)
+    cached = _read_cached(_entry_path(cache_dir, source))
+    if cached is None:
+        return refresh(source, cache_dir)
+    age = time.time() - float(cached.get("fetched_at", 0))
+    if age < source.ttl:
+        return cached["data"]
+    if background:
+        _start_refresh(source, cache_dir)
+        return cached["data"]
+    return refresh(source, cache_dir)
+
+
+def refresher_main(argv: list[str]) -> int:
+    """Background refresher entry point: ``SOURCE_JSON CACHE_DIR LOCK``."""
+    source_json, cache_dir, lock = argv
+    try:
+        refresh(Source(**json.loads(source_json)), Path(cache_dir))
+    except Exception:
+        # Keep serving the previous result; the next expired run retries
+        return 1
+    finally:
+        Path(lock).unlink(missing_ok=True)
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover - exercised via subprocess
+    sys.exit(refresher_main(sys.argv[1:]))
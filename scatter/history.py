@@ -0,0 +1,344 @@
+"""SQLite run-history database.
+
+Records every run and per-host result so questions like "when did host X last
+fail" are indexed queries rather than greps over JSONL logs.
+
+Design notes
+- Writes happen on a background thread that owns the SQLite connection.
+  ``HistoryRecorder.add`` only enqueues a row, so the event loop never waits on
+  disk; the writer drains the queue in batches, one transaction per batch.
+  A write error stops the writer; later rows are dropped and ``close`` raises
+  the error, so a run can finish and report it at the end.
+- The database runs in WAL mode so ``scatter history`` can query while a run is
+  still writing.
+- Outputs are not stored, only their SHA-256 (same addressing as
+  ``scatter.store``) and a short stdout preview.
+- ``last_outputs`` keeps the latest fingerprint per host and command so the
+  next run can tell which hosts changed (see ``scatter.drift``). The outputs
+  themselves are kept there only when the recorder is asked to
+  (``keep_outputs``), for rendering diffs. A recorder without it keeps
+  previously stored outputs while the fingerprint is unchanged and clears
+  them when it moves, so a diff is never taken against an older output.
+- ``durations`` keeps a moving average of how long each host holds a
+  concurrency slot per command, for ``scatter run --schedule lpt`` (see
+  ``scatter.scheduling``). Only results where the command ran are counted.
+"""
+
+from __future__ import annotations
+
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .store import blob_hash
+
+PREVIEW_CHARS = 200
+_BATCH_SIZE = 500
+_BATCH_WAIT = 0.2  # seconds to wait for more rows before committing a batch
+DURATION_WEIGHT = 0.3  # weight of the newest sample in ``durations.estimate``
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    started_at REAL NOT NULL,
+    ended_at REAL,
+    host_count INTEGER,
+    ok_count INTEGER,
+    failed_count INTEGER
+);
+CREATE TABLE IF NOT EXISTS commands (
+    hash TEXT PRIMARY KEY,
+    text TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    host TEXT NOT NULL,
+    command_hash TEXT,
+    finished_at REAL NOT NULL,
+    duration REAL,
+    ok INTEGER NOT NULL,
+    exit_status INTEGER,
+    error_class TEXT,
+    error TEXT,
+    stdout_hash TEXT,
+    stderr_hash TEXT,
+    stdout_preview TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_results_host_time ON results(host, finished_at);
+CREATE INDEX IF NOT EXISTS ix_results_exit_time ON results(exit_status, finished_at);
+CREATE INDEX IF NOT EXISTS ix_results_error_time ON results(error_class, finished_at);
+CREATE INDEX IF NOT EXISTS ix_results_failed_time ON results(finished_at) WHERE ok = 0;
+CREATE INDEX IF NOT EXISTS ix_results_run ON results(run_id);
+CREATE TABLE IF NOT EXISTS last_outputs (
+    host TEXT NOT NULL,
+    command_hash TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    stdout_z BLOB,
+    stderr_z BLOB,
+    PRIMARY KEY (host, command_hash)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS durations (
+    command_hash TEXT NOT NULL,
+    host TEXT NOT NULL,
+    estimate REAL NOT NULL,
+    samples INTEGER NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (command_hash, host)
+) WITHOUT ROWID;
+"""
+
+
+def default_path() -> Path:
+    """Per-user history database location (``$XDG_STATE_HOME/scatter``)."""
+    base = os.environ.get("XDG_STATE_HOME") or os.path.join(os.path.expanduser("~"), ".local", "state")
+    return Path(base) / "scatter" / "history.db"
+
+
+def connect(path: Path | str) -> sqlite3.Connection:
+    """Open (and create if needed) a history database."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(path))
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def fingerprint(exit_status: Optional[int], stdout_hash: str, stderr_hash: str) -> str:
+    """Fingerprint of one host's observable result, from its output hashes."""
+    return blob_hash(f"{exit_status}\0{stdout_hash}\0{stderr_hash}")
+
+
+def error_class(error: Optional[str]) -> Optional[str]:
+    """Extract the exception class from an ``ExecResult.error`` string."""
+    if not error:
+        return None
+    return error.split(":", 1)[0].strip() or None
+
+
+class HistoryRecorder:
+    """Background-thread writer for one run's results."""
+
+    def __init__(self, path: Path | str, keep_outputs: bool = False) -> None:
+        self.path = Path(path)
+        self.keep_outputs = keep_outputs
+        self.run_id: Optional[int] = None
+        self._queue: "queue.Queue[Optional[Tuple[Any, ...]]]" = queue.Queue()
+        self._started_at = time.time()
+        self._counts = [0, 0]  # ok, failed
+        self._ready = threading.Event()
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._writer, name="scatter-history", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._error is not None:
+            raise self._error
+
+    def add(self, host: str, stdout: str, stderr: str, meta: Optional[Dict[str, Any]] = None) -> None:
+        if self._error is not None:
+            return  # the writer has stopped; close() raises its error
+        meta = meta or {}
+        ok = bool(meta.get("ok"))
+        self._counts[0 if ok else 1] += 1
+        command = meta.get("command")
+        stdout_hash = blob_hash(stdout or "")
+        stderr_hash = blob_hash(stderr or "")
+        self._queue.put(
+            (
+                host,
+                command,
+                blob_hash(command) if command else None,
+                time.time(),
+                meta.get("duration_sec"),
+                int(ok),
+                meta.get("exit_status"),
+                error_class(meta.get("error")),
+                meta.get("error"),
+                stdout_hash,
+                stderr_hash,
+                (stdout or "")[:PREVIEW_CHARS],
+                # Not inserted into ``results``: last-output bookkeeping only
+                fingerprint(meta.get("exit_status"), stdout_hash, stderr_hash),
+                (stdout or "", stderr or "") if self.keep_outputs else None,
+                # Time the host held a concurrency slot, when its command ran
+                meta.get("slot_sec", meta.get("duration_sec")) if meta.get("exit_status") is not None else None,
+            )
+        )
+
+    def close(self) -> None:
+        """Flush pending rows, finalize the run row and stop the writer.
+
+        Raises the error that stopped the writer, if any.
+        """
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        if self._error is not None:
+            raise self._error
+
+    def _writer(self) -> None:
+        try:
+            conn = connect(self.path)
+            with conn:
+                cur = conn.execute("INSERT INTO runs (started_at) VALUES (?)", (self._started_at,))
+            self.run_id = cur.lastrowid
+        except BaseException as exc:  # noqa: BLE001 - surfaced to the constructor
+            self._error = exc
+            self._ready.set()
+            return
+        self._ready.set()
+
+        try:
+            done = False
+            while not done:
+                batch: List[Tuple[Any, ...]] = []
+                item = self._queue.get()
+                deadline = time.monotonic() + _BATCH_WAIT
+                while True:
+                    if item is None:
+                        done = True
+                        break
+                    batch.append(item)
+                    if len(batch) >= _BATCH_SIZE:
+                        break
+                    try:
+                        item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                    except queue.Empty:
+                        break
+                if batch:
+                    with conn:
+                        conn.executemany(
+                            "INSERT OR IGNORE INTO commands (hash, text) VALUES (?, ?)",
+                            {(row[2], row[1]) for row in batch if row[2] is not None},
+                        )
+                        conn.executemany(
+                            "INSERT INTO results (run_id, host, command_hash, finished_at, duration, ok, exit_status,"
+                            " error_class, error, stdout_hash, stderr_hash, stdout_preview)"
+                            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                            [(self.run_id, row[0], *row[2:12]) for row in batch],
+                        )
+                        conn.executemany(
+                            "INSERT INTO last_outputs (host, command_hash, fingerprint, updated_at, stdout_z, stderr_z)"
+                            " VALUES (?, ?, ?, ?, ?, ?)"
+                            " ON CONFLICT (host, command_hash) DO UPDATE SET fingerprint = excluded.fingerprint,"
+                            " updated_at = excluded.updated_at,"
+                            # Without outputs, stored ones stay only while they still match the fingerprint
+                            " stdout_z = CASE WHEN excluded.stdout_z IS NOT NULL THEN excluded.stdout_z"
+                            " WHEN excluded.fingerprint = fingerprint THEN stdout_z END,"
+                            " stderr_z = CASE WHEN excluded.stderr_z IS NOT NULL THEN excluded.stderr_z"
+                            " WHEN excluded.fingerprint = fingerprint THEN stderr_z END",
+                            [
+                                (
+                                    row[0],
+                                    row[2],
+                                    row[12],
+                                    row[3],
+                                    zlib.compress(row[13][0].encode("utf-8")) if row[13] else None,
+                                    zlib.compress(row[13][1].encode("utf-8")) if row[13] else None,
+                                )
+                                for row in batch
+                                if row[2] is not None
+                            ],
+                        )
+                        conn.executemany(
+                            "INSERT INTO durations (command_hash, host, estimate, samples, updated_at)"
+                            " VALUES (?, ?, ?, 1, ?)"
+                            " ON CONFLICT (command_hash, host) DO UPDATE SET"
+                            f" estimate = estimate + {DURATION_WEIGHT} * (excluded.estimate - estimate),"
+                            " samples = samples + 1, updated_at = excluded.updated_at",
+                            [(row[2], row[0], row[14], row[3]) for row in batch if row[2] is not None and row[14] is not None],
+                        )
+
+            with conn:
+                conn.execute(
+                    "UPDATE runs SET ended_at = ?, host_count = ?, ok_count = ?, failed_count = ? WHERE id = ?",
+                    (time.time(), sum(self._counts), self._counts[0], self._counts[1], self.run_id),
+                )
+        except BaseException as exc:  # noqa: BLE001 - surfaced by close()
+            self._error = exc
+        finally:
+            conn.close()
+
+
+_SINCE_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([smhdw])\s*$")
+_SINCE_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+
+def parse_since(value: str, now: Optional[float] = None) -> float:
+    """Parse ``7d``/``12h``/``30m`` style offsets or an ISO date into a timestamp."""
+    m = _SINCE_RE.match(value)
+    if m:
+        return (now if now is not None else time.time()) - float(m.group(1)) * _SINCE_UNITS[m.group(2)]
+    try:
+        dt = datetime.fromisoformat(value.strip())
+    except ValueError:
+        raise ValueError(f"Invalid time: {value!r} (use e.g. 7d, 12h, 30m or an ISO date)") from None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def query(
+    path: Path | str,
+    host: Optional[str] = None,
+    failed: bool = False,
+    exit_status: Optional[int] = None,
+    error_cls: Optional[str] = None,
+    since: Optional[float] = None,
+    run_id: Optional[int] = None,
+    limit: int = 50,
+) -> List[Dict[str, Any]]:
+    """Return result rows matching all given filters, newest first.
+
+    ``host`` may be an exact name or a glob (``web*``); globs with a literal
+    prefix still use the host index.
+    """
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"History database not found: {path}")
+    clauses: List[str] = []
+    params: List[Any] = []
+    if host is not None:
+        if any(c in host for c in "*?["):
+            clauses.append("r.host GLOB ?")
+        else:
+            clauses.append("r.host = ?")
+        params.append(host)
+    if failed:
+        clauses.append("r.ok = 0")
+    if exit_status is not None:
+        clauses.append("r.exit_status = ?")
+        params.append(exit_status)
+    if error_cls is not None:
+        clauses.append("r.error_class = ?")
+        params.append(error_cls)
+    if since is not None:
+        clauses.append("r.finished_at >= ?")
+        params.append(since)
+    if run_id is not None:
+        clauses.append("r.run_id = ?")
+        params.append(run_id)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    sql = (
+        "SELECT r.run_id, r.host, r.finished_at, r.duration, r.ok, r.exit_status, r.error_class, r.error,"
+        " r.stdout_hash, r.stdout_preview, c.text AS command"
+        f" FROM results r LEFT JOIN commands c ON c.hash = r.command_hash {where}"
+        " ORDER BY r.finished_at DESC LIMIT ?"
+    )
+    params.append(int(limit))
+    conn = connect(path)
+    conn.row_factory = sqlite3.Row
+    try:
+        return [dict(row) for row in conn.execute(sql, params)]
+    finally:
+        conn.close()
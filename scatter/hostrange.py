@@ -0,0 +1,195 @@
+"""Host range expressions: lazy expansion and range-aware compaction.
+
+Syntax
+- ``[001-500]``: numeric range; zero padding on either bound pads every value.
+- ``[1,3,7-9]``: comma-separated items, each a value or a range.
+- ``[a-f]``: single-letter range.
+- ``{a,b,c}``: alternatives; each may itself contain ranges (``{web[1-2],db}``).
+
+Several groups expand as a cartesian product, left to right:
+``db{a,b}[1-2]`` gives ``dba1``, ``dba2``, ``dbb1``, ``dbb2``. Names are
+generated one at a time, so a large range costs nothing until it is consumed.
+Brackets whose contents are not a range (e.g. ``[::1]``) are kept literally.
+
+``compact`` goes the other way and folds names back into the shortest range
+expressions, e.g. ``web[003,017-019].dc1`` for a list of failed hosts.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Callable, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+_ITEM = r"(?:[0-9]+(?:-[0-9]+)?|[A-Za-z](?:-[A-Za-z])?)"
+_RANGE_BODY = re.compile(rf"{_ITEM}(?:,{_ITEM})*")
+_DIGITS = re.compile(r"(\d+)")
+
+# A part yields the strings it can take, in order
+_Part = Callable[[], Iterable[str]]
+
+
+def has_range(text: str) -> bool:
+    """Cheap check for whether ``text`` may contain a range expression."""
+    return "[" in text or "{" in text
+
+
+def _range_values(body: str) -> Iterator[str]:
+    for item in body.split(","):
+        lo, sep, hi = item.partition("-")
+        if not sep:
+            yield item
+        elif lo.isdigit():
+            width = max(len(lo), len(hi)) if (lo.startswith("0") or hi.startswith("0")) else 0
+            a, b = int(lo), int(hi)
+            step = 1 if b >= a else -1
+            for n in range(a, b + step, step):
+                yield str(n).zfill(width)
+        else:
+            a, b = ord(lo), ord(hi)
+            step = 1 if b >= a else -1
+            for c in range(a, b + step, step):
+                yield chr(c)
+
+
+def _closing(text: str, start: int, open_ch: str, close_ch: str) -> int:
+    depth = 0
+    for i in range(start, len(text)):
+        if text[i] == open_ch:
+            depth += 1
+        elif text[i] == close_ch:
+            depth -= 1
+            if depth == 0:
+                return i
+    return -1
+
+
+def _split_top(text: str, seps: str) -> List[str]:
+    """Split on any of ``seps`` outside brackets and braces."""
+    parts: List[str] = []
+    depth = 0
+    current: List[str] = []
+    for ch in text:
+        if ch in "[{":
+            depth += 1
+        elif ch in "]}":
+            depth = max(depth - 1, 0)
+        if depth == 0 and ch in seps:
+            parts.append("".join(current))
+            current = []
+        else:
+            current.append(ch)
+    parts.append("".join(current))
+    return parts
+
+
+def _parse(text: str) -> List[_Part]:
+    parts: List[_Part] = []
+    literal: List[str] = []
+
+    def flush() -> None:
+        if literal:
+            value = "".join(literal)
+            parts.append(lambda: (value,))
+            literal.clear()
+
+    i = 0
+    while i < len(text):
+        ch = text[i]
+        if ch == "[":
+            end = text.find("]", i)
+            body = text[i + 1 : end] if end != -1 else ""
+            if end != -1 and _RANGE_BODY.fullmatch(body):
+                flush()
+                parts.append(lambda body=body: _range_values(body))
+                i = end + 1
+                continue
+        elif ch == "{":
+            end = _closing(text, i, "{", "}")
+            if end != -1:
+                alternatives = _split_top(text[i + 1 : end], ",")
+                if len(alternatives) > 1:
+                    flush()
+                    parsed = [_parse(alt) for alt in alternatives]
+                    parts.append(lambda parsed=parsed: (name for alt in parsed for name in _product(alt)))
+                    i = end + 1
+                    continue
+        literal.append(ch)
+        i += 1
+    flush()
+    return parts
+
+
+def _product(parts: Sequence[_Part], prefix: str = "") -> Iterator[str]:
+    if not parts:
+        yield prefix
+        return
+    first, rest = parts[0], parts[1:]
+    for value in first():
+        yield from _product(rest, prefix + value)
+
+
+def expand(pattern: str) -> Iterator[str]:
+    """Lazily yield the host names described by ``pattern``."""
+    if not has_range(pattern):
+        return iter((pattern,))
+    return _product(_parse(pattern))
+
+
+def expand_list(text: str) -> Iterator[str]:
+    """Expand a comma/space separated list of patterns (e.g. a ``--hosts`` value)."""
+    for item in _split_top(text, ", \t\n"):
+        if item:
+            yield from expand(item)
+
+
+def _format_numbers(numbers: List[int], width: int) -> str:
+    numbers = sorted(set(numbers))
+    items: List[str] = []
+    start = prev = numbers[0]
+    for n in numbers[1:] + [None]:  # type: ignore[list-item]
+        if n is not None and n == prev + 1:
+            prev = n
+            continue
+        lo, hi = str(start).zfill(width), str(prev).zfill(width)
+        items.append(lo if start == prev else f"{lo}-{hi}")
+        if n is not None:
+            start = prev = n
+    return ",".join(items)
+
+
+def compact(hosts: Iterable[str]) -> List[str]:
+    """Fold host names into range expressions, keeping first-seen order.
+
+    Names are grouped when they differ in exactly one run of digits of the same
+    width; other names are returned unchanged.
+    """
+    names = list(dict.fromkeys(hosts))
+    order = {name: i for i, name in enumerate(names)}
+    tokens = {name: _DIGITS.split(name) for name in names}
+    result: Dict[str, int] = {}
+    pending = names
+    max_runs = max((len(t) // 2 for t in tokens.values()), default=0)
+    # Try the rightmost digit run first (usually the host number), then earlier ones
+    for run in range(max_runs - 1, -1, -1):
+        pos = 2 * run + 1
+        groups: Dict[Tuple[Tuple[str, ...], int], List[str]] = {}
+        rest: List[str] = []
+        for name in pending:
+            t = tokens[name]
+            if pos >= len(t):
+                rest.append(name)
+                continue
+            key = (tuple(t[:pos]) + ("",) + tuple(t[pos + 1 :]), len(t[pos]))
+            groups.setdefault(key, []).append(name)
+        for (_, width), members in groups.items():
+            if len(members) == 1:
+                rest.append(members[0])
+                continue
+            t = tokens[members[0]]
+            numbers = [int(tokens[m][pos]) for m in members]
+            expr = "".join(t[:pos]) + f"[{_format_numbers(numbers, width)}]" + "".join(t[pos + 1 :])
+            result[expr] = min(order[m] for m in members)
+        pending = rest
+    for name in pending:
+        result[name] = order[name]
+    return sorted(result, key=result.__getitem__)
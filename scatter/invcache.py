@@ -0,0 +1,97 @@
+"""On-disk cache of parsed inventories.
+
+Stores the raw parsed contents of an inventory file (defaults mapping, one
+tuple per host, group definitions and include patterns, before ``env:``
+resolution) in ``marshal`` format, so unchanged inventories skip YAML parsing
+entirely. Each included file has its own entry. Environment-dependent fields
+are kept as written (e.g. ``env:DB_PASSWORD``) and resolved by the loader
+every time.
+
+Invalidation
+- Entries are keyed by the inventory's absolute path (and load variant).
+- A matching mtime and size is trusted as-is.
+- Otherwise the content hash decides: equal content (e.g. after ``touch``)
+  refreshes the stored stat info, different content is a miss.
+- Format version and Python version are part of the header; ``marshal`` data
+  is only read back by the interpreter version that wrote it.
+
+Entries are written owner-only (directory 0700, files 0600).
+
+Cache failures never break loading: unreadable entries are misses and
+unwritable directories are ignored.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import marshal
+import os
+import secrets
+import sys
+from pathlib import Path
+from typing import Any, Optional, Tuple
+
+FORMAT_VERSION = 2
+_TAG = ("scatter-inventory", FORMAT_VERSION, sys.version_info[:2])
+
+
+def default_dir() -> Path:
+    """Per-user cache location (``$XDG_CACHE_HOME/scatter/inventory``)."""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return Path(base) / "scatter" / "inventory"
+
+
+def content_hash(path: Path) -> str:
+    h = hashlib.blake2b(digest_size=20)
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _entry_path(cache_dir: Path, path: Path, variant: str) -> Path:
+    key = hashlib.sha256(f"{path.resolve()}\0{variant}".encode("utf-8")).hexdigest()[:32]
+    return cache_dir / f"{key}.bin"
+
+
+def load(path: Path, variant: str = "", cache_dir: Optional[Path] = None) -> Optional[Any]:
+    """Return the cached raw payload for ``path``, or ``None`` on a miss."""
+    entry = _entry_path(cache_dir or default_dir(), path, variant)
+    try:
+        tag, stat_key, digest, payload = marshal.loads(entry.read_bytes())
+    except (OSError, ValueError, EOFError, TypeError):
+        return None
+    if tag != _TAG:
+        return None
+    st = path.stat()
+    if stat_key == (st.st_mtime_ns, st.st_size):
+        return payload
+    if digest == content_hash(path):
+        # Same content under a new mtime: refresh the stat key for next time
+        _write(entry, (_TAG, (st.st_mtime_ns, st.st_size), digest, payload))
+        return payload
+    return None
+
+
+def store(path: Path, payload: Any, variant: str = "", cache_dir: Optional[Path] = None) -> None:
+    """Cache ``payload`` (marshal-able builtins only) for ``path``."""
+    st = path.stat()
+    record: Tuple[Any, ...] = (_TAG, (st.st_mtime_ns, st.st_size), content_hash(path), payload)
+    _write(_entry_path(cache_dir or default_dir(), path, variant), record)
+
+
+def _write(entry: Path, record: Tuple[Any, ...]) -> None:
+    try:
+        data = marshal.dumps(record)
+    except ValueError:
+        # Inventory holds values marshal cannot encode (e.g. YAML timestamps)
+        return
+    try:
+        # Entries hold host lists and credentials as written: keep them private
+        entry.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        tmp = entry.with_name(f".{entry.name}.{secrets.token_hex(4)}.tmp")
+        with os.fdopen(os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600), "wb") as f:
+            f.write(data)
+        os.replace(tmp, entry)
+    except OSError:
+        pass
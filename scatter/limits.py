@@ -0,0 +1,209 @@
+"""Per-group concurrency limits under the global ``--limit``.
+
+``scatter run --group-limit SPEC=N`` caps how many hosts of a group run at
+once, e.g. to avoid saturating a small remote datacenter's link while the
+main one uses the rest of ``--limit``.
+
+Group specs
+- ``tag:NAME``: hosts carrying the tag. A glob (``tag:dc*``) makes one group
+  per matching tag, so ``tag:dc*=5`` allows 5 hosts in each datacenter.
+- ``cidr:NETWORK``: hosts whose address is in the network
+  (``cidr:10.20.0.0/16``). Only IP-literal host names are matched; names are
+  not resolved.
+- ``attr:NAME``: one group per distinct value of a host attribute:
+  ``username``, ``port`` or ``domain`` (the host name after its first dot;
+  IP-literal hosts have none). ``username`` and ``port`` are the effective
+  values, after inventory and command-line defaults, when per-host
+  ``ExecOptions`` are given.
+
+A host may be in several groups and then needs spare capacity in all of them.
+
+``GroupLimiter`` hands out slots itself instead of stacking semaphores: a
+host waiting for a saturated group holds nothing, and when capacity frees
+up the earliest-queued host whose groups all have room starts next. Hosts
+queue by their group combination, and only the head of each queue is
+considered, so a dispatch costs O(combinations), not O(waiting hosts).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import fnmatch
+import ipaddress
+import itertools
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple
+
+from .config import HostEntry
+from .models import ExecOptions
+
+KINDS = ("tag", "cidr", "attr")
+ATTRIBUTES = ("username", "port", "domain")
+
+
+@dataclass(frozen=True)
+class GroupLimit:
+    """One parsed ``--group-limit`` option."""
+    kind: str  # "tag" | "cidr" | "attr"
+    pattern: str
+    limit: int
+
+
+def parse_group_limit(spec: str) -> GroupLimit:
+    """``"tag:dc*=5"`` -> ``GroupLimit("tag", "dc*", 5)``."""
+    group, sep, value = spec.rpartition("=")
+    kind, colon, pattern = group.partition(":")
+    if not sep or not colon or not pattern:
+        raise ValueError(f"Invalid group limit {spec!r}; expected tag:NAME=N, cidr:NETWORK=N or attr:NAME=N")
+    if kind not in KINDS:
+        raise ValueError(f"Unknown group kind {kind!r} in {spec!r} (expected one of {', '.join(KINDS)})")
+    try:
+        limit = int(value)
+    except ValueError:
+        raise ValueError(f"Invalid limit {value!r} in {spec!r}") from None
+    if limit < 1:
+        raise ValueError(f"Group limit must be at least 1 in {spec!r}")
+    if kind == "cidr":
+        try:
+            pattern = str(ipaddress.ip_network(pattern, strict=False))
+        except ValueError as exc:
+            raise ValueError(f"Invalid network in {spec!r}: {exc}") from None
+    elif kind == "attr" and pattern not in ATTRIBUTES:
+        raise ValueError(f"Unknown attribute {pattern!r} in {spec!r} (expected one of {', '.join(ATTRIBUTES)})")
+    return GroupLimit(kind, pattern, limit)
+
+
+def _attribute(host: HostEntry, name: str, default_port: int, options: Optional[ExecOptions]) -> Optional[str]:
+    if name == "username":
+        return options.username if options is not None else host.username
+    if name == "port":
+        return str((options.port if options is not None else host.port) or default_port)
+    try:
+        ipaddress.ip_address(host.host.strip("[]"))
+        return None  # an address has no domain
+    except ValueError:
+        pass
+    _, dot, domain = host.host.partition(".")
+    return domain if dot and domain else None
+
+
+def host_groups(
+    hosts: Sequence[HostEntry],
+    limits: Sequence[GroupLimit],
+    default_port: int = 22,
+    options: Optional[Sequence[ExecOptions]] = None,
+) -> Tuple[List[Tuple[str, ...]], Dict[str, int]]:
+    """Group names for each host (in order) and the limit of every group.
+
+    ``options`` holds each host's effective ``ExecOptions`` (same order as
+    ``hosts``); without it ``attr:username``/``attr:port`` read the host entry.
+
+    Group names read like their spec: ``tag:dc1``, ``cidr:10.20.0.0/16``,
+    ``attr:domain=dc1.example.com``. When specs overlap on a group, the
+    lowest limit wins.
+    """
+    capacities: Dict[str, int] = {}
+    shared: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+    networks = {lim.pattern: ipaddress.ip_network(lim.pattern) for lim in limits if lim.kind == "cidr"}
+    result: List[Tuple[str, ...]] = []
+    for i, h in enumerate(hosts):
+        names: List[str] = []
+        address: Any = None
+        for lim in limits:
+            if lim.kind == "tag":
+                found = [f"tag:{t}" for t in h.tags if fnmatch.fnmatchcase(t, lim.pattern)]
+            elif lim.kind == "cidr":
+                if address is None:
+                    try:
+                        address = ipaddress.ip_address(h.host.strip("[]"))
+                    except ValueError:
+                        address = False
+                found = [f"cidr:{lim.pattern}"] if address is not False and address in networks[lim.pattern] else []
+            else:
+                value = _attribute(h, lim.pattern, default_port, options[i] if options is not None else None)
+                found = [f"attr:{lim.pattern}={value}"] if value is not None else []
+            for name in found:
+                if name not in names:
+                    names.append(name)
+                capacities[name] = min(capacities.get(name, lim.limit), lim.limit)
+        key = tuple(sorted(names))
+        result.append(shared.setdefault(key, key))
+    return result, capacities
+
+
+class GroupLimiter:
+    """Hand out concurrency slots under a global limit and per-group limits."""
+
+    def __init__(self, limit: int, capacities: Dict[str, int]) -> None:
+        self.free = limit
+        self.group_free = dict(capacities)
+        self._queues: Dict[Tuple[str, ...], Deque[Tuple[int, "asyncio.Future[None]"]]] = {}
+        self._seq = itertools.count()
+
+    def slot(self, groups: Tuple[str, ...]) -> "GroupSlot":
+        """An ``async with`` slot for a host in ``groups`` (usable as ``run_on_host``'s semaphore)."""
+        return GroupSlot(self, groups)
+
+    def _has_room(self, groups: Tuple[str, ...]) -> bool:
+        return self.free > 0 and all(self.group_free[g] > 0 for g in groups)
+
+    def _take(self, groups: Tuple[str, ...]) -> None:
+        self.free -= 1
+        for g in groups:
+            self.group_free[g] -= 1
+
+    async def acquire(self, groups: Tuple[str, ...]) -> None:
+        # No queued host can run right now (see _dispatch), so a host with room may go first
+        if self._has_room(groups):
+            self._take(groups)
+            return
+        fut: "asyncio.Future[None]" = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(groups, deque()).append((next(self._seq), fut))
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                # Granted just before the cancellation arrived: hand the slot on
+                self.release(groups)
+            raise
+
+    def release(self, groups: Tuple[str, ...]) -> None:
+        self.free += 1
+        for g in groups:
+            self.group_free[g] += 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Grant slots to the earliest-queued hosts that have room, until none does."""
+        while self.free > 0:
+            best: Optional[Tuple[int, Tuple[str, ...]]] = None
+            for groups, queue in list(self._queues.items()):
+                while queue and queue[0][1].done():  # cancelled while waiting
+                    queue.popleft()
+                if not queue:
+                    del self._queues[groups]
+                    continue
+                if (best is None or queue[0][0] < best[0]) and self._has_room(groups):
+                    best = (queue[0][0], groups)
+            if best is None:
+                return
+            _, fut = self._queues[best[1]].popleft()
+            self._take(best[1])
+            fut.set_result(None)
+
+
+class GroupSlot:
+    """One host's slot in a ``GroupLimiter``."""
+
+    __slots__ = ("_limiter", "_groups")
+
+    def __init__(self, limiter: GroupLimiter, groups: Tuple[str, ...]) -> None:
+        self._limiter = limiter
+        self._groups = groups
+
+    async def __aenter__(self) -> None:
+        await self._limiter.acquire(self._groups)
+
+    async def __aexit__(self, *exc: Any) -> None:
+        self._limiter.release(self._groups)
@@ -0,0 +1,273 @@
+"""Prometheus/OpenMetrics metrics for ``scatter run``.
+
+``RunMetrics`` is fed per-phase timings through ``scatter.ssh.phase_observer``
+and each host's ``ExecResult`` as it completes. It can be scraped during the
+run (``--metrics-listen``, served from a background thread so a busy event
+loop does not delay scrapes) and/or written at the end as a node-exporter
+textfile (``--metrics-textfile``).
+
+Histograms use fixed buckets: memory is constant however many hosts a run
+has. Label values are bounded too (phases, output streams, error classes).
+Updates come from the event loop while ``render`` may run on the HTTP
+thread, so labelled series are added, and copied for rendering, under a lock.
+
+Metrics
+- ``scatter_hosts_started_total``: hosts that acquired a concurrency slot.
+- ``scatter_hosts_succeeded_total`` / ``scatter_hosts_failed_total{error_class}``:
+  completed hosts; ``error_class`` is the exception type, or ``NonZeroExit``.
+- ``scatter_inflight_sessions``: hosts currently holding a slot.
+- ``scatter_retries_total``: connection retries (backoffs taken).
+- ``scatter_output_bytes_total{stream}``: stdout/stderr bytes received.
+- ``scatter_transport_bytes_total{direction}``: SSH transport bytes ``sent``
+  and ``received``, handshakes and retries included.
+- ``scatter_connection_attempts_total``: SSH connections opened.
+- ``scatter_client_cpu_seconds_total``: client CPU time spent on hosts' traffic.
+- ``scatter_phase_duration_seconds{phase}``: histogram per phase (``queue``,
+  ``dns``, ``connect``, ``handshake``, ``auth``, ``exec``, ``drain``, ``close``).
+- ``scatter_host_duration_seconds``: histogram of whole per-host durations.
+- ``scatter_run_last_completion_timestamp_seconds``: set when the run ends.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from bisect import bisect_left
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+DEFAULT_BUCKETS: Tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Histogram:
+    """Cumulative histogram over fixed bucket bounds (constant memory)."""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def lines(self, name: str, labels: str = "") -> List[str]:
+        sep = "," if labels else ""
+        out: List[str] = []
+        cumulative = 0
+        for bound, n in zip(self.bounds, self.counts):
+            cumulative += n
+            out.append(f'{name}_bucket{{{labels}{sep}le="{_fmt(bound)}"}} {cumulative}')
+        out.append(f'{name}_bucket{{{labels}{sep}le="+Inf"}} {self.count}')
+        suffix = f"{{{labels}}}" if labels else ""
+        out.append(f"{name}_sum{suffix} {_fmt(self.sum)}")
+        out.append(f"{name}_count{suffix} {self.count}")
+        return out
+
+
+def _fmt(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() and abs(value) < 1e15 else repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def error_class(result: Any) -> str:
+    """Label value for a failed result: the exception type name or ``NonZeroExit``."""
+    if result.error:
+        return result.error.split(":", 1)[0].strip() or "Error"
+    return "NonZeroExit"
+
+
+class RunMetrics:
+    """Counters, gauges and histograms for one run."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(buckets)
+        self.started = 0
+        self.succeeded = 0
+        self.failed: Dict[str, int] = {}
+        self.inflight = 0
+        self.retries = 0
+        self.output_bytes = {"stdout": 0, "stderr": 0}
+        self.transport_bytes = {"sent": 0, "received": 0}
+        self.attempts = 0
+        self.cpu_seconds = 0.0
+        self.phases: Dict[str, Histogram] = {}
+        self.host_duration = Histogram(self.buckets)
+        self.completed_at: Optional[float] = None
+        self._lock = threading.Lock()  # guards adding keys to ``failed``/``phases``
+
+    # --- inputs -----------------------------------------------------------
+
+    def observe_phase(self, host: str, phase: str, start: float, end: float) -> None:
+        """``scatter.ssh.phase_observer`` callback."""
+        if phase == "slot":
+            self.inflight -= 1
+            return
+        if phase == "queue":
+            self.started += 1
+            self.inflight += 1
+        elif phase == "backoff":
+            self.retries += 1
+            return
+        hist = self.phases.get(phase)
+        if hist is None:
+            with self._lock:
+                hist = self.phases[phase] = Histogram(self.buckets)
+        hist.observe(end - start)
+
+    def observe_result(self, result: Any) -> None:
+        """Count a completed host's ``ExecResult``."""
+        if result.ok:
+            self.succeeded += 1
+        else:
+            cls = error_class(result)
+            with self._lock:
+                self.failed[cls] = self.failed.get(cls, 0) + 1
+        usage = result.usage
+        if usage is not None:
+            self.output_bytes["stdout"] += usage.stdout_bytes
+            self.output_bytes["stderr"] += usage.stderr_bytes
+            self.transport_bytes["sent"] += usage.bytes_sent
+            self.transport_bytes["received"] += usage.bytes_received
+            self.attempts += usage.attempts
+            self.cpu_seconds += usage.cpu_time
+        else:
+            self.output_bytes["stdout"] += len(result.stdout.encode("utf-8", "surrogateescape")) if result.stdout else 0
+            self.output_bytes["stderr"] += len(result.stderr.encode("utf-8", "surrogateescape")) if result.stderr else 0
+        self.host_duration.observe(result.duration)
+
+    def finish(self) -> None:
+        self.completed_at = time.time()
+
+    # --- output -----------------------------------------------------------
+
+    def render(self) -> str:
+        """Prometheus text exposition format."""
+        with self._lock:
+            failed = sorted(self.failed.items())
+            phases = sorted(self.phases.items())
+        lines = [
+            "# HELP scatter_hosts_started_total Hosts that acquired a concurrency slot.",
+            "# TYPE scatter_hosts_started_total counter",
+            f"scatter_hosts_started_total {self.started}",
+            "# HELP scatter_hosts_succeeded_total Hosts whose command exited 0.",
+            "# TYPE scatter_hosts_succeeded_total counter",
+            f"scatter_hosts_succeeded_total {self.succeeded}",
+            "# HELP scatter_hosts_failed_total Failed hosts by error class.",
+            "# TYPE scatter_hosts_failed_total counter",
+        ]
+        for cls, n in failed:
+            lines.append(f'scatter_hosts_failed_total{{error_class="{_escape(cls)}"}} {n}')
+        lines += [
+            "# HELP scatter_inflight_sessions Hosts currently holding a concurrency slot.",
+            "# TYPE scatter_inflight_sessions gauge",
+            f"scatter_inflight_sessions {self.inflight}",
+            "# HELP scatter_retries_total Connection retries.",
+            "# TYPE scatter_retries_total counter",
+            f"scatter_retries_total {self.retries}",
+            "# HELP scatter_output_bytes_total Command output bytes received.",
+            "# TYPE scatter_output_bytes_total counter",
+        ]
+        for stream, n in self.output_bytes.items():
+            lines.append(f'scatter_output_bytes_total{{stream="{stream}"}} {n}')
+        lines += [
+            "# HELP scatter_transport_bytes_total SSH transport bytes, handshakes and retries included.",
+            "# TYPE scatter_transport_bytes_total counter",
+        ]
+        for direction, n in self.transport_bytes.items():
+            lines.append(f'scatter_transport_bytes_total{{direction="{direction}"}} {n}')
+        lines += [
+            "# HELP scatter_connection_attempts_total SSH connections opened.",
+            "# TYPE scatter_connection_attempts_total counter",
+            f"scatter_connection_attempts_total {self.attempts}",
+            "# HELP scatter_client_cpu_seconds_total Client CPU time spent processing hosts' traffic.",
+            "# TYPE scatter_client_cpu_seconds_total counter",
+            f"scatter_client_cpu_seconds_total {_fmt(self.cpu_seconds)}",
+        ]
+        lines += [
+            "# HELP scatter_phase_duration_seconds Duration of each phase of a host's run.",
+            "# TYPE scatter_phase_duration_seconds histogram",
+        ]
+        for phase, hist in phases:
+            lines += hist.lines("scatter_phase_duration_seconds", f'phase="{_escape(phase)}"')
+        lines += [
+            "# HELP scatter_host_duration_seconds Total duration per host, including queue wait.",
+            "# TYPE scatter_host_duration_seconds histogram",
+        ]
+        lines += self.host_duration.lines("scatter_host_duration_seconds")
+        if self.completed_at is not None:
+            lines += [
+                "# HELP scatter_run_last_completion_timestamp_seconds When the run finished.",
+                "# TYPE scatter_run_last_completion_timestamp_seconds gauge",
+                f"scatter_run_last_completion_timestamp_seconds {_fmt(self.completed_at)}",
+            ]
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path: Path) -> None:
+        """Write atomically, as node-exporter's textfile collector requires."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp.write_text(self.render(), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def serve(self, listen: str) -> "MetricsServer":
+        """Serve ``/metrics`` on ``[HOST:]PORT`` from a background thread."""
+        return MetricsServer(self, *parse_listen(listen))
+
+
+def parse_listen(listen: str) -> Tuple[str, int]:
+    """``"9464"`` -> ``("127.0.0.1", 9464)``; ``"0.0.0.0:9464"``/``"[::]:9464"`` as given."""
+    host, sep, port = listen.rpartition(":")
+    if not sep:
+        host = "127.0.0.1"
+    host = host.strip("[]") or "0.0.0.0"
+    try:
+        return host, int(port)
+    except ValueError:
+        raise ValueError(f"Invalid metrics address {listen!r}; expected [HOST:]PORT") from None
+
+
+class MetricsServer:
+    """A minimal HTTP server exposing ``RunMetrics.render()``."""
+
+    def __init__(self, metrics: RunMetrics, host: str, port: int) -> None:
+        import socket
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:  # noqa: N802 - http.server API
+                if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        server_class = ThreadingHTTPServer
+        if ":" in host:
+            server_class = type("ThreadingHTTPServerV6", (ThreadingHTTPServer,), {"address_family": socket.AF_INET6})
+        self.httpd = server_class((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.address = self.httpd.server_address
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="scatter-metrics", daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self._thread.join()
@@ -0,0 +1,112 @@
+"""Plain data types shared by the SSH layer and the CLI.
+
+Kept free of ``asyncssh``/``tenacity`` imports so code that only builds or
+reports on runs (``--dry-run``, ``--help``, ``scatter show``) starts quickly;
+``scatter.ssh`` re-exports them.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Optional, Sequence
+
+
+@dataclass(slots=True)
+class HostUsage:
+    """Network traffic and client resources spent on one host, over all attempts.
+
+    Attributes
+    - bytes_sent/bytes_received: SSH transport bytes (encrypted, handshake included)
+    - stdout_bytes/stderr_bytes: Command output size (UTF-8)
+    - attempts: SSH connections opened (retries and credential candidates each count)
+    - cpu_time: Client CPU seconds spent processing the host's incoming traffic
+      (key exchange, decryption, packet and channel parsing)
+    - slot_time: Seconds the host held a concurrency slot (its duration
+      without the queue wait)
+    """
+    bytes_sent: int = 0
+    bytes_received: int = 0
+    stdout_bytes: int = 0
+    stderr_bytes: int = 0
+    attempts: int = 0
+    cpu_time: float = 0.0
+    slot_time: float = 0.0
+
+    def add(self, other: "HostUsage") -> None:
+        self.bytes_sent += other.bytes_sent
+        self.bytes_received += other.bytes_received
+        self.stdout_bytes += other.stdout_bytes
+        self.stderr_bytes += other.stderr_bytes
+        self.attempts += other.attempts
+        self.cpu_time += other.cpu_time
+        self.slot_time += other.slot_time
+
+    @classmethod
+    def total(cls, results: Iterable["ExecResult"]) -> "HostUsage":
+        """Per-run totals over the results that carry usage."""
+        total = cls()
+        for r in results:
+            if r.usage is not None:
+                total.add(r.usage)
+        return total
+
+
+@dataclass
+class ExecResult:
+    """Result of executing a command on a host.
+
+    Attributes
+    - host: Target hostname or address
+    - exit_status: Command exit status (``None`` on connection/setup failures)
+    - stdout/stderr: Captured output streams (empty strings if none)
+    - ok: Convenience flag indicating success (``exit_status == 0``)
+    - started_at/ended_at: ``time.perf_counter()`` timestamps to compute duration
+    - error: Optional structured error string on failures
+    - usage: Traffic and CPU accounting (``None`` when not measured)
+    """
+    host: str
+    exit_status: Optional[int]
+    stdout: str
+    stderr: str
+    ok: bool
+    started_at: float
+    ended_at: float
+    error: Optional[str] = None
+    usage: Optional[HostUsage] = None
+
+    @property
+    def duration(self) -> float:
+        return self.ended_at - self.started_at
+
+
+@dataclass(frozen=True, slots=True)
+class ExecOptions:
+    """Execution options for SSH commands.
+
+    Fields support typical SSH settings; ``identity`` and any path-like values
+    are expected to be expanded by the caller. ``known_hosts`` is tracked for
+    future use but currently host key checking is disabled in ``_connect``.
+
+    Instances are immutable and hashable so hosts with identical settings can
+    share one object; candidate lists are stored as tuples.
+    """
+    username: Optional[str]
+    port: Optional[int]
+    identity: Optional[Path]
+    password: Optional[str]
+    known_hosts: str  # "strict" | "off"
+    connect_timeout: float
+    pty: bool
+    limit: int
+    command_timeout: Optional[float] = None
+    retry_attempts: int = 1
+    # Optional candidate lists when performing credential spray attempts
+    username_candidates: Optional[Sequence[str]] = None
+    password_candidates: Optional[Sequence[str]] = None
+
+    def __post_init__(self) -> None:
+        if self.username_candidates is not None and not isinstance(self.username_candidates, tuple):
+            object.__setattr__(self, "username_candidates", tuple(self.username_candidates))
+        if self.password_candidates is not None and not isinstance(self.password_candidates, tuple):
+            object.__setattr__(self, "password_candidates", tuple(self.password_candidates))
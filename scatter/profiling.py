@@ -0,0 +1,337 @@
+"""Profiling for ``scatter run --profile``.
+
+Imported only when ``--profile`` or ``--watchdog`` is given, so ordinary runs pay nothing.
+
+- ``cProfile`` records wall time per function (coroutines are charged for the
+  time each step runs) and is saved as a ``pstats`` file.
+- A sampling thread records the main thread's stack every few milliseconds and
+  writes collapsed stacks (``frame;frame;frame count`` lines) that
+  ``flamegraph.pl``, speedscope or Perfetto load directly.
+- ``LoopLagMonitor`` measures how late the event loop wakes a sleeping task.
+  Lag means something is blocking the loop (CPU-heavy work, synchronous I/O)
+  and every host's timings are inflated by it.
+- ``LoopWatchdog`` (``scatter run --watchdog``) keeps that measurement on
+  without the profiler's overhead and records the stack of whatever is
+  running when a stall passes a threshold.
+
+The summary splits the profile by package (``scatter``, ``asyncssh``,
+``rich``, ...) and counts time blocked in the event loop's ``select``/``poll``
+as ``waiting``, i.e. network time rather than scatter overhead.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# Package directory -> summary category
+_PACKAGES = {
+    "scatter": "scatter",
+    "asyncssh": "asyncssh",
+    "cryptography": "asyncssh",
+    "rich": "rich",
+    "typer": "cli",
+    "click": "cli",
+    "yaml": "yaml",
+    "asyncio": "asyncio",
+    "uvloop": "asyncio",
+}
+
+
+def category(filename: str, funcname: str) -> str:
+    """Summary bucket for a profiled function."""
+    if filename == "~" or filename.startswith("<"):
+        # Built-ins: the selector's blocking call is where the loop waits on the network
+        if "select" in funcname or "poll" in funcname:
+            return "waiting"
+        return "builtins"
+    # The innermost package directory wins (a checkout named "scatter" may hold a venv)
+    for part in reversed(Path(filename).parts[:-1]):
+        if part in _PACKAGES:
+            return _PACKAGES[part]
+    return "other"
+
+
+def _percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q / 100))]
+
+
+class LoopLagMonitor:
+    """Sample event-loop lag: how much later than requested a sleep returns.
+
+    ``beat`` is the ``time.perf_counter()`` of the latest wake-up, so another
+    thread can tell that the loop is stuck before the stall ends.
+    ``on_sample(lag, woke_at)`` is called for every sample when given.
+    """
+
+    def __init__(self, interval: float = 0.05, on_sample: Optional[Callable[[float, float], None]] = None) -> None:
+        self.interval = interval
+        self.samples: List[float] = []
+        self.on_sample = on_sample
+        self.beat = time.perf_counter()
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    def start(self) -> None:
+        """Start sampling on the running event loop."""
+        self.beat = time.perf_counter()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            expected = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            self.beat = now = time.perf_counter()
+            lag = max(0.0, now - expected)
+            self.samples.append(lag)
+            if self.on_sample is not None:
+                self.on_sample(lag, now)
+
+    def stop(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+
+    @property
+    def max(self) -> float:
+        return max(self.samples, default=0.0)
+
+    def summary(self) -> str:
+        if not self.samples:
+            return "event loop lag: no samples"
+        mean = sum(self.samples) / len(self.samples)
+        return (
+            f"event loop lag: mean {mean * 1000:.1f}ms, p99 {_percentile(self.samples, 99) * 1000:.1f}ms, "
+            f"max {self.max * 1000:.1f}ms ({len(self.samples)} samples every {self.interval * 1000:.0f}ms)"
+        )
+
+
+class StackSampler:
+    """Collect collapsed stacks of one thread from a background thread."""
+
+    def __init__(self, thread_id: int, interval: float = 0.005) -> None:
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, name="scatter-profiler", daemon=True)
+        # Formatting is the costly part of sampling; code objects repeat constantly
+        self._labels: Dict[object, str] = {}
+
+    def _label(self, code) -> str:  # type: ignore[no-untyped-def]
+        label = self._labels.get(code)
+        if label is None:
+            name = getattr(code, "co_qualname", code.co_name)
+            label = self._labels[code] = f"{os.path.basename(code.co_filename)}:{name}".replace(";", ":")
+        return label
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            frames: List[str] = []
+            while frame is not None:
+                frames.append(self._label(frame.f_code))
+                frame = frame.f_back
+            if frames:
+                self.stacks[";".join(reversed(frames))] += 1
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def write(self, path: Path) -> None:
+        with path.open("w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class RunProfiler:
+    """Profile the calling thread from ``start()`` to ``stop()``.
+
+    ``stop()`` writes the ``pstats`` file to ``path`` and collapsed stacks next
+    to it (``run.prof`` -> ``run.collapsed``), and returns summary lines.
+    """
+
+    def __init__(self, path: Path, sample_interval: float = 0.005, lag_interval: float = 0.05) -> None:
+        self.path = path
+        self.collapsed_path = path.with_suffix(".collapsed")
+        self.lag = LoopLagMonitor(lag_interval)
+        self._profile = cProfile.Profile()
+        self._sampler = StackSampler(threading.get_ident(), sample_interval)
+        self._wall = 0.0
+        self._cpu = 0.0
+
+    def start(self) -> None:
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+        self._sampler.start()
+        self._profile.enable()
+
+    def stop(self, top: int = 10) -> List[str]:
+        self._profile.disable()
+        wall = time.perf_counter() - self._wall
+        cpu = time.process_time() - self._cpu
+        self._sampler.stop()
+        self.lag.stop()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._profile.dump_stats(str(self.path))
+        self._sampler.write(self.collapsed_path)
+        return self.summarize(pstats.Stats(str(self.path)), wall, cpu, top)
+
+    def summarize(self, stats: pstats.Stats, wall: float, cpu: float, top: int = 10) -> List[str]:
+        by_category: Dict[str, float] = {}
+        functions: List[Tuple[float, float, str]] = []
+        for (filename, line, funcname), (_, ncalls, tottime, cumtime, _) in stats.stats.items():  # type: ignore[attr-defined]
+            bucket = category(filename, funcname)
+            by_category[bucket] = by_category.get(bucket, 0.0) + tottime
+            if bucket != "waiting":
+                where = funcname if filename == "~" else f"{os.path.basename(filename)}:{line}({funcname})"
+                functions.append((tottime, cumtime, f"{where} x{ncalls}"))
+        total = sum(by_category.values()) or 1.0
+        lines = [
+            f"Profile: {wall:.2f}s wall, {cpu:.2f}s CPU ({cpu / wall * 100 if wall else 0:.0f}% of wall)",
+            self.lag.summary(),
+            "time by package: "
+            + ", ".join(f"{name} {t / total * 100:.0f}%" for name, t in sorted(by_category.items(), key=lambda kv: -kv[1])),
+            "hottest functions (own time, excluding waiting):",
+        ]
+        for tottime, cumtime, where in sorted(functions, reverse=True)[:top]:
+            lines.append(f"  {tottime:8.3f}s own {cumtime:8.3f}s total  {where}")
+        lines.append(f"wrote {self.path} (pstats) and {self.collapsed_path} (collapsed stacks)")
+        return lines
+
+
+class Stall:
+    """One event-loop stall: when it started, how long it lasted and what was running."""
+
+    __slots__ = ("start", "duration", "stack")
+
+    def __init__(self, start: float, duration: float, stack: Tuple[str, ...]) -> None:
+        self.start = start
+        self.duration = duration
+        self.stack = stack  # innermost frame first
+
+    @property
+    def where(self) -> str:
+        return self.stack[0] if self.stack else "<not captured>"
+
+
+class LoopWatchdog:
+    """Detect event-loop stalls longer than ``threshold`` and capture their stacks.
+
+    A ``LoopLagMonitor`` on the loop measures every stall. A watcher thread
+    notices when the loop's heartbeat is overdue and grabs the loop thread's
+    stack while the blocking call is still running, so each stall is
+    attributed to the code that caused it (Rich rendering, key loading, file
+    writes, ...).
+    """
+
+    def __init__(self, threshold: float = 0.1, interval: float = 0.01, depth: int = 8) -> None:
+        self.threshold = threshold
+        self.depth = depth
+        self.monitor = LoopLagMonitor(interval, on_sample=self._on_sample)
+        self.stalls: List[Stall] = []
+        self._captured: Optional[Tuple[float, Tuple[str, ...]]] = None  # (beat, stack)
+        self._prev_beat = 0.0
+        self._loop_thread = threading.get_ident()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._watch, name="scatter-watchdog", daemon=True)
+
+    def start(self) -> None:
+        """Start watching the running event loop (call from inside it)."""
+        self._loop_thread = threading.get_ident()
+        self.monitor.start()
+        self._prev_beat = self.monitor.beat
+        self._thread.start()
+
+    def stop(self) -> None:
+        self.monitor.stop()
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def _watch(self) -> None:
+        interval = self.monitor.interval
+        while not self._stop.wait(min(interval, self.threshold) / 2):
+            beat = self.monitor.beat
+            overdue = time.perf_counter() - beat - interval
+            if overdue > self.threshold and (self._captured is None or self._captured[0] != beat):
+                frame = sys._current_frames().get(self._loop_thread)
+                self._captured = (beat, self._format(frame))
+
+    def _format(self, frame: Any) -> Tuple[str, ...]:
+        stack: List[str] = []
+        while frame is not None and len(stack) < self.depth:
+            code = frame.f_code
+            stack.append(f"{os.path.basename(code.co_filename)}:{frame.f_lineno} in {getattr(code, 'co_qualname', code.co_name)}")
+            frame = frame.f_back
+        return tuple(stack)
+
+    def _on_sample(self, lag: float, woke_at: float) -> None:
+        prev_beat, self._prev_beat = self._prev_beat, woke_at
+        captured, self._captured = self._captured, None
+        if lag <= self.threshold:
+            return
+        # The stack belongs to this stall if the watcher saw the beat just before it
+        stack = captured[1] if captured is not None and captured[0] == prev_beat else ()
+        self.stalls.append(Stall(woke_at - lag, lag, stack))
+
+    # --- reporting --------------------------------------------------------
+
+    def stalled_during(self, start: float, end: float) -> float:
+        """Seconds of stalls overlapping ``[start, end]`` (e.g. one host's run)."""
+        return sum(max(0.0, min(end, s.start + s.duration) - max(start, s.start)) for s in self.stalls)
+
+    def offenders(self, top: int = 5) -> List[Dict[str, Any]]:
+        """Stall sites by total stalled time, worst first."""
+        by_site: Dict[str, Dict[str, Any]] = {}
+        for s in self.stalls:
+            site = by_site.setdefault(s.where, {"where": s.where, "count": 0, "total_ms": 0.0, "worst_ms": 0.0, "stack": list(s.stack)})
+            site["count"] += 1
+            site["total_ms"] += s.duration * 1000
+            if s.duration * 1000 > site["worst_ms"]:
+                site["worst_ms"] = s.duration * 1000
+                site["stack"] = list(s.stack)
+        ranked = sorted(by_site.values(), key=lambda site: -site["total_ms"])[:top]
+        for site in ranked:
+            site["total_ms"] = round(site["total_ms"], 1)
+            site["worst_ms"] = round(site["worst_ms"], 1)
+        return ranked
+
+    def report(self, top: int = 5) -> Dict[str, Any]:
+        """JSON-ready summary for the run log."""
+        return {
+            "threshold_ms": round(self.threshold * 1000, 1),
+            "stalls": len(self.stalls),
+            "total_ms": round(sum(s.duration for s in self.stalls) * 1000, 1),
+            "worst_ms": round(max((s.duration for s in self.stalls), default=0.0) * 1000, 1),
+            "offenders": self.offenders(top),
+        }
+
+    def summary_lines(self, top: int = 5) -> List[str]:
+        report = self.report(top)
+        if not report["stalls"]:
+            return [f"Event loop stalls over {report['threshold_ms']:.0f}ms: none"]
+        lines = [
+            f"Event loop stalls over {report['threshold_ms']:.0f}ms: {report['stalls']} "
+            f"(worst {report['worst_ms']:.0f}ms, total {report['total_ms']:.0f}ms)"
+        ]
+        for site in report["offenders"]:
+            callers = " <- ".join(site["stack"][1:3])
+            lines.append(
+                f"  {site['count']}x {site['total_ms']:.0f}ms total, worst {site['worst_ms']:.0f}ms: {site['where']}"
+                + (f" <- {callers}" if callers else "")
+            )
+        return lines
@@ -0,0 +1,55 @@
+"""Longest-expected-first host ordering (``scatter run --schedule lpt``).
+
+Hosts start in the order their tasks queue for a concurrency slot, which is
+normally inventory order. If the slowest hosts come last, the run drags on
+with most slots idle. Starting the longest jobs first (LPT, longest
+processing time) keeps the tail short: with ``m`` slots the makespan is at
+most ``4/3 - 1/(3m)`` times the optimum.
+
+Expected durations come from the history database's ``durations`` table: a
+moving average, per host and command, of how long the host held a slot.
+Hosts without history are placed at the median of the known estimates, so
+new hosts neither jump the queue nor trail behind everything.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from statistics import median
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .history import connect
+from .store import blob_hash
+
+
+def load_estimates(db_path: Path | str, commands: Sequence[str]) -> Dict[Tuple[str, str], float]:
+    """``(host, command) -> expected seconds`` for every recorded pair of ``commands``."""
+    by_hash = {blob_hash(c): c for c in set(commands)}
+    estimates: Dict[Tuple[str, str], float] = {}
+    conn = connect(db_path)
+    try:
+        for command_hash, command in by_hash.items():
+            rows = conn.execute("SELECT host, estimate FROM durations WHERE command_hash = ?", (command_hash,))
+            for host, estimate in rows:
+                estimates[(host, command)] = estimate
+    finally:
+        conn.close()
+    return estimates
+
+
+def lpt_order(
+    specs: Sequence[Tuple[str, str, Any]], estimates: Dict[Tuple[str, str], float]
+) -> Tuple[List[int], Optional[float]]:
+    """Indices of ``(host, command, ...)`` specs, longest expected first.
+
+    Returns the order and the median used for hosts without an estimate
+    (``None`` when nothing is known, in which case the order is unchanged).
+    Ties keep inventory order.
+    """
+    expected = [estimates.get((spec[0], spec[1])) for spec in specs]
+    known = [e for e in expected if e is not None]
+    if not known:
+        return list(range(len(specs))), None
+    fill = median(known)
+    order = sorted(range(len(specs)), key=lambda i: -(expected[i] if expected[i] is not None else fill))
+    return order, fill
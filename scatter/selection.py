@@ -0,0 +1,226 @@
+"""Indexed host selection by tag expressions and host-name patterns.
+
+``HostIndex`` is built once per loaded inventory. Tags map to integer bitsets
+of host positions, so a tag expression is a handful of big-int ``&``/``|``
+operations regardless of fleet size. Host names are kept in sorted order (and
+reversed, for suffix patterns like ``*.dc1``) so a pattern only examines the
+names sharing its literal prefix or suffix.
+
+Tag expressions
+- ``web,db`` or ``web|db`` or ``web or db``: either tag.
+- ``web&prod`` or ``web and prod``: both tags.
+- ``!staging`` or ``not staging``: hosts without the tag; parentheses group.
+- Tag names may use shell wildcards (``dc*``) to match several tags.
+
+Host patterns
+- Shell globs (``web-*``, ``db[12]``), matched against the whole host name.
+- A leading ``~`` makes the rest a regular expression (``~^web-\\d+$``),
+  matched with ``re.search``.
+"""
+
+from __future__ import annotations
+
+import fnmatch
+import re
+from bisect import bisect_left
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+try:  # Python 3.11+
+    from re import _parser as _sre_parse  # type: ignore[attr-defined]
+except ImportError:  # pragma: no cover - Python 3.10
+    import sre_parse as _sre_parse  # type: ignore[no-redef]
+
+from .config import HostEntry
+
+_GLOB_CHARS = "*?["
+_TOKEN_RE = re.compile(r"\s*(?:([(),|&!])|([^\s(),|&!]+))")
+
+
+def _literal_prefix(glob: str, meta: str = _GLOB_CHARS) -> str:
+    for i, ch in enumerate(glob):
+        if ch in meta:
+            return glob[:i]
+    return glob
+
+
+def _regex_prefix(pattern: str) -> str:
+    """Literal text a ``^``-anchored regex must start with (``""`` if unanchored)."""
+    try:
+        parsed = _sre_parse.parse(pattern)
+    except Exception:
+        return ""
+    if parsed.state.flags & re.IGNORECASE:
+        return ""
+    if not parsed or parsed[0][0] is not _sre_parse.AT or parsed[0][1] is not _sre_parse.AT_BEGINNING:
+        return ""
+    chars: List[str] = []
+    for op, arg in parsed[1:]:
+        if op is not _sre_parse.LITERAL:
+            break
+        chars.append(chr(arg))
+    return "".join(chars)
+
+
+_NONZERO_BYTE = re.compile(rb"[^\x00]")
+
+
+def to_mask(positions: Iterable[int], size: int) -> int:
+    """Bitset with the given host positions set."""
+    bits = bytearray((size + 7) // 8)
+    for pos in positions:
+        bits[pos >> 3] |= 1 << (pos & 7)
+    return int.from_bytes(bits, "little")
+
+
+def iter_bits(mask: int) -> Iterator[int]:
+    """Yield the positions of set bits in ``mask`` in increasing order."""
+    data = mask.to_bytes((mask.bit_length() + 7) // 8, "little")
+    # Zero bytes are skipped in C, so sparse masks cost roughly O(matches)
+    for m in _NONZERO_BYTE.finditer(data):
+        i = m.start()
+        byte = data[i]
+        for bit in range(8):
+            if byte >> bit & 1:
+                yield i * 8 + bit
+
+
+class HostIndex:
+    """Tag bitsets and sorted host names for one inventory's host list."""
+
+    def __init__(self, hosts: Sequence[HostEntry]) -> None:
+        self.hosts = hosts
+        self.all = (1 << len(hosts)) - 1
+        tag_positions: Dict[str, List[int]] = {}
+        for pos, h in enumerate(hosts):
+            for tag in h.tags:
+                tag_positions.setdefault(tag, []).append(pos)
+        self.tags: Dict[str, int] = {tag: to_mask(positions, len(hosts)) for tag, positions in tag_positions.items()}
+        self._names: List[Tuple[str, int]] = sorted((h.host, pos) for pos, h in enumerate(hosts))
+        self._reversed: List[Tuple[str, int]] = sorted((h.host[::-1], pos) for pos, h in enumerate(hosts))
+
+    # --- tags -------------------------------------------------------------
+
+    def tag(self, name: str) -> int:
+        """Bitset of hosts carrying ``name`` (a tag or a tag glob)."""
+        if any(ch in name for ch in _GLOB_CHARS):
+            mask = 0
+            for tag in fnmatch.filter(self.tags, name):
+                mask |= self.tags[tag]
+            return mask
+        return self.tags.get(name, 0)
+
+    def tag_expr(self, expr: str) -> int:
+        """Evaluate a tag expression (see module docs) to a bitset."""
+        return _TagExpr(self, expr).parse()
+
+    # --- host names -------------------------------------------------------
+
+    @staticmethod
+    def _range(names: List[Tuple[str, int]], prefix: str) -> Iterator[Tuple[str, int]]:
+        i = bisect_left(names, (prefix, -1))
+        while i < len(names) and names[i][0].startswith(prefix):
+            yield names[i]
+            i += 1
+
+    def pattern(self, pattern: str) -> int:
+        """Bitset of hosts whose name matches a glob or ``~regex`` pattern."""
+        size = len(self.hosts)
+        if pattern.startswith("~"):
+            search = re.compile(pattern[1:]).search
+            candidates = self._range(self._names, _regex_prefix(pattern[1:]))
+            return to_mask((pos for name, pos in candidates if search(name)), size)
+        prefix = _literal_prefix(pattern)
+        if prefix == pattern:
+            return to_mask((pos for name, pos in self._range(self._names, pattern) if name == pattern), size)
+        # Reversed, a bracket set ends in ``]``: its contents are not literal text
+        suffix = _literal_prefix(pattern[::-1], _GLOB_CHARS + "]")
+        # Walk whichever sorted view the pattern pins down more tightly
+        if len(suffix) > len(prefix):
+            candidates = ((name[::-1], pos) for name, pos in self._range(self._reversed, suffix))
+        else:
+            candidates = self._range(self._names, prefix)
+        match = re.compile(fnmatch.translate(pattern)).match
+        return to_mask((pos for name, pos in candidates if match(name)), size)
+
+    # --- combined ---------------------------------------------------------
+
+    def select(
+        self,
+        tags: Optional[str] = None,
+        exclude_tags: Optional[str] = None,
+        patterns: Iterable[str] = (),
+    ) -> List[HostEntry]:
+        """Hosts matching ``tags`` and any of ``patterns``, minus ``exclude_tags``, in inventory order."""
+        mask = self.tag_expr(tags) if tags else self.all
+        patterns = list(patterns)
+        if patterns:
+            by_name = 0
+            for p in patterns:
+                by_name |= self.pattern(p)
+            mask &= by_name
+        if exclude_tags:
+            mask &= ~self.tag_expr(exclude_tags)
+        if mask == self.all:
+            return list(self.hosts)
+        return [self.hosts[pos] for pos in iter_bits(mask)]
+
+
+class _TagExpr:
+    """Recursive-descent parser evaluating a tag expression against a ``HostIndex``."""
+
+    def __init__(self, index: HostIndex, text: str) -> None:
+        self.index = index
+        self.text = text
+        self.tokens: List[str] = []
+        pos = 0
+        text = text.rstrip()
+        while pos < len(text):
+            m = _TOKEN_RE.match(text, pos)
+            if m is None:  # pragma: no cover - every non-space character is a token
+                raise ValueError(f"Invalid tag expression: {self.text!r}")
+            self.tokens.append(m.group(1) or m.group(2))
+            pos = m.end()
+        self.pos = 0
+
+    def _peek(self) -> Optional[str]:
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def _take(self) -> str:
+        tok = self._peek()
+        if tok is None:
+            raise ValueError(f"Unexpected end of tag expression: {self.text!r}")
+        self.pos += 1
+        return tok
+
+    def parse(self) -> int:
+        mask = self._or()
+        if self._peek() is not None:
+            raise ValueError(f"Unexpected {self._peek()!r} in tag expression: {self.text!r}")
+        return mask
+
+    def _or(self) -> int:
+        mask = self._and()
+        while self._peek() in (",", "|", "or"):
+            self.pos += 1
+            mask |= self._and()
+        return mask
+
+    def _and(self) -> int:
+        mask = self._not()
+        while self._peek() in ("&", "and"):
+            self.pos += 1
+            mask &= self._not()
+        return mask
+
+    def _not(self) -> int:
+        tok = self._take()
+        if tok in ("!", "not"):
+            return self.index.all & ~self._not()
+        if tok == "(":
+            mask = self._or()
+            if self._take() != ")":
+                raise ValueError(f"Missing ')' in tag expression: {self.text!r}")
+            return mask
+        if tok in (")", ",", "|", "&", "or", "and"):
+            raise ValueError(f"Unexpected {tok!r} in tag expression: {self.text!r}")
+        return self.index.tag(tok)
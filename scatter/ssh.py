@@ -9,77 +9,62 @@ Design notes
   currently not enforced at the transport layer.
 - Concurrency is limited via a shared ``asyncio.Semaphore`` passed into ``run_on_host``.
 - Results include timing metadata and basic success/failure information.
+- Per-phase timings (queue wait, DNS, connect, handshake, auth, exec, output
+  drain, close) are reported to the ``phase_observer`` context variable when
+  one is set, e.g. by ``scatter run --trace``.
+- Every result carries a ``HostUsage``: transport bytes each way, output
+  bytes per stream, connection attempts and the client CPU time spent on the
+  host's incoming traffic.
+- Transport metering relies on asyncssh internals: ``SSHClientConnection``
+  keeps its transport in the private ``_transport`` attribute, which
+  ``_MeteringClient`` wraps. If an asyncssh release drops it, a warning is
+  logged once and transport bytes and client CPU stay at zero; output bytes
+  and attempts are still counted.
 """
 
 from __future__ import annotations
 
 import asyncio
+import logging
+import socket
 import sys
 import time
-from dataclasses import dataclass
-from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterable, List, Optional
 
 import asyncssh
 from tenacity import AsyncRetrying, retry_if_exception_type, stop_after_attempt, wait_exponential
 
+from .models import ExecOptions, ExecResult, HostUsage
 
-@dataclass
-class ExecResult:
-    """Result of executing a command on a host.
+# Hosts consumed from the input iterable between yields to the event loop
+_SPAWN_BATCH = 256
 
-    Attributes
-    - host: Target hostname or address
-    - exit_status: Command exit status (``None`` on connection/setup failures)
-    - stdout/stderr: Captured output streams (empty strings if none)
-    - ok: Convenience flag indicating success (``exit_status == 0``)
-    - started_at/ended_at: ``time.perf_counter()`` timestamps to compute duration
-    - error: Optional structured error string on failures
-    """
-    host: str
-    exit_status: Optional[int]
-    stdout: str
-    stderr: str
-    ok: bool
-    started_at: float
-    ended_at: float
-    error: Optional[str] = None
-
-    @property
-    def duration(self) -> float:
-        return self.ended_at - self.started_at
-
-
-@dataclass
-class ExecOptions:
-    """Execution options for SSH commands.
-
-    Fields support typical SSH settings; ``identity`` and any path-like values
-    are expected to be expanded by the caller. ``known_hosts`` is tracked for
-    future use but currently host key checking is disabled in ``_connect``.
-    """
-    username: Optional[str]
-    port: Optional[int]
-    identity: Optional[Path]
-    password: Optional[str]
-    known_hosts: str  # "strict" | "off"
-    connect_timeout: float
-    pty: bool
-    limit: int
-    command_timeout: Optional[float] = None
-    retry_attempts: int = 1
-    # Optional candidate lists when performing credential spray attempts
-    username_candidates: Optional[List[str]] = None
-    password_candidates: Optional[List[str]] = None
-
-
-async def _connect(host: str, options: ExecOptions) -> asyncssh.SSHClientConnection:
+_log = logging.getLogger(__name__)
+_metering_warned = False
+
+# Called as ``observer(host, phase, start, end)`` with ``time.perf_counter()``
+# timestamps for each timed phase of ``run_on_host``: ``queue`` (waiting for a
+# concurrency slot), ``slot`` (holding one), and per connection attempt
+# ``dns``, ``connect``, ``handshake``, ``auth``, ``exec``, ``drain`` and
+# ``close``, plus ``backoff`` before each retry. Unset (the default), no
+# timing work is done.
+PhaseObserver = Callable[[str, str, float, float], None]
+phase_observer: ContextVar[Optional[PhaseObserver]] = ContextVar("scatter_phase_observer", default=None)
+
+
+async def _connect(
+    host: str, options: ExecOptions, usage: Optional[HostUsage] = None
+) -> asyncssh.SSHClientConnection:
     """Establish an SSH connection with liberal defaults.
 
     Notes
     - Agent forwarding is enabled.
     - Host key checking and known_hosts usage are disabled by passing ``None``.
     - ``client_keys`` and ``password`` are supplied when present in options.
+    - With a ``phase_observer`` set, name resolution and the TCP connect are
+      done here (and the socket handed to asyncssh) so each can be timed.
+    - With ``usage``, the connection's traffic and CPU time are added to it.
     """
     connect_kwargs: Dict[str, Any] = dict(
         host=host,
@@ -98,12 +83,189 @@ async def _connect(host: str, options: ExecOptions) -> asyncssh.SSHClientConnect
     #   -o StrictHostKeyChecking=no -o UserKnownHostsFile=/dev/null
     connect_kwargs["known_hosts"] = None
 
-    return await asyncssh.connect(**connect_kwargs)
+    if usage is not None:
+        usage.attempts += 1
+        connect_kwargs["client_factory"] = lambda: _MeteringClient(usage)
+
+    observer = phase_observer.get()
+    if observer is None:
+        return await asyncssh.connect(**connect_kwargs)
+
+    started = time.perf_counter()
+    sock = await asyncio.wait_for(_open_socket(host, connect_kwargs["port"], observer), options.connect_timeout)
+    connected = time.perf_counter()
+    connect_kwargs["sock"] = sock
+    connect_kwargs["connect_timeout"] = max(0.001, options.connect_timeout - (connected - started))
+    connect_kwargs["client_factory"] = lambda: _PhaseTimingClient(host, observer, connected, usage)
+    try:
+        return await asyncssh.connect(**connect_kwargs)
+    except BaseException:
+        sock.close()
+        raise
+
+
+async def _open_socket(host: str, port: int, observer: PhaseObserver) -> socket.socket:
+    """Resolve ``host`` and connect to the first address that accepts, reporting both phases."""
+    loop = asyncio.get_running_loop()
+    started = time.perf_counter()
+    infos = await loop.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    resolved = time.perf_counter()
+    observer(host, "dns", started, resolved)
+    error: Optional[OSError] = None
+    for family, type_, proto, _, address in infos:
+        sock = socket.socket(family, type_, proto)
+        sock.setblocking(False)
+        try:
+            await loop.sock_connect(sock, address)
+        except OSError as exc:
+            sock.close()
+            error = exc
+            continue
+        except BaseException:
+            sock.close()
+            raise
+        observer(host, "connect", resolved, time.perf_counter())
+        return sock
+    raise error or OSError(f"No addresses for {host}")
+
+
+class _MeteredTransport:
+    """Transport proxy counting the bytes a connection writes."""
+
+    def __init__(self, transport: asyncio.Transport, usage: HostUsage) -> None:
+        self._transport = transport
+        self._usage = usage
+
+    def write(self, data: bytes) -> None:
+        self._usage.bytes_sent += len(data)
+        self._transport.write(data)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._transport, name)
+
+
+class _MeteredProtocol:
+    """Protocol proxy in front of an SSH connection, metering what it receives."""
+
+    def __init__(self, conn: asyncssh.SSHClientConnection, usage: HostUsage) -> None:
+        self._conn = conn
+        self._usage = usage
+        self._data_received = conn.data_received
+
+    def data_received(self, data: bytes, datatype: Any = None) -> None:
+        # Decryption, MAC checks, key exchange and channel dispatch all happen in here
+        self._usage.bytes_received += len(data)
+        cpu = time.thread_time()
+        try:
+            self._data_received(data, datatype)
+        finally:
+            self._usage.cpu_time += time.thread_time() - cpu
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._conn, name)
+
+
+class _MeteringClient(asyncssh.SSHClient):
+    """Adds a connection's transport bytes and input-handling CPU time to a ``HostUsage``.
+
+    Installed from ``connection_made``, which asyncssh calls before sending
+    its version string, so the whole handshake is counted.
+    """
+
+    def __init__(self, usage: Optional[HostUsage] = None) -> None:
+        self._usage = usage
+
+    def connection_made(self, conn: asyncssh.SSHClientConnection) -> None:
+        global _metering_warned
+        usage = self._usage
+        if usage is None:
+            return
+        # Private asyncssh attribute (see the module notes)
+        transport = getattr(conn, "_transport", None)
+        if transport is None or not hasattr(transport, "write"):
+            if not _metering_warned:
+                _metering_warned = True
+                _log.warning(
+                    "asyncssh %s connections have no _transport; transport bytes and client CPU are not metered",
+                    asyncssh.__version__,
+                )
+            return
+        conn._transport = _MeteredTransport(transport, usage)  # type: ignore[attr-defined]
+        proxy = _MeteredProtocol(conn, usage)
+        try:
+            # Event loops such as uvloop cache the protocol's data_received
+            transport.set_protocol(proxy)
+        except (AttributeError, NotImplementedError):
+            # ProxyCommand and jump-host transports call the connection directly
+            conn.data_received = proxy.data_received  # type: ignore[method-assign]
+
+
+class _PhaseTimingClient(_MeteringClient):
+    """Reports key exchange and authentication timings to a phase observer."""
+
+    def __init__(self, host: str, observer: PhaseObserver, connected: float, usage: Optional[HostUsage] = None) -> None:
+        super().__init__(usage)
+        self._host = host
+        self._observer = observer
+        self._mark = connected
+
+    def begin_auth(self, username: str) -> bool:
+        now = time.perf_counter()
+        self._observer(self._host, "handshake", self._mark, now)
+        self._mark = now
+        return True
 
+    def auth_completed(self) -> None:
+        self._observer(self._host, "auth", self._mark, time.perf_counter())
 
-async def _run_command(conn: asyncssh.SSHClientConnection, command: str, options: ExecOptions) -> asyncssh.SSHCompletedProcess:
-    """Run a command on an established connection without raising on failure."""
-    return await conn.run(command, check=False, timeout=options.command_timeout, term_type="xterm" if options.pty else None)
+
+async def _run_command(
+    host: str, conn: asyncssh.SSHClientConnection, command: str, options: ExecOptions
+) -> asyncssh.SSHCompletedProcess:
+    """Run a command on an established connection without raising on failure.
+
+    With a ``phase_observer`` set, reports ``exec`` (until the first output
+    arrives) and ``drain`` (from there until the command has finished and
+    all output is read).
+    """
+    term_type = "xterm" if options.pty else None
+    observer = phase_observer.get()
+    if observer is None:
+        return await conn.run(command, check=False, timeout=options.command_timeout, term_type=term_type)
+
+    started = time.perf_counter()
+    process = await conn.create_process(command, term_type=term_type)
+    first_output: List[float] = []
+    data_received = process.data_received
+
+    def timed_data_received(data: Any, datatype: Any) -> None:
+        if not first_output:
+            first_output.append(time.perf_counter())
+        data_received(data, datatype)
+
+    # The channel delivers output through the session's data_received
+    process.data_received = timed_data_received  # type: ignore[method-assign]
+    try:
+        return await process.wait(check=False, timeout=options.command_timeout)
+    finally:
+        ended = time.perf_counter()
+        output_at = first_output[0] if first_output else ended
+        observer(host, "exec", started, output_at)
+        if first_output:
+            observer(host, "drain", output_at, ended)
+
+
+async def _close(host: str, conn: asyncssh.SSHClientConnection) -> None:
+    """Close ``conn``, ignoring errors (the result is already decided)."""
+    started = time.perf_counter()
+    try:
+        conn.close()
+        await conn.wait_closed()
+    except Exception:
+        pass
+    observer = phase_observer.get()
+    if observer is not None:
+        observer(host, "close", started, time.perf_counter())
 
 
 async def run_on_host(host: str, command: str, options: ExecOptions, semaphore: asyncio.Semaphore) -> ExecResult:
@@ -113,158 +275,188 @@ async def run_on_host(host: str, command: str, options: ExecOptions, semaphore:
     backoff. Always returns an ``ExecResult`` capturing success or failure.
     """
     started = time.perf_counter()
+    observer = phase_observer.get()
 
     async with semaphore:
-        try:
-            async for attempt in AsyncRetrying(
-                stop=stop_after_attempt(max(1, options.retry_attempts)),
-                wait=wait_exponential(multiplier=0.5, min=0.5, max=5),
-                retry=retry_if_exception_type((asyncssh.Error, OSError)),
-                reraise=True,
-            ):
-                with attempt:
-                    use_spray = bool(options.username_candidates or options.password_candidates)
-                    if not use_spray:
-                        # Original behavior: single connect using provided options
-                        conn = await _connect(host, options)
+        acquired = time.perf_counter()
+        if observer is not None:
+            observer(host, "queue", started, acquired)
+        result = await _run_attempts(host, command, options, started)
+        if result.usage is not None:
+            result.usage.slot_time = result.ended_at - acquired
+        if observer is not None:
+            observer(host, "slot", acquired, result.ended_at)
+        return result
+
+
+async def _run_attempts(host: str, command: str, options: ExecOptions, started: float) -> ExecResult:
+    """Connect and run ``command`` with retries; the caller holds a concurrency slot."""
+    usage = HostUsage()
+    result = await _run_with_retries(host, command, options, started, usage)
+    usage.stdout_bytes = len(result.stdout.encode("utf-8", "surrogateescape")) if result.stdout else 0
+    usage.stderr_bytes = len(result.stderr.encode("utf-8", "surrogateescape")) if result.stderr else 0
+    result.usage = usage
+    return result
+
+
+async def _run_with_retries(
+    host: str, command: str, options: ExecOptions, started: float, usage: HostUsage
+) -> ExecResult:
+    observer = phase_observer.get()
+    before_sleep: Optional[Callable[[Any], None]] = None
+    if observer is not None:
+
+        def report_backoff(retry_state: Any) -> None:
+            # Reported up front: the span is the backoff tenacity is about to sleep
+            now = time.perf_counter()
+            observer(host, "backoff", now, now + (retry_state.next_action.sleep if retry_state.next_action else 0.0))
+
+        before_sleep = report_backoff
+
+    try:
+        async for attempt in AsyncRetrying(
+            stop=stop_after_attempt(max(1, options.retry_attempts)),
+            wait=wait_exponential(multiplier=0.5, min=0.5, max=5),
+            retry=retry_if_exception_type((asyncssh.Error, OSError)),
+            reraise=True,
+            before_sleep=before_sleep,
+        ):
+            with attempt:
+                use_spray = bool(options.username_candidates or options.password_candidates)
+                if not use_spray:
+                    # Original behavior: single connect using provided options
+                    conn = await _connect(host, options, usage)
+                    try:
+                        completed = await _run_command(host, conn, command, options)
+                        return ExecResult(
+                            host=host,
+                            exit_status=completed.exit_status,
+                            stdout=completed.stdout or "",
+                            stderr=completed.stderr or "",
+                            ok=(completed.exit_status == 0),
+                            started_at=started,
+                            ended_at=time.perf_counter(),
+                        )
+                    finally:
+                        await _close(host, conn)
+
+                # Credential spray mode
+                # Build candidate username/password lists
+                # If a username list is provided, use it exclusively.
+                usernames: List[Optional[str]]
+                if options.username_candidates:
+                    usernames = list(options.username_candidates)
+                elif options.username is not None:
+                    usernames = [options.username]
+                else:
+                    usernames = [None]
+
+                passwords: List[Optional[str]] = []
+                if options.password is not None:
+                    passwords.append(options.password)
+                if options.password_candidates:
+                    for p in options.password_candidates:
+                        if p not in passwords:
+                            passwords.append(p)
+                # Include None for key-only attempt when identity is set
+                if options.identity and None not in passwords:
+                    passwords = [None] + passwords
+
+                # Try key-only first if applicable
+                if options.identity and None in passwords:
+                    for u in usernames:
                         try:
-                            completed = await _run_command(conn, command, options)
-                            return ExecResult(
-                                host=host,
-                                exit_status=completed.exit_status,
-                                stdout=completed.stdout or "",
-                                stderr=completed.stderr or "",
-                                ok=(completed.exit_status == 0),
-                                started_at=started,
-                                ended_at=time.perf_counter(),
+                            conn = await _connect(
+                                host,
+                                ExecOptions(
+                                    username=u,
+                                    port=options.port,
+                                    identity=options.identity,
+                                    password=None,
+                                    known_hosts=options.known_hosts,
+                                    connect_timeout=options.connect_timeout,
+                                    pty=options.pty,
+                                    limit=options.limit,
+                                    command_timeout=options.command_timeout,
+                                    retry_attempts=options.retry_attempts,
+                                ),
+                                usage,
                             )
-                        finally:
                             try:
-                                conn.close()
-                                await conn.wait_closed()
-                            except Exception:
-                                pass
-
-                    # Credential spray mode
-                    # Build candidate username/password lists
-                    # If a username list is provided, use it exclusively.
-                    usernames: List[Optional[str]]
-                    if options.username_candidates:
-                        usernames = list(options.username_candidates)
-                    elif options.username is not None:
-                        usernames = [options.username]
-                    else:
-                        usernames = [None]
-
-                    passwords: List[Optional[str]] = []
-                    if options.password is not None:
-                        passwords.append(options.password)
-                    if options.password_candidates:
-                        for p in options.password_candidates:
-                            if p not in passwords:
-                                passwords.append(p)
-                    # Include None for key-only attempt when identity is set
-                    if options.identity and None not in passwords:
-                        passwords = [None] + passwords
-
-                    # Try key-only first if applicable
-                    if options.identity and None in passwords:
-                        for u in usernames:
-                            try:
-                                conn = await _connect(
-                                    host,
-                                    ExecOptions(
-                                        username=u,
-                                        port=options.port,
-                                        identity=options.identity,
-                                        password=None,
-                                        known_hosts=options.known_hosts,
-                                        connect_timeout=options.connect_timeout,
-                                        pty=options.pty,
-                                        limit=options.limit,
-                                        command_timeout=options.command_timeout,
-                                        retry_attempts=options.retry_attempts,
-                                    ),
+                                completed = await _run_command(host, conn, command, options)
+                                return ExecResult(
+                                    host=host,
+                                    exit_status=completed.exit_status,
+                                    stdout=completed.stdout or "",
+                                    stderr=completed.stderr or "",
+                                    ok=(completed.exit_status == 0),
+                                    started_at=started,
+                                    ended_at=time.perf_counter(),
                                 )
-                                try:
-                                    completed = await _run_command(conn, command, options)
-                                    return ExecResult(
-                                        host=host,
-                                        exit_status=completed.exit_status,
-                                        stdout=completed.stdout or "",
-                                        stderr=completed.stderr or "",
-                                        ok=(completed.exit_status == 0),
-                                        started_at=started,
-                                        ended_at=time.perf_counter(),
-                                    )
-                                finally:
-                                    try:
-                                        conn.close()
-                                        await conn.wait_closed()
-                                    except Exception:
-                                        pass
-                            except Exception:
-                                pass
-
-                    # Password attempts
-                    for u in usernames:
-                        for p in [pw for pw in passwords if pw is not None]:
+                            finally:
+                                await _close(host, conn)
+                        except Exception:
+                            pass
+
+                # Password attempts
+                for u in usernames:
+                    for p in [pw for pw in passwords if pw is not None]:
+                        try:
+                            conn = await _connect(
+                                host,
+                                ExecOptions(
+                                    username=u,
+                                    port=options.port,
+                                    identity=options.identity,
+                                    password=p,
+                                    known_hosts=options.known_hosts,
+                                    connect_timeout=options.connect_timeout,
+                                    pty=options.pty,
+                                    limit=options.limit,
+                                    command_timeout=options.command_timeout,
+                                    retry_attempts=options.retry_attempts,
+                                ),
+                                usage,
+                            )
                             try:
-                                conn = await _connect(
-                                    host,
-                                    ExecOptions(
-                                        username=u,
-                                        port=options.port,
-                                        identity=options.identity,
-                                        password=p,
-                                        known_hosts=options.known_hosts,
-                                        connect_timeout=options.connect_timeout,
-                                        pty=options.pty,
-                                        limit=options.limit,
-                                        command_timeout=options.command_timeout,
-                                        retry_attempts=options.retry_attempts,
-                                    ),
+                                completed = await _run_command(host, conn, command, options)
+                                return ExecResult(
+                                    host=host,
+                                    exit_status=completed.exit_status,
+                                    stdout=completed.stdout or "",
+                                    stderr=completed.stderr or "",
+                                    ok=(completed.exit_status == 0),
+                                    started_at=started,
+                                    ended_at=time.perf_counter(),
                                 )
-                                try:
-                                    completed = await _run_command(conn, command, options)
-                                    return ExecResult(
-                                        host=host,
-                                        exit_status=completed.exit_status,
-                                        stdout=completed.stdout or "",
-                                        stderr=completed.stderr or "",
-                                        ok=(completed.exit_status == 0),
-                                        started_at=started,
-                                        ended_at=time.perf_counter(),
-                                    )
-                                finally:
-                                    try:
-                                        conn.close()
-                                        await conn.wait_closed()
-                                    except Exception:
-                                        pass
-                            except Exception:
-                                pass
-
-                    # None succeeded within this attempt
-                    raise OSError("credential candidates failed")
-        except Exception as exc:  # noqa: BLE001
-            return ExecResult(
-                host=host,
-                exit_status=None,
-                stdout="",
-                stderr="",
-                ok=False,
-                started_at=started,
-                ended_at=time.perf_counter(),
-                error=f"{type(exc).__name__}: {exc}",
-            )
+                            finally:
+                                await _close(host, conn)
+                        except Exception:
+                            pass
+
+                # None succeeded within this attempt
+                raise OSError("credential candidates failed")
+    except Exception as exc:  # noqa: BLE001
+        return ExecResult(
+            host=host,
+            exit_status=None,
+            stdout="",
+            stderr="",
+            ok=False,
+            started_at=started,
+            ended_at=time.perf_counter(),
+            error=f"{type(exc).__name__}: {exc}",
+        )
 
 
 async def execute_on_hosts(hosts: Iterable[str], command: str, options: ExecOptions) -> List[ExecResult]:
     """Execute the same command across multiple hosts concurrently.
 
     The result list order matches the input ``hosts`` order even though
-    execution completes out-of-order internally.
+    execution completes out-of-order internally. ``hosts`` may be a lazy
+    iterator (e.g. ``(h.host for h in config.iter_hosts(path))``): tasks are
+    started while it is still being consumed, so early hosts connect before
+    the last one is parsed.
     """
     # Windows event loop policy safety for network-heavy asyncio apps
     if sys.platform == "win32":
@@ -274,7 +466,12 @@ async def execute_on_hosts(hosts: Iterable[str], command: str, options: ExecOpti
             pass
 
     semaphore = asyncio.Semaphore(options.limit)
-    tasks = [asyncio.create_task(run_on_host(host, command, options, semaphore)) for host in hosts]
+    tasks = []
+    for host in hosts:
+        tasks.append(asyncio.create_task(run_on_host(host, command, options, semaphore)))
+        if len(tasks) % _SPAWN_BATCH == 0:
+            # Let already-created tasks start before consuming more of ``hosts``
+            await asyncio.sleep(0)
     results = await asyncio.gather(*tasks, return_exceptions=False)
     return list(results)
 
@@ -0,0 +1,137 @@
+"""Content-addressed output store with per-run manifests.
+
+Each stdout/stderr blob is stored once, zlib-compressed, under the SHA-256 of its
+uncompressed content, so identical outputs across hosts and across runs cost a
+single object. Each run writes a manifest mapping hosts to blob hashes.
+
+Layout under the store root
+- ``objects/<aa>/<rest-of-hash>``: compressed blobs, written atomically.
+- ``runs/<run_id>.json``: run manifests. Run ids sort chronologically.
+
+Comparing two runs is then a hash comparison per host (see ``OutputStore.diff``).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import secrets
+import zlib
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+
+
+def blob_hash(text: str) -> str:
+    """Return the content hash used to address ``text`` in the store."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    tmp = path.with_name(f".{path.name}.{secrets.token_hex(4)}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+class OutputStore:
+    """Deduplicating store for run outputs rooted at a directory."""
+
+    def __init__(self, root: Path | str) -> None:
+        self.root = Path(root)
+        self.objects = self.root / "objects"
+        self.runs_dir = self.root / "runs"
+        # Hashes known to exist, so repeated outputs skip the filesystem check
+        self._known: Set[str] = set()
+
+    def _object_path(self, digest: str) -> Path:
+        return self.objects / digest[:2] / digest[2:]
+
+    def put(self, text: str) -> str:
+        """Store ``text`` if not already present and return its hash."""
+        digest = blob_hash(text or "")
+        if digest in self._known:
+            return digest
+        path = self._object_path(digest)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            _write_atomic(path, zlib.compress((text or "").encode("utf-8")))
+        self._known.add(digest)
+        return digest
+
+    def get(self, digest: str) -> str:
+        path = self._object_path(digest)
+        if not path.exists():
+            raise KeyError(f"Object not found in store: {digest}")
+        return zlib.decompress(path.read_bytes()).decode("utf-8")
+
+    def runs(self) -> List[str]:
+        """Return run ids, oldest first."""
+        if not self.runs_dir.exists():
+            return []
+        return sorted(p.stem for p in self.runs_dir.glob("*.json"))
+
+    def manifest(self, run_id: str) -> Dict[str, Any]:
+        path = self.runs_dir / f"{run_id}.json"
+        if not path.exists():
+            raise KeyError(f"Run not found in store: {run_id}")
+        return json.loads(path.read_text(encoding="utf-8"))
+
+    def start_run(self, run_id: Optional[str] = None) -> "RunRecorder":
+        return RunRecorder(self, run_id or new_run_id())
+
+    def diff(self, old_run: str, new_run: str) -> Dict[str, str]:
+        """Compare two runs by hash.
+
+        Returns a mapping of host to one of ``changed``, ``added`` or ``removed``;
+        hosts whose stdout, stderr and exit status are identical are omitted.
+        """
+        old = self.manifest(old_run)["hosts"]
+        new = self.manifest(new_run)["hosts"]
+        changes: Dict[str, str] = {}
+        for host, rec in new.items():
+            prev = old.get(host)
+            if prev is None:
+                changes[host] = "added"
+            elif (prev["stdout"], prev["stderr"], prev.get("exit_status")) != (
+                rec["stdout"],
+                rec["stderr"],
+                rec.get("exit_status"),
+            ):
+                changes[host] = "changed"
+        for host in old:
+            if host not in new:
+                changes[host] = "removed"
+        return changes
+
+
+def new_run_id() -> str:
+    """Chronologically sortable run id, e.g. ``20240101T120000.000123Z-1a2b3c``."""
+    return f"{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S.%fZ')}-{secrets.token_hex(3)}"
+
+
+class RunRecorder:
+    """Collects per-host hashes for one run and writes its manifest on close."""
+
+    def __init__(self, store: OutputStore, run_id: str) -> None:
+        self.store = store
+        self.run_id = run_id
+        self.started_at = datetime.now(timezone.utc).isoformat()
+        self.hosts: Dict[str, Dict[str, Any]] = {}
+
+    def add(self, host: str, stdout: str, stderr: str, meta: Optional[Dict[str, Any]] = None) -> None:
+        self.hosts[host] = dict(
+            meta or {},
+            stdout=self.store.put(stdout),
+            stderr=self.store.put(stderr),
+        )
+
+    def close(self) -> None:
+        self.store.runs_dir.mkdir(parents=True, exist_ok=True)
+        manifest = {
+            "run_id": self.run_id,
+            "started_at": self.started_at,
+            "ended_at": datetime.now(timezone.utc).isoformat(),
+            "hosts": self.hosts,
+        }
+        _write_atomic(self.store.runs_dir / f"{self.run_id}.json", json.dumps(manifest).encode("utf-8"))
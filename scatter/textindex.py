@@ -0,0 +1,188 @@
+"""Trigram index over per-host outputs for fast fleet-wide grep.
+
+``IndexWriter`` is a run sink: each host's stdout and stderr become documents
+whose (lower-cased, UTF-8) byte trigrams are added to an in-memory inverted
+index as hosts complete; the index is written once on close. ``search`` turns a
+pattern into the trigrams any match must contain, intersects their posting
+lists and only reads and regex-scans the candidate documents.
+
+Index file layout (all integers big-endian)
+- ``MAGIC``, then ``_HEADER``: document count, docs-JSON length, trigram count.
+- Documents as JSON: ``[[host, stream], ...]``; document ids are list positions.
+- Trigram table: fixed-size ``_ENTRY`` records sorted by trigram, binary searched
+  in place so lookups do not load the whole table.
+- Posting lists: ``uint32`` document ids.
+"""
+
+from __future__ import annotations
+
+import json
+import mmap
+import re
+import struct
+from array import array
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+try:  # Python 3.11+
+    from re import _parser as _sre_parse  # type: ignore[attr-defined]
+except ImportError:  # pragma: no cover - Python 3.10
+    import sre_parse as _sre_parse  # type: ignore[no-redef]
+
+MAGIC = b"SCATGRI1"
+_HEADER = struct.Struct(">III")  # doc_count, docs_len, trigram_count
+_ENTRY = struct.Struct(">3sII")  # trigram, postings offset (in ids), count
+STREAMS = ("stdout", "stderr")
+# Index file name inside a ``--save-dir``; archives get ``<archive>.idx`` alongside
+SAVE_DIR_INDEX = "outputs.idx"
+
+
+def _trigrams(text: str) -> Set[bytes]:
+    data = text.lower().encode("utf-8")
+    return {data[i : i + 3] for i in range(len(data) - 2)}
+
+
+class IndexWriter:
+    """Run sink that builds a trigram index and writes it to one or more paths."""
+
+    def __init__(self, paths: Sequence[Path | str]) -> None:
+        self.paths = [Path(p) for p in paths]
+        self._docs: List[Tuple[str, str]] = []
+        self._postings: Dict[bytes, array] = {}
+
+    def add(self, host: str, stdout: str, stderr: str, meta: Optional[Dict[str, Any]] = None) -> None:
+        for stream, text in zip(STREAMS, (stdout, stderr)):
+            if not text:
+                continue
+            doc_id = len(self._docs)
+            self._docs.append((host, stream))
+            postings = self._postings
+            for tri in _trigrams(text):
+                ids = postings.get(tri)
+                if ids is None:
+                    ids = postings[tri] = array("I")
+                ids.append(doc_id)
+
+    def close(self) -> None:
+        docs = json.dumps(self._docs).encode("utf-8")
+        table = bytearray()
+        ids = array("I")
+        for tri in sorted(self._postings):
+            plist = self._postings[tri]
+            table += _ENTRY.pack(tri, len(ids), len(plist))
+            ids.extend(plist)
+        if ids.itemsize != 4:  # pragma: no cover - exotic platforms
+            raise RuntimeError("uint32 array type unavailable")
+        if struct.pack("=I", 1) != struct.pack(">I", 1):
+            ids.byteswap()
+        payload = b"".join((MAGIC, _HEADER.pack(len(self._docs), len(docs), len(self._postings)), docs, bytes(table), ids.tobytes()))
+        for path in self.paths:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(payload)
+
+
+class IndexReader:
+    """Memory-mapped reader for index files written by ``IndexWriter``."""
+
+    def __init__(self, path: Path | str) -> None:
+        self.path = Path(path)
+        if not self.path.exists():
+            raise FileNotFoundError(f"Index not found: {self.path}")
+        with self.path.open("rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[: len(MAGIC)] != MAGIC:
+            self._mm.close()
+            raise ValueError(f"Not a scatter output index: {self.path}")
+        pos = len(MAGIC)
+        self.doc_count, docs_len, self._ntri = _HEADER.unpack_from(self._mm, pos)
+        pos += _HEADER.size
+        self.docs: List[Tuple[str, str]] = [tuple(d) for d in json.loads(self._mm[pos : pos + docs_len])]  # type: ignore[misc]
+        self._table = pos + docs_len
+        self._ids = self._table + self._ntri * _ENTRY.size
+
+    def _lookup(self, tri: bytes) -> Optional[Tuple[int, int]]:
+        lo, hi = 0, self._ntri
+        while lo < hi:
+            mid = (lo + hi) // 2
+            key, offset, count = _ENTRY.unpack_from(self._mm, self._table + mid * _ENTRY.size)
+            if key == tri:
+                return offset, count
+            if key < tri:
+                lo = mid + 1
+            else:
+                hi = mid
+        return None
+
+    def postings(self, tri: bytes) -> Set[int]:
+        found = self._lookup(tri)
+        if found is None:
+            return set()
+        offset, count = found
+        start = self._ids + offset * 4
+        return set(struct.unpack_from(f">{count}I", self._mm, start))
+
+    def candidates(self, trigrams: Iterable[bytes]) -> Set[int]:
+        """Documents containing every trigram (all documents if none given)."""
+        result: Optional[Set[int]] = None
+        # Intersect smallest posting lists first
+        lists = sorted((self.postings(t) for t in set(trigrams)), key=len)
+        for plist in lists:
+            result = plist if result is None else result & plist
+            if not result:
+                return set()
+        return set(range(self.doc_count)) if result is None else result
+
+    def close(self) -> None:
+        self._mm.close()
+
+    def __enter__(self) -> "IndexReader":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+def required_literals(pattern: str, fixed: bool = False) -> List[str]:
+    """Literal substrings that every match of ``pattern`` must contain.
+
+    Only top-level runs of literal characters are considered; anything that is
+    optional, repeated or alternated breaks a run. Returns an empty list when
+    nothing can be required (the search then scans every document).
+    """
+    if fixed:
+        return [pattern]
+    try:
+        parsed = _sre_parse.parse(pattern)
+    except Exception:
+        return []
+    runs: List[str] = []
+    current: List[str] = []
+    for op, arg in parsed:
+        if op == _sre_parse.LITERAL:
+            current.append(chr(arg))
+            continue
+        if current:
+            runs.append("".join(current))
+            current = []
+    if current:
+        runs.append("".join(current))
+    return runs
+
+
+def search(
+    index: IndexReader,
+    pattern: str,
+    read_doc: Callable[[str, str], str],
+    ignore_case: bool = False,
+    fixed: bool = False,
+) -> Iterator[Tuple[str, str, str]]:
+    """Yield ``(host, stream, line)`` for matching lines, reading only candidate documents."""
+    regex = re.compile(re.escape(pattern) if fixed else pattern, re.IGNORECASE if ignore_case else 0)
+    trigrams: Set[bytes] = set()
+    for lit in required_literals(pattern, fixed):
+        trigrams |= _trigrams(lit)
+    for doc_id in sorted(index.candidates(trigrams)):
+        host, stream = index.docs[doc_id]
+        for line in read_doc(host, stream).splitlines():
+            if regex.search(line):
+                yield host, stream, line
@@ -0,0 +1,105 @@
+"""Chrome trace-event export of per-host timelines (``scatter run --trace``).
+
+``TraceRecorder`` is installed as ``scatter.ssh.phase_observer`` for the run
+and collects every timed phase. ``write`` lays the spans out as a Chrome
+trace-event JSON file, which Perfetto (https://ui.perfetto.dev) and
+``chrome://tracing`` open directly:
+
+- One track per concurrency slot. Each host appears on the slot it held as a
+  span named after the host (with its status in the span's args), with its
+  ``dns``/``connect``/``handshake``/``auth``/``exec``/``drain``/``close``
+  phases nested below. Retries show up as repeated phases within one host.
+- Time spent waiting for a slot is drawn as async ``queue`` spans, so slot
+  starvation shows as a wall of queued hosts next to idle or busy slots.
+
+Slots are assigned after the run: hosts are ordered by when they acquired a
+slot and each takes the lowest-numbered slot free at that moment.
+"""
+
+from __future__ import annotations
+
+import heapq
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+_PID = 1
+
+
+class TraceRecorder:
+    """Collect ``(host, phase, start, end)`` spans from ``scatter.ssh``."""
+
+    def __init__(self) -> None:
+        self.spans: List[Tuple[str, str, float, float]] = []
+
+    def __call__(self, host: str, phase: str, start: float, end: float) -> None:
+        self.spans.append((host, phase, start, end))
+
+    def events(self, results: Iterable[Any] = ()) -> List[Dict[str, Any]]:
+        """Chrome trace events for the recorded spans; ``results`` annotate host spans."""
+        if not self.spans:
+            return []
+        origin = min(start for _, _, start, _ in self.spans)
+
+        def us(t: float) -> float:
+            return round((t - origin) * 1e6, 1)
+
+        status: Dict[str, Dict[str, Any]] = {}
+        for r in results:
+            status[r.host] = {"ok": r.ok, "exit_status": r.exit_status, "error": r.error}
+
+        holds = sorted((start, end, host) for host, phase, start, end in self.spans if phase == "slot")
+        # host -> [(start, end, slot)] in acquisition order
+        slots_by_host: Dict[str, List[Tuple[float, float, int]]] = {}
+        free: List[int] = []
+        busy: List[Tuple[float, int]] = []  # (release time, slot)
+        next_slot = 0
+        for start, end, host in holds:
+            while busy and busy[0][0] <= start:
+                heapq.heappush(free, heapq.heappop(busy)[1])
+            if free:
+                slot = heapq.heappop(free)
+            else:
+                slot, next_slot = next_slot, next_slot + 1
+            heapq.heappush(busy, (end, slot))
+            slots_by_host.setdefault(host, []).append((start, end, slot))
+
+        def slot_of(host: str, t: float) -> Optional[int]:
+            for start, end, slot in slots_by_host.get(host, ()):
+                if start <= t <= end:
+                    return slot
+            return None
+
+        events: List[Dict[str, Any]] = [
+            {"ph": "M", "pid": _PID, "name": "process_name", "args": {"name": "scatter run"}},
+        ]
+        for slot in range(next_slot):
+            events.append({"ph": "M", "pid": _PID, "tid": slot + 1, "name": "thread_name", "args": {"name": f"slot {slot + 1}"}})
+            events.append({"ph": "M", "pid": _PID, "tid": slot + 1, "name": "thread_sort_index", "args": {"sort_index": slot}})
+        for queue_id, (host, phase, start, end) in enumerate(self.spans):
+            if phase == "queue":
+                common = {"cat": "queue", "name": "queue", "id": queue_id, "pid": _PID, "args": {"host": host}}
+                events.append({**common, "ph": "b", "ts": us(start)})
+                events.append({**common, "ph": "e", "ts": us(end)})
+            elif phase == "slot":
+                slot = slot_of(host, start)
+                events.append(
+                    {
+                        "ph": "X", "cat": "host", "name": host, "pid": _PID, "tid": (slot or 0) + 1,
+                        "ts": us(start), "dur": us(end) - us(start), "args": status.get(host, {}),
+                    }
+                )
+            else:
+                slot = slot_of(host, start)
+                events.append(
+                    {
+                        "ph": "X", "cat": "phase", "name": phase, "pid": _PID, "tid": (slot or 0) + 1,
+                        "ts": us(start), "dur": us(end) - us(start), "args": {"host": host},
+                    }
+                )
+        return events
+
+    def write(self, path: Path, results: Iterable[Any] = ()) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("w", encoding="utf-8") as f:
+            json.dump({"traceEvents": self.events(results), "displayTimeUnit": "ms"}, f)
@@ -4,6 +4,15 @@ Entry point for PyInstaller standalone executable.
 This avoids relative import issues by importing the full module path.
 """
 
+import sys
+
 if __name__ == "__main__":
+    from scatter.dynamic import REFRESH_COMMAND, refresher_main
+
+    # Background inventory refresh (see scatter.dynamic.refresher_command): the
+    # frozen binary cannot be started with "-m scatter.dynamic"
+    if sys.argv[1:2] == [REFRESH_COMMAND]:
+        sys.exit(refresher_main(sys.argv[2:]))
+
     from scatter.cli import app
     app()
@@ -2,10 +2,19 @@
 """
 Test build script functionality without actually building.
 This verifies the build script dependencies and setup.
+
+With --startup-benchmark it instead times launches of a built artifact
+(cold = first launch, warm = median of the following ones), e.g.:
+
+    python test_build.py --startup-benchmark dist/scatter-0.2.0-linux-x86_64/scatter-0.2.0-linux-x86_64 --max-warm 0.5
 """
 
+import argparse
+import shlex
+import statistics
 import sys
 import subprocess
+import time
 from pathlib import Path
 
 
@@ -67,8 +76,58 @@ def test_scatter_import():
         return False
 
 
+def measure_startup(command, runs=5, timeout=60):
+    """Launch ``command --help`` ``runs`` times; return (cold, [warm...]) wall times in seconds."""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run([*command, "--help"], capture_output=True, text=True, timeout=timeout)
+        times.append(time.perf_counter() - start)
+        if result.returncode != 0 or "Concurrent SSH executor" not in result.stdout:
+            raise RuntimeError(f"{' '.join(command)} --help failed (code {result.returncode}): {result.stderr[:300]}")
+    return times[0], times[1:]
+
+
+def benchmark_startup(command, runs=5, max_cold=None, max_warm=None):
+    """Report cold and warm launch times for ``command``; False if a budget is exceeded."""
+    print(f"⏱️  Startup benchmark: {' '.join(command)}")
+    try:
+        cold, warm = measure_startup(command, runs=max(2, runs))
+    except (OSError, RuntimeError, subprocess.TimeoutExpired) as e:
+        print(f"❌ Could not launch: {e}")
+        return False
+    warm_median = statistics.median(warm)
+    print(f"  cold: {cold * 1000:.0f} ms")
+    print(f"  warm: {warm_median * 1000:.0f} ms (median of {len(warm)}, best {min(warm) * 1000:.0f} ms)")
+
+    ok = True
+    if max_cold is not None and cold > max_cold:
+        print(f"❌ Cold start over budget ({max_cold * 1000:.0f} ms)")
+        ok = False
+    if max_warm is not None and warm_median > max_warm:
+        print(f"❌ Warm start over budget ({max_warm * 1000:.0f} ms)")
+        ok = False
+    if ok:
+        print("✅ Startup within budget" if (max_cold or max_warm) else "✅ Startup measured")
+    return ok
+
+
 def main():
     """Run tests."""
+    parser = argparse.ArgumentParser(description="Check build prerequisites or benchmark a built artifact")
+    parser.add_argument("--startup-benchmark", metavar="COMMAND",
+                        help="Benchmark launch times of COMMAND (e.g. a built binary, or 'python -m scatter')")
+    parser.add_argument("--runs", type=int, default=5, help="Launches per benchmark (first one counts as cold)")
+    parser.add_argument("--max-cold", type=float, help="Cold start budget in seconds")
+    parser.add_argument("--max-warm", type=float, help="Warm start budget in seconds (median)")
+    args = parser.parse_args()
+
+    if args.startup_benchmark:
+        command = shlex.split(args.startup_benchmark)
+        if not benchmark_startup(command, runs=args.runs, max_cold=args.max_cold, max_warm=args.max_warm):
+            sys.exit(1)
+        return
+
     if not Path("pyproject.toml").exists():
         print("❌ Not in project root (no pyproject.toml)")
         sys.exit(1)
@@ -0,0 +1,83 @@
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from scatter.archive import ArchiveReader, ArchiveWriter
+from scatter.cli import app
+from scatter.ssh import ExecResult
+
+
+@pytest.fixture()
+def runner() -> CliRunner:
+    return CliRunner()
+
+
+def test_archive_roundtrip_with_index(tmp_path: Path) -> None:
+    path = tmp_path / "run.scat"
+    with ArchiveWriter(path) as w:
+        w.add("a", "out-a\n", "", {"ok": True, "exit_status": 0})
+        w.add("b", "", "err-b\n", {"ok": False, "exit_status": 2})
+
+    with ArchiveReader(path) as r:
+        assert r.hosts() == ["a", "b"]
+        assert r.stdout("a") == "out-a\n"
+        assert r.stderr("b") == "err-b\n"
+        assert r.meta("b")["exit_status"] == 2
+        with pytest.raises(KeyError):
+            r.stdout("missing")
+
+
+def test_archive_without_trailer_is_scanned(tmp_path: Path) -> None:
+    path = tmp_path / "partial.scat"
+    w = ArchiveWriter(path)
+    w.add("h1", "one", "")
+    w.add("h2", "two", "")
+    # Simulate an interrupted run: records flushed but no index/trailer written
+    w._fh.close()  # type: ignore[union-attr]
+    w._fh = None
+
+    with ArchiveReader(path) as r:
+        assert r.hosts() == ["h1", "h2"]
+        assert r.stdout("h2") == "two"
+
+
+def test_run_archive_and_show(runner: CliRunner, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    inv = tmp_path / "inv.yaml"
+    inv.write_text(
+        """
+        defaults:
+          username: u
+          known_hosts: off
+        hosts:
+          - host: a
+            command: echo a
+          - host: b
+            command: echo b
+        """,
+        encoding="utf-8",
+    )
+
+    async def fake(host: str, cmd: str, options, semaphore) -> ExecResult:  # type: ignore[override]
+        if host == "a":
+            return ExecResult(host=host, exit_status=0, stdout="alpha\n", stderr="", ok=True, started_at=0.0, ended_at=0.1)
+        return ExecResult(host=host, exit_status=1, stdout="", stderr="bad\n", ok=False, started_at=0.0, ended_at=0.2)
+
+    monkeypatch.setattr("scatter.ssh.run_on_host", fake)
+
+    arc = tmp_path / "nested" / "run.scat"
+    res = runner.invoke(app, ["run", "--inventory", str(inv), "--no-progress", "--archive", str(arc)])
+    assert res.exit_code == 1
+    assert arc.exists()
+
+    res = runner.invoke(app, ["show", str(arc), "a"])
+    assert res.exit_code == 0
+    assert res.stdout == "alpha\n"
+
+    res = runner.invoke(app, ["show", str(arc), "b", "--stderr"])
+    assert res.exit_code == 0
+    assert res.stdout == "bad\n"
+
+    res = runner.invoke(app, ["show", str(arc)])
+    assert res.exit_code == 0
+    assert "a" in res.stdout and "FAIL" in res.stdout
@@ -0,0 +1,128 @@
+from pathlib import Path
+from typing import Dict
+
+import pytest
+from typer.testing import CliRunner
+
+from scatter.cli import app
+from scatter.drift import ChangeTracker
+from scatter.history import HistoryRecorder
+from scatter.ssh import ExecResult
+
+
+@pytest.fixture()
+def runner() -> CliRunner:
+    return CliRunner()
+
+
+def test_tracker_classifies_against_last_fingerprint(tmp_path: Path) -> None:
+    db = tmp_path / "h.db"
+    rec = HistoryRecorder(db, keep_outputs=True)
+    rec.add("a", "x\n", "", {"ok": True, "exit_status": 0, "command": "cat f"})
+    rec.add("b", "y\n", "", {"ok": True, "exit_status": 0, "command": "cat f"})
+    rec.close()
+
+    tracker = ChangeTracker(db, ["cat f"], with_previous_output=True)
+    assert tracker.check("a", "cat f", 0, "x\n", "") is None
+    change = tracker.check("b", "cat f", 0, "z\n", "")
+    assert change is not None and change.status == "changed"
+    assert change.previous_stdout == "y\n"
+    assert tracker.check("c", "cat f", 0, "x\n", "").status == "new"  # type: ignore[union-attr]
+    # Same output under a different command is tracked separately
+    assert tracker.check("a", "cat g", 0, "x\n", "").status == "new"  # type: ignore[union-attr]
+    # Exit status is part of the fingerprint
+    assert tracker.check("a", "cat f", 1, "x\n", "") is not None
+    assert tracker.unchanged == 1
+    tracker.close()
+
+
+def test_changed_only_renders_deltas(runner: CliRunner, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("XDG_STATE_HOME", str(tmp_path / "state"))
+    inv = tmp_path / "inv.yaml"
+    inv.write_text(
+        """
+        defaults:
+          username: u
+          known_hosts: off
+        hosts:
+          - host: steady
+            command: cat /etc/app.conf
+          - host: drifted
+            command: cat /etc/app.conf
+        """,
+        encoding="utf-8",
+    )
+    outputs: Dict[str, str] = {"steady": "a=1\n", "drifted": "a=1\n"}
+
+    async def fake(host: str, cmd: str, options, semaphore) -> ExecResult:  # type: ignore[override]
+        return ExecResult(host=host, exit_status=0, stdout=outputs[host], stderr="", ok=True, started_at=0.0, ended_at=0.1)
+
+    monkeypatch.setattr("scatter.ssh.run_on_host", fake)
+
+    args = ["run", "--inventory", str(inv), "--no-progress", "--changed-only", "--show-diff"]
+    res = runner.invoke(app, args)
+    assert res.exit_code == 0
+    # First run: everything is new
+    assert "Changed: 2, Unchanged: 0" in res.stdout
+    assert (tmp_path / "state" / "scatter" / "history.db").exists()
+
+    outputs["drifted"] = "a=2\n"
+    res = runner.invoke(app, args)
+    assert res.exit_code == 0
+    assert "Changed: 1, Unchanged: 1" in res.stdout
+    assert "drifted" in res.stdout
+    assert "steady" not in res.stdout
+    assert "-a=1" in res.stdout and "+a=2" in res.stdout
+
+
+def test_run_without_diff_keeps_stored_outputs(runner: CliRunner, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("XDG_STATE_HOME", str(tmp_path / "state"))
+    inv = tmp_path / "inv.yaml"
+    inv.write_text(
+        """
+        defaults:
+          username: u
+          known_hosts: off
+        hosts:
+          - host: drifted
+            command: cat /etc/app.conf
+        """,
+        encoding="utf-8",
+    )
+    outputs: Dict[str, str] = {"drifted": "a=1\n"}
+
+    async def fake(host: str, cmd: str, options, semaphore) -> ExecResult:  # type: ignore[override]
+        return ExecResult(host=host, exit_status=0, stdout=outputs[host], stderr="", ok=True, started_at=0.0, ended_at=0.1)
+
+    monkeypatch.setattr("scatter.ssh.run_on_host", fake)
+
+    args = ["run", "--inventory", str(inv), "--no-progress", "--changed-only"]
+    assert runner.invoke(app, [*args, "--show-diff"]).exit_code == 0
+    assert runner.invoke(app, args).exit_code == 0
+
+    outputs["drifted"] = "a=2\n"
+    res = runner.invoke(app, [*args, "--show-diff"])
+    assert res.exit_code == 0
+    assert "-a=1" in res.stdout and "+a=2" in res.stdout
+
+
+def test_diff_is_never_against_an_older_output(runner: CliRunner, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("XDG_STATE_HOME", str(tmp_path / "state"))
+    inv = tmp_path / "inv.yaml"
+    inv.write_text("defaults:\n  known_hosts: off\nhosts:\n  - host: h\n", encoding="utf-8")
+    outputs: Dict[str, str] = {"h": "v1\n"}
+
+    async def fake(host: str, cmd: str, options, semaphore) -> ExecResult:  # type: ignore[override]
+        return ExecResult(host=host, exit_status=0, stdout=outputs[host], stderr="", ok=True, started_at=0.0, ended_at=0.1)
+
+    monkeypatch.setattr("scatter.ssh.run_on_host", fake)
+
+    args = ["run", "cat f", "--inventory", str(inv), "--no-progress"]
+    assert runner.invoke(app, [*args, "--show-diff"]).exit_code == 0
+    outputs["h"] = "v2\n"
+    assert runner.invoke(app, [*args, "--changed-only"]).exit_code == 0
+    outputs["h"] = "v3\n"
+    res = runner.invoke(app, [*args, "--show-diff"])
+    assert res.exit_code == 0
+    assert "-v1" not in res.stdout
+    assert "(no previous output recorded)" in res.stdout
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+from typing import Iterator, List
+
+import pytest
+import yaml
+
+from scatter import config
+from scatter.config import iter_hosts, load_inventory
+from scatter.ssh import ExecOptions, ExecResult, execute_on_hosts
+
+
+def write_big(path: Path, n: int) -> None:
+    lines = ["defaults:", "  username: ubuntu", "hosts:"]
+    for i in range(n):
+        lines += [f"  - host: web{i:04d}", "    tags: [web, dc1]", "    command: uptime"]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def test_uses_c_loader_when_available() -> None:
+    if getattr(yaml, "CSafeLoader", None) is not None:
+        assert config._Loader is yaml.CSafeLoader
+
+
+def test_iter_hosts_streams_and_shares_strings(tmp_path: Path) -> None:
+    p = tmp_path / "inv.yaml"
+    write_big(p, 500)
+
+    it = iter_hosts(p)
+    first = next(it)
+    assert first.host == "web0000"
+    rest = list(it)
+    assert len(rest) == 499
+    # Repeated values are shared rather than duplicated per host
+    assert first.command is rest[-1].command
+    assert first.tags[0] is rest[-1].tags[0]
+    assert not hasattr(first, "__dict__")
+
+
+def test_load_inventory_yaml_semantics(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("PW", "secret")
+    p = tmp_path / "inv.yaml"
+    p.write_text(
+        """
+        common: &common
+          username: deploy
+          port: 2200
+          tags: [base]
+        hosts:
+          - <<: *common
+            host: a
+            password: env:PW
+          - host: b
+            <<: [*common]
+            port: 2201
+          - host: 10.0.0.1
+            command: 'echo "quoted: yes"'
+        defaults:
+          known_hosts: no
+          port: 2222
+        """,
+        encoding="utf-8",
+    )
+    inv = load_inventory(p)
+    assert inv.defaults.known_hosts == "off"
+    assert inv.defaults.port == 2222
+    a, b, c = inv.hosts
+    assert (a.username, a.port, a.tags, a.password) == ("deploy", 2200, ["base"], "secret")
+    assert (b.username, b.port) == ("deploy", 2201)
+    assert c.host == "10.0.0.1" and c.command == 'echo "quoted: yes"'
+
+
+def test_hosts_alias_is_resolved(tmp_path: Path) -> None:
+    p = tmp_path / "inv.yaml"
+    p.write_text(
+        """
+        fleet: &fleet
+          - host: a
+          - host: b
+        hosts: *fleet
+        """,
+        encoding="utf-8",
+    )
+    assert [h.host for h in load_inventory(p).hosts] == ["a", "b"]
+    assert [h.host for h in iter_hosts(p)] == ["a", "b"]
+
+    # A streamed, anchored hosts list can itself be aliased later on
+    anchored = tmp_path / "anchored.yaml"
+    anchored.write_text("hosts: &fleet\n  - host: a\nspare: *fleet\n", encoding="utf-8")
+    assert [h.host for h in load_inventory(anchored).hosts] == ["a"]
+
+
+def test_hosts_that_is_not_a_list_is_an_error(tmp_path: Path) -> None:
+    for value in ("web1", "{host: web1}", "*one", "42"):
+        p = tmp_path / "inv.yaml"
+        p.write_text(f"one: &one {{host: a}}\nhosts: {value}\n", encoding="utf-8")
+        with pytest.raises(ValueError, match="'hosts' must be a list"):
+            load_inventory(p)
+        with pytest.raises(ValueError, match="'hosts' must be a list"):
+            list(iter_hosts(p))
+
+
+def test_empty_and_invalid_documents(tmp_path: Path) -> None:
+    empty = tmp_path / "empty.yaml"
+    empty.write_text("", encoding="utf-8")
+    with pytest.raises(ValueError):
+        load_inventory(empty)
+
+    not_mapping = tmp_path / "list.yaml"
+    not_mapping.write_text("- host: a\n", encoding="utf-8")
+    with pytest.raises(ValueError):
+        load_inventory(not_mapping)
+
+
+def test_execute_on_hosts_starts_while_consuming(monkeypatch: pytest.MonkeyPatch) -> None:
+    started: List[str] = []
+    consumed: List[str] = []
+
+    async def fake(host: str, command: str, options: ExecOptions, semaphore: asyncio.Semaphore):  # type: ignore[override]
+        started.append(host)
+        return ExecResult(host=host, exit_status=0, stdout="", stderr="", ok=True, started_at=0.0, ended_at=0.0)
+
+    monkeypatch.setattr("scatter.ssh.run_on_host", fake)
+
+    def hosts() -> Iterator[str]:
+        for i in range(600):
+            if i == 599:
+                # Tasks for earlier hosts have already begun by the time the last one is produced
+                assert started
+            consumed.append(f"h{i}")
+            yield f"h{i}"
+
+    opts = ExecOptions(
+        username=None, port=22, identity=None, password=None, known_hosts="off", connect_timeout=1.0, pty=False, limit=10
+    )
+    results = asyncio.run(execute_on_hosts(hosts(), "true", opts))
+    assert [r.host for r in results] == consumed
@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from scatter import dynamic
+from scatter.cli import app
+from scatter.config import iter_hosts, load_inventory
+
+
+@pytest.fixture(autouse=True)
+def cache_home(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg-cache"))
+    return tmp_path / "xdg-cache"
+
+
+def write_script(path: Path, hosts_file: Path, calls_file: Path) -> Path:
+    """A stand-in CMDB export: prints hosts_file wrapped as inventory JSON and counts calls."""
+    path.write_text(
+        f"""#!{sys.executable}
+import json, sys
+with open({str(calls_file)!r}, "a") as f:
+    f.write("x")
+hosts = open({str(hosts_file)!r}).read().split()
+json.dump({{"defaults": {{"username": "cmdb"}}, "hosts": [{{"host": h, "group": "fleet"}} for h in hosts],
+           "groups": {{"fleet": {{"defaults": {{"port": 2200}}}}}}}}, sys.stdout)
+""",
+        encoding="utf-8",
+    )
+    path.chmod(0o755)
+    return path
+
+
+def calls(calls_file: Path) -> int:
+    return len(calls_file.read_text()) if calls_file.exists() else 0
+
+
+def test_exec_source_is_cached_for_ttl(tmp_path: Path) -> None:
+    hosts_file, calls_file = tmp_path / "hosts", tmp_path / "calls"
+    hosts_file.write_text("a b", encoding="utf-8")
+    script = write_script(tmp_path / "cmdb.py", hosts_file, calls_file)
+
+    inv = load_inventory(f"exec:{script}", dynamic_ttl=60)
+    assert [h.host for h in inv.hosts] == ["a", "b"]
+    assert inv.defaults.username == "cmdb"
+    assert inv.hosts[0].port == 2200 and inv.hosts[0].tags == ["fleet"]
+    assert calls(calls_file) == 1
+    cache = dynamic.default_dir()
+    assert cache.stat().st_mode & 0o777 == 0o700
+    assert all(e.stat().st_mode & 0o777 == 0o600 for e in cache.iterdir())
+
+    hosts_file.write_text("a b c", encoding="utf-8")
+    assert [h.host for h in load_inventory(f"exec:{script}", dynamic_ttl=60).hosts] == ["a", "b"]
+    assert calls(calls_file) == 1
+
+
+def test_expired_source_is_served_stale_and_refreshed_in_background(tmp_path: Path) -> None:
+    hosts_file, calls_file = tmp_path / "hosts", tmp_path / "calls"
+    hosts_file.write_text("a", encoding="utf-8")
+    script = write_script(tmp_path / "cmdb.py", hosts_file, calls_file)
+    load_inventory(f"exec:{script}", dynamic_ttl=0.01)
+    time.sleep(0.05)
+
+    hosts_file.write_text("a z", encoding="utf-8")
+    # Expired: the previous result is returned without waiting for the source
+    assert [h.host for h in load_inventory(f"exec:{script}", dynamic_ttl=0.01).hosts] == ["a"]
+
+    deadline = time.time() + 20
+    while calls(calls_file) < 2 and time.time() < deadline:
+        time.sleep(0.05)
+    source = dynamic.parse_source(f"exec:{script}", Path.cwd(), ttl=3600)
+    while time.time() < deadline:
+        lock = dynamic._entry_path(dynamic.default_dir(), source).with_suffix(".lock")
+        if not lock.exists():
+            break
+        time.sleep(0.05)
+    assert [h.host for h in load_inventory(f"exec:{script}", dynamic_ttl=3600).hosts] == ["a", "z"]
+
+
+def test_include_sources_and_python_callables(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    (tmp_path / "cmdb_plugin.py").write_text(
+        "def hosts():\n    return [{'host': 'py1', 'tags': ['cmdb']}]\n",
+        encoding="utf-8",
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    hosts_file, calls_file = tmp_path / "hosts", tmp_path / "calls"
+    hosts_file.write_text("e1", encoding="utf-8")
+    write_script(tmp_path / "cmdb.py", hosts_file, calls_file)
+    inv_path = tmp_path / "inv.yaml"
+    inv_path.write_text(
+        """
+        include:
+          - py:cmdb_plugin:hosts
+          - {exec: ./cmdb.py, ttl: 600}
+        hosts:
+          - host: static
+        """,
+        encoding="utf-8",
+    )
+    inv = load_inventory(inv_path)
+    assert [h.host for h in inv.hosts] == ["static", "py1", "e1"]
+    assert inv.hosts[1].tags == ["cmdb"]
+
+
+def test_failing_source_raises(tmp_path: Path) -> None:
+    script = tmp_path / "broken.sh"
+    script.write_text("#!/bin/sh\necho 'cmdb unreachable' >&2\nexit 3\n", encoding="utf-8")
+    script.chmod(0o755)
+    with pytest.raises(ValueError, match="cmdb unreachable"):
+        load_inventory(f"exec:{script}")
+    with pytest.raises(ValueError):
+        dynamic.parse_source("exec:")
+
+
+def test_cli_accepts_dynamic_inventory(tmp_path: Path) -> None:
+    script = tmp_path / "list.sh"
+    script.write_text('#!/bin/sh\necho \'[{"host": "d1"}, {"host": "d2"}]\'\n', encoding="utf-8")
+    script.chmod(0o755)
+    res = CliRunner().invoke(app, ["run", "true", "--dry-run", "--inventory", f"exec:{script}", "--inventory-ttl", "30"])
+    assert res.exit_code == 0, res.stdout
+    assert "d1" in res.stdout and "d2" in res.stdout
+
+
+def test_ttl_zero_and_no_cache_fetch_now(tmp_path: Path) -> None:
+    hosts_file, calls_file = tmp_path / "hosts", tmp_path / "calls"
+    hosts_file.write_text("a", encoding="utf-8")
+    script = write_script(tmp_path / "cmdb.py", hosts_file, calls_file)
+    load_inventory(f"exec:{script}", dynamic_ttl=3600)
+
+    hosts_file.write_text("a b", encoding="utf-8")
+    assert [h.host for h in load_inventory(f"exec:{script}", dynamic_ttl=0).hosts] == ["a", "b"]
+    hosts_file.write_text("a b c", encoding="utf-8")
+    assert [h.host for h in load_inventory(f"exec:{script}", dynamic_ttl=3600, dynamic_cache=False).hosts] == ["a", "b", "c"]
+    assert calls(calls_file) == 3
+
+    hosts_file.write_text("d", encoding="utf-8")
+    args = ["run", "true", "--dry-run", "--inventory", f"exec:{script}"]
+    res = CliRunner().invoke(app, [*args, "--no-inventory-cache"])
+    assert res.exit_code == 0, res.stdout
+    assert "Will run on 1 hosts" in res.stdout
+
+
+def test_exec_inventory_keeps_double_slashes(tmp_path: Path) -> None:
+    script = tmp_path / "echo_arg.py"
+    script.write_text(
+        f"#!{sys.executable}\nimport json, sys\njson.dump([{{'host': sys.argv[1].replace('/', '_')}}], sys.stdout)\n",
+        encoding="utf-8",
+    )
+    script.chmod(0o755)
+    res = CliRunner().invoke(app, ["run", "true", "--dry-run", "--inventory", f"exec:{script} https://cmdb/x"])
+    assert res.exit_code == 0, res.stdout
+    assert "https:__cmdb_x" in res.stdout
+
+
+def test_iter_hosts_accepts_mapping_include(tmp_path: Path) -> None:
+    script = tmp_path / "list.sh"
+    script.write_text('#!/bin/sh\necho \'[{"host": "d1"}]\'\n', encoding="utf-8")
+    script.chmod(0o755)
+    inv_path = tmp_path / "inv.yaml"
+    inv_path.write_text("include: {exec: ./list.sh, ttl: 60}\nhosts:\n  - host: static\n", encoding="utf-8")
+    assert [h.host for h in iter_hosts(inv_path)] == ["static", "d1"]
+    assert [h.host for h in load_inventory(inv_path).hosts] == ["static", "d1"]
+
+
+def test_frozen_build_refreshes_through_its_entry_point(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    import subprocess
+
+    hosts_file, calls_file = tmp_path / "hosts", tmp_path / "calls"
+    hosts_file.write_text("f1", encoding="utf-8")
+    script = write_script(tmp_path / "cmdb.py", hosts_file, calls_file)
+    source = dynamic.parse_source(f"exec:{script}", Path.cwd(), ttl=3600)
+    cache_dir, lock = tmp_path / "cache", tmp_path / "refresh.lock"
+    lock.touch()
+
+    args = (json.dumps(dynamic.asdict(source)), str(cache_dir), str(lock))
+    with monkeypatch.context() as m:
+        m.setattr(sys, "frozen", True, raising=False)
+        m.setattr(sys, "executable", "/opt/scatter/scatter")
+        cmd = dynamic.refresher_command(*args)
+    assert cmd == ["/opt/scatter/scatter", dynamic.REFRESH_COMMAND, *args]
+    assert dynamic.refresher_command(*args)[1:3] == ["-m", "scatter.dynamic"]
+
+    # What the binary does with that command line
+    entry = Path(__file__).resolve().parent.parent / "standalone_entry.py"
+    subprocess.run([sys.executable, str(entry), *cmd[1:]], check=True, timeout=60)
+    assert dynamic.fetch(source, cache_dir) == {
+        "defaults": {"username": "cmdb"},
+        "hosts": [{"host": "f1", "group": "fleet"}],
+        "groups": {"fleet": {"defaults": {"port": 2200}}},
+    }
+    assert calls(calls_file) == 1 and not lock.exists()
@@ -43,11 +43,61 @@ def test_include_exclude_tags(tmp_path: Path) -> None:
     out = proc.stdout
     assert "web-1" in out and "db-1" in out and "cache-1" in out
 
-    # With filters (currently not implemented in CLI; placeholder for future extension)
-    # This test documents desired behavior when filters are added in the future.
-    # We simply ensure current behavior doesn't crash with unknown args by skipping actual call.
+    def dry_run(*args: str) -> str:
+        proc = subprocess.run(
+            [sys.executable, "-m", "scatter", "run", "--dry-run", "--inventory", str(inv), *args],
+            capture_output=True,
+            text=True,
+        )
+        assert proc.returncode == 0, proc.stderr
+        return proc.stdout
 
+    # Include web or db, exclude staging
+    out = dry_run("--tags", "web,db", "--exclude-tags", "staging")
+    assert "web-1" in out and "db-1" not in out and "cache-1" not in out
+
+    out = dry_run("--tags", "!(web | db)")
+    assert "cache-1" in out and "web-1" not in out and "db-1" not in out
+
+
+def test_hosts_filter_pattern(tmp_path: Path) -> None:
+    inv = tmp_path / "inv.yaml"
+    inv.write_text(
+        """
+        hosts:
+          - host: web-1.dc1
+          - host: web-2.dc2
+          - host: db-1.dc1
+        """,
+        encoding="utf-8",
+    )
+    base = [sys.executable, "-m", "scatter", "run", "true", "--dry-run", "--inventory", str(inv)]
+
+    proc = subprocess.run([*base, "--host-filter", "*.dc1"], capture_output=True, text=True)
+    assert proc.returncode == 0
+    assert "web-1.dc1" in proc.stdout and "db-1.dc1" in proc.stdout and "web-2" not in proc.stdout
+
+    proc = subprocess.run([*base, "--host-filter", "~^web-[2-9]", "--host-filter", "db-*"], capture_output=True, text=True)
+    assert proc.returncode == 0
+    assert "web-2.dc2" in proc.stdout and "db-1.dc1" in proc.stdout and "web-1" not in proc.stdout
+
+    proc = subprocess.run([*base, "--host-filter", "nothing-*"], capture_output=True, text=True)
+    assert proc.returncode != 0
+
+
+def test_hosts_filter_bracket_globs(tmp_path: Path) -> None:
+    inv = tmp_path / "inv.yaml"
+    inv.write_text("hosts:\n  - host: db1\n  - host: db3\n  - host: web-4.dc1\n  - host: web-x.dc1\n", encoding="utf-8")
+    base = [sys.executable, "-m", "scatter", "run", "true", "--dry-run", "--inventory", str(inv)]
+
+    proc = subprocess.run([*base, "--host-filter", "db[12]"], capture_output=True, text=True)
+    assert proc.returncode == 0, proc.stderr
+    assert "db1" in proc.stdout and "db3" not in proc.stdout
+
+    proc = subprocess.run([*base, "--host-filter", "d[b]1"], capture_output=True, text=True)
+    assert proc.returncode == 0, proc.stderr
+    assert "db1" in proc.stdout and "db3" not in proc.stdout
 
-def test_hosts_filter_pattern_placeholder() -> None:
-    # Placeholder to keep a slot for host pattern filtering tests when implemented
-    assert True
+    proc = subprocess.run([*base, "--host-filter", "web-[0-9].dc1"], capture_output=True, text=True)
+    assert proc.returncode == 0, proc.stderr
+    assert "web-4.dc1" in proc.stdout and "web-x" not in proc.stdout
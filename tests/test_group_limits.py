@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+from typing import Dict, List
+
+import pytest
+from typer.testing import CliRunner
+
+from scatter.cli import app
+from scatter.config import HostEntry
+from scatter.limits import GroupLimit, GroupLimiter, host_groups, parse_group_limit
+from scatter.ssh import ExecResult
+
+
+def test_parse_group_limit() -> None:
+    assert parse_group_limit("tag:dc*=5") == GroupLimit("tag", "dc*", 5)
+    assert parse_group_limit("cidr:10.20.1.0/16=3") == GroupLimit("cidr", "10.20.0.0/16", 3)
+    assert parse_group_limit("attr:domain=2") == GroupLimit("attr", "domain", 2)
+    for bad in ("dc1=5", "tag:dc1", "zone:a=1", "tag:dc1=0", "tag:dc1=x", "cidr:10.0.0.300/8=1", "attr:os=1"):
+        with pytest.raises(ValueError):
+            parse_group_limit(bad)
+
+
+def test_host_groups() -> None:
+    hosts = [
+        HostEntry("10.20.0.5", tags=["dc1", "web"]),
+        HostEntry("node1.dc2.example.com", tags=["dc2"], port=2222),
+        HostEntry("10.30.0.5", tags=["web"]),
+    ]
+    limits = [parse_group_limit(s) for s in ("tag:dc*=4", "cidr:10.20.0.0/16=2", "attr:domain=3", "tag:dc1=1")]
+    groups, capacities = host_groups(hosts, limits)
+    assert groups == [("cidr:10.20.0.0/16", "tag:dc1"), ("attr:domain=dc2.example.com", "tag:dc2"), ()]
+    assert capacities == {"tag:dc1": 1, "tag:dc2": 4, "cidr:10.20.0.0/16": 2, "attr:domain=dc2.example.com": 3}
+    port_groups, _ = host_groups(hosts, [parse_group_limit("attr:port=1")], default_port=22)
+    assert port_groups == [("attr:port=22",), ("attr:port=2222",), ("attr:port=22",)]
+
+
+def test_saturated_group_does_not_block_others() -> None:
+    async def scenario():
+        limiter = GroupLimiter(3, {"small": 1, "big": 3})
+        started: List[str] = []
+        running: Dict[str, int] = {"small": 0, "big": 0}
+        peak: Dict[str, int] = {"small": 0, "big": 0}
+
+        async def host(name: str, group: str) -> None:
+            async with limiter.slot((group,)):
+                started.append(name)
+                running[group] += 1
+                peak[group] = max(peak[group], running[group])
+                await asyncio.sleep(0.01)
+                running[group] -= 1
+
+        # Queued small-group hosts come first but must not hold up the big group
+        names = [("s1", "small"), ("s2", "small"), ("s3", "small"), ("b1", "big"), ("b2", "big"), ("b3", "big")]
+        await asyncio.gather(*(host(n, g) for n, g in names))
+        return started, peak, limiter
+
+    started, peak, limiter = asyncio.run(scenario())
+    assert peak == {"small": 1, "big": 2}
+    assert started[:3] == ["s1", "b1", "b2"]
+    assert limiter.free == 3 and limiter.group_free == {"small": 1, "big": 3}
+
+
+def test_cancelled_waiter_releases_nothing_it_did_not_get() -> None:
+    async def scenario():
+        limiter = GroupLimiter(1, {"g": 1})
+        async with limiter.slot(("g",)):
+            waiter = asyncio.create_task(limiter.acquire(("g",)))
+            await asyncio.sleep(0)
+            waiter.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await waiter
+        return limiter
+
+    limiter = asyncio.run(scenario())
+    assert limiter.free == 1 and limiter.group_free == {"g": 1}
+
+
+def test_cli_applies_group_limits(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    inv = tmp_path / "inventory.yaml"
+    hosts = "".join(f"  - {{host: a{i}, tags: [dc1]}}\n  - {{host: b{i}, tags: [dc2]}}\n" for i in range(6))
+    inv.write_text(f"defaults:\n  known_hosts: off\nhosts:\n{hosts}", encoding="utf-8")
+    running: Dict[str, int] = {"a": 0, "b": 0}
+    peak: Dict[str, int] = {"a": 0, "b": 0}
+
+    async def fake(host: str, cmd: str, options, semaphore) -> ExecResult:  # type: ignore[override]
+        async with semaphore:
+            running[host[0]] += 1
+            peak[host[0]] = max(peak[host[0]], running[host[0]])
+            await asyncio.sleep(0.01)
+            running[host[0]] -= 1
+            return ExecResult(host, 0, "", "", True, 0.0, 0.1)
+
+    monkeypatch.setattr("scatter.ssh.run_on_host", fake)
+    args = ["run", "true", "--inventory", str(inv), "--no-progress", "--no-inventory-cache", "--limit", "5"]
+    res = CliRunner().invoke(app, [*args, "--group-limit", "tag:dc1=1"])
+    assert res.exit_code == 0, res.stdout
+    assert peak == {"a": 1, "b": 4}
+
+    res = CliRunner().invoke(app, [*args, "--group-limit", "tag:dc1"])
+    assert res.exit_code != 0 and "Invalid group limit" in res.output
+
+
+def test_cli_username_groups_use_defaulted_username(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    inv = tmp_path / "inventory.yaml"
+    hosts = "".join(f"  - {{host: a{i}}}\n  - {{host: b{i}, username: root}}\n" for i in range(4))
+    inv.write_text(f"defaults:\n  username: deploy\n  known_hosts: off\nhosts:\n{hosts}", encoding="utf-8")
+    running: Dict[str, int] = {"deploy": 0, "root": 0}
+    peak: Dict[str, int] = {"deploy": 0, "root": 0}
+
+    async def fake(host: str, cmd: str, options, semaphore) -> ExecResult:  # type: ignore[override]
+        async with semaphore:
+            running[options.username] += 1
+            peak[options.username] = max(peak[options.username], running[options.username])
+            await asyncio.sleep(0.01)
+            running[options.username] -= 1
+            return ExecResult(host, 0, "", "", True, 0.0, 0.1)
+
+    monkeypatch.setattr("scatter.ssh.run_on_host", fake)
+    args = ["run", "true", "--inventory", str(inv), "--no-progress", "--limit", "4", "--group-limit", "attr:username=1"]
+    res = CliRunner().invoke(app, args)
+    assert res.exit_code == 0, res.stdout
+    assert peak == {"deploy": 1, "root": 1}
@@ -0,0 +1,123 @@
+import sqlite3
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from scatter.cli import app
+from scatter.history import HistoryRecorder, connect, parse_since, query
+from scatter.ssh import ExecResult
+
+
+@pytest.fixture()
+def runner() -> CliRunner:
+    return CliRunner()
+
+
+def test_recorder_batches_and_query_filters(tmp_path: Path) -> None:
+    db = tmp_path / "h.db"
+    rec = HistoryRecorder(db)
+    for i in range(1200):
+        ok = i % 3 != 0
+        rec.add(
+            f"h{i}",
+            f"out {i}\n",
+            "",
+            {
+                "ok": ok,
+                "exit_status": 0 if ok else 2,
+                "duration_sec": 0.5,
+                "error": None if ok else "TimeoutError: slow",
+                "command": "uptime",
+            },
+        )
+    rec.close()
+    assert rec.run_id == 1
+
+    assert len(query(db, limit=10_000)) == 1200
+    failed = query(db, failed=True, limit=10_000)
+    assert len(failed) == 400
+    assert {r["exit_status"] for r in failed} == {2}
+    assert failed[0]["error_class"] == "TimeoutError"
+    assert failed[0]["command"] == "uptime"
+
+    rows = query(db, host="h7")
+    assert len(rows) == 1 and rows[0]["stdout_preview"] == "out 7\n"
+    assert len(query(db, host="h11*", limit=10_000)) == 111  # h11, h110-h119, h1100-h1199
+    assert query(db, since=parse_since("1h")) and not query(db, since=parse_since("2999-01-01"))
+
+
+def test_writer_error_is_raised_by_close(tmp_path: Path) -> None:
+    rec = HistoryRecorder(tmp_path / "h.db")
+    rec.add("a", "", "", {"ok": True, "duration_sec": object()})  # not bindable by sqlite
+    rec._thread.join(timeout=10)
+    rec.add("b", "", "", {"ok": True})  # dropped, not raised, while the run goes on
+    with pytest.raises(sqlite3.Error):
+        rec.close()
+
+
+def test_parse_since_rejects_garbage() -> None:
+    assert parse_since("2d", now=1_000_000.0) == 1_000_000.0 - 2 * 86400
+    with pytest.raises(ValueError):
+        parse_since("yesterday-ish")
+
+
+def test_run_history_db_and_history_command(runner: CliRunner, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    inv = tmp_path / "inv.yaml"
+    inv.write_text(
+        """
+        defaults:
+          username: u
+          known_hosts: off
+        hosts:
+          - host: good
+            command: echo ok
+          - host: bad
+            command: echo ok
+        """,
+        encoding="utf-8",
+    )
+
+    async def fake(host: str, cmd: str, options, semaphore) -> ExecResult:  # type: ignore[override]
+        if host == "good":
+            return ExecResult(host=host, exit_status=0, stdout="ok\n", stderr="", ok=True, started_at=0.0, ended_at=0.1)
+        return ExecResult(host=host, exit_status=None, stdout="", stderr="", ok=False, started_at=0.0, ended_at=0.2, error="OSError: refused")
+
+    monkeypatch.setattr("scatter.ssh.run_on_host", fake)
+
+    db = tmp_path / "state" / "history.db"
+    res = runner.invoke(app, ["run", "--inventory", str(inv), "--no-progress", "--history-db", str(db)])
+    assert res.exit_code == 1
+
+    res = runner.invoke(app, ["history", "--db", str(db), "--failed"])
+    assert res.exit_code == 0
+    assert "bad" in res.stdout and "refused" in res.stdout
+    assert "good" not in res.stdout
+    assert "Rows: 1" in res.stdout
+
+
+def test_failed_history_write_does_not_abort_the_run(runner: CliRunner, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    inv = tmp_path / "inv.yaml"
+    inv.write_text(
+        "defaults:\n  known_hosts: off\nhosts:\n" + "".join(f"  - host: h{i}\n" for i in range(5)),
+        encoding="utf-8",
+    )
+
+    async def fake(host: str, cmd: str, options, semaphore) -> ExecResult:  # type: ignore[override]
+        return ExecResult(host=host, exit_status=0, stdout="ok\n", stderr="", ok=True, started_at=0.0, ended_at=0.1)
+
+    monkeypatch.setattr("scatter.ssh.run_on_host", fake)
+    db = tmp_path / "history.db"
+    conn = connect(db)
+    conn.execute("CREATE TRIGGER no_results BEFORE INSERT ON results BEGIN SELECT RAISE(ABORT, 'results are read-only'); END")
+    conn.close()
+
+    log_file, textfile = tmp_path / "run.jsonl", tmp_path / "scatter.prom"
+    args = ["run", "true", "--inventory", str(inv), "--no-progress", "--history-db", str(db)]
+    res = runner.invoke(app, [*args, "--log-file", str(log_file), "--metrics-textfile", str(textfile)])
+    assert res.exit_code == 1
+    assert res.exception is None or isinstance(res.exception, SystemExit)
+    assert "SSH Results" in res.stdout and "Succeeded: 5" in res.stdout
+    assert "History not recorded: results are read-only" in res.stdout
+    assert len(log_file.read_text(encoding="utf-8").splitlines()) == 5
+    assert "scatter_hosts_succeeded_total 5" in textfile.read_text(encoding="utf-8")
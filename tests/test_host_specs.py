@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import dataclasses
+from pathlib import Path
+
+import pytest
+
+from scatter.cli import _HostSpecBuilder
+from scatter.config import HostEntry
+from scatter.ssh import ExecOptions
+
+
+def base_options(**overrides) -> ExecOptions:
+    values = dict(
+        username="ubuntu",
+        port=22,
+        identity=None,
+        password=None,
+        known_hosts="off",
+        connect_timeout=5.0,
+        pty=False,
+        limit=10,
+        password_candidates=["a", "b"],
+    )
+    values.update(overrides)
+    return ExecOptions(**values)
+
+
+def test_exec_options_are_frozen_and_hashable() -> None:
+    opts = base_options()
+    assert opts.password_candidates == ("a", "b")
+    assert hash(opts) == hash(base_options())
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        opts.port = 2222  # type: ignore[misc]
+    assert not hasattr(opts, "__dict__")
+
+
+def test_identical_hosts_share_one_options_object(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("KEYS", "/keys")
+    builder = _HostSpecBuilder(base_options(identity=Path("/default/key")))
+    a = builder.options(HostEntry(host="a"))
+    b = builder.options(HostEntry(host="b"))
+    assert a is b and a.identity == Path("/default/key")
+
+    c = builder.options(HostEntry(host="c", identity="$KEYS/c", port=2200))
+    d = builder.options(HostEntry(host="d", identity="$KEYS/c", port=2200))
+    e = builder.options(HostEntry(host="e", identity="$KEYS/c", username="root"))
+    assert c is d and c is not e
+    assert (c.identity, c.port, c.username) == (Path("/keys/c"), 2200, "ubuntu")
+    assert e.username == "root" and e.identity is c.identity
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import itertools
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from scatter.cli import app
+from scatter.config import iter_hosts, load_inventory
+from scatter.hostrange import compact, expand, expand_list
+from scatter.ssh import ExecResult
+
+
+def test_expand_ranges_and_braces() -> None:
+    assert list(expand("web[001-003].dc1")) == ["web001.dc1", "web002.dc1", "web003.dc1"]
+    assert list(expand("db{a,b}[1-2]")) == ["dba1", "dba2", "dbb1", "dbb2"]
+    assert list(expand("n[1,3,8-10]")) == ["n1", "n3", "n8", "n9", "n10"]
+    assert list(expand("r[a-c]")) == ["ra", "rb", "rc"]
+    assert list(expand("{web[1-2],db}.lan")) == ["web1.lan", "web2.lan", "db.lan"]
+    # Non-range brackets and single-item braces stay literal
+    assert list(expand("[::1]")) == ["[::1]"]
+    assert list(expand("host{x}")) == ["host{x}"]
+    assert list(expand_list("a[1-2], b{x,y} c")) == ["a1", "a2", "bx", "by", "c"]
+
+
+def test_expand_is_lazy() -> None:
+    first = list(itertools.islice(expand("huge[0000000-9999999]"), 2))
+    assert first == ["huge0000000", "huge0000001"]
+
+
+def test_compact() -> None:
+    assert compact(["web003.dc1", "web017.dc1", "web018.dc1", "web019.dc1"]) == ["web[003,017-019].dc1"]
+    assert compact(["rack1-node1", "rack2-node1", "other"]) == ["rack[1-2]-node1", "other"]
+    assert compact(["a1", "b2"]) == ["a1", "b2"]
+    assert compact(list(expand("db{a,b}[1-8]"))) == ["dba[1-8]", "dbb[1-8]"]
+    assert compact([]) == []
+
+
+def test_inventory_range_entries(tmp_path: Path) -> None:
+    inv = tmp_path / "inv.yaml"
+    inv.write_text(
+        """
+        hosts:
+          - host: web[01-03].dc1
+            tags: [web]
+            command: uptime
+          - host: "{db,cache}1"
+        """,
+        encoding="utf-8",
+    )
+    loaded = load_inventory(inv)
+    assert [h.host for h in loaded.hosts] == ["web01.dc1", "web02.dc1", "web03.dc1", "db1", "cache1"]
+    assert all(h.tags == ["web"] and h.command == "uptime" for h in loaded.hosts[:3])
+    assert [h.host for h in iter_hosts(inv)] == [h.host for h in loaded.hosts]
+
+
+def test_cli_hosts_option_and_compact_failures(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    async def fake(host: str, cmd: str, options, semaphore) -> ExecResult:  # type: ignore[override]
+        ok = host not in ("web03", "web04", "web07")
+        return ExecResult(
+            host=host, exit_status=0 if ok else 1, stdout="", stderr="" if ok else "boom", ok=ok, started_at=0.0, ended_at=0.1
+        )
+
+    monkeypatch.setattr("scatter.ssh.run_on_host", fake)
+    res = CliRunner().invoke(
+        app, ["run", "true", "--inventory", str(tmp_path / "missing.yaml"), "--hosts", "web[01-08]", "--no-progress"]
+    )
+    assert res.exit_code != 0
+    assert "Failed: 3" in res.stdout
+    assert "- web[03-04,07]: boom" in res.stdout
+
+
+def test_cli_hosts_option_with_defaults_only_inventory(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    seen = {}
+
+    async def fake(host: str, cmd: str, options, semaphore) -> ExecResult:  # type: ignore[override]
+        seen[host] = options.username
+        return ExecResult(host=host, exit_status=0, stdout="", stderr="", ok=True, started_at=0.0, ended_at=0.1)
+
+    monkeypatch.setattr("scatter.ssh.run_on_host", fake)
+    inv = tmp_path / "inv.yaml"
+    inv.write_text("defaults:\n  username: deploy\n  known_hosts: off\n", encoding="utf-8")
+    res = CliRunner().invoke(app, ["run", "true", "--inventory", str(inv), "--hosts", "web[1-2]", "--no-progress"])
+    assert res.exit_code == 0, res.stdout
+    assert seen == {"web1": "deploy", "web2": "deploy"}
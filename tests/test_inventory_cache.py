@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import pytest
+
+from scatter import config
+from scatter.config import load_inventory
+
+
+def write_inv(path: Path, command: str = "uptime") -> None:
+    path.write_text(
+        f"""
+        defaults:
+          username: ubuntu
+          password: env:GLOBAL_PW
+        hosts:
+          - host: a
+            password: env:A_PW
+            command: {command}
+          - host: b
+            tags: [web]
+        """,
+        encoding="utf-8",
+    )
+
+
+def _forbid_parse(monkeypatch: pytest.MonkeyPatch) -> None:
+    def boom(path: Path, fmt=None):
+        raise AssertionError("inventory was reparsed")
+
+    monkeypatch.setattr(config, "_parse_raw", boom)
+
+
+def test_cache_hit_skips_parsing_and_resolves_env(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    inv_path = tmp_path / "inv.yaml"
+    cache = tmp_path / "cache"
+    write_inv(inv_path)
+    monkeypatch.setenv("GLOBAL_PW", "g1")
+    monkeypatch.setenv("A_PW", "a1")
+
+    first = load_inventory(inv_path, use_cache=True, cache_dir=cache)
+    assert first.hosts[0].password == "a1"
+    assert list(cache.iterdir())
+    assert cache.stat().st_mode & 0o777 == 0o700
+    assert all(e.stat().st_mode & 0o777 == 0o600 for e in cache.iterdir())
+
+    _forbid_parse(monkeypatch)
+    # env: values are resolved at load time, never taken from the cache
+    monkeypatch.setenv("GLOBAL_PW", "g2")
+    monkeypatch.setenv("A_PW", "a2")
+    second = load_inventory(inv_path, use_cache=True, cache_dir=cache)
+    assert second.defaults.password == "g2"
+    assert second.hosts[0].password == "a2"
+    assert [h.host for h in second.hosts] == ["a", "b"]
+    assert second.hosts[1].tags == ["web"]
+
+
+def test_touch_keeps_entry_and_edit_invalidates(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    inv_path = tmp_path / "inv.yaml"
+    cache = tmp_path / "cache"
+    write_inv(inv_path)
+    load_inventory(inv_path, use_cache=True, cache_dir=cache)
+
+    # Same content, new mtime: still served from cache via the content hash
+    st = inv_path.stat()
+    os.utime(inv_path, ns=(st.st_atime_ns, st.st_mtime_ns + 5_000_000_000))
+    with monkeypatch.context() as m:
+        _forbid_parse(m)
+        load_inventory(inv_path, use_cache=True, cache_dir=cache)
+
+    write_inv(inv_path, command="hostname")
+    assert load_inventory(inv_path, use_cache=True, cache_dir=cache).hosts[0].command == "hostname"
+
+
+def test_corrupt_cache_entry_is_a_miss(tmp_path: Path) -> None:
+    inv_path = tmp_path / "inv.yaml"
+    cache = tmp_path / "cache"
+    write_inv(inv_path)
+    load_inventory(inv_path, use_cache=True, cache_dir=cache)
+    for entry in cache.iterdir():
+        entry.write_bytes(b"garbage")
+    assert len(load_inventory(inv_path, use_cache=True, cache_dir=cache).hosts) == 2
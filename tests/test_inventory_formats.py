@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from scatter.cli import app
+from scatter.config import detect_format, iter_hosts, load_inventory
+from scatter.ssh import ExecResult
+
+
+def test_detect_format_by_extension() -> None:
+    assert detect_format(Path("inv.yml")) == "yaml"
+    assert detect_format(Path("inv.JSON")) == "json"
+    assert detect_format(Path("inv.jsonl")) == "ndjson"
+    assert detect_format(Path("inv.tsv")) == "tsv"
+    assert detect_format(Path("fleet.hosts")) == "lines"
+    assert detect_format(Path("inventory")) == "yaml"
+
+
+def test_json_inventory(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("PW", "secret")
+    p = tmp_path / "inv.json"
+    p.write_text(
+        json.dumps(
+            {
+                "defaults": {"username": "ubuntu", "known_hosts": "off"},
+                "hosts": [{"host": "a", "tags": ["web"], "password": "env:PW"}, {"host": "b", "port": 2222}],
+            }
+        ),
+        encoding="utf-8",
+    )
+    inv = load_inventory(p)
+    assert inv.defaults.username == "ubuntu" and inv.defaults.known_hosts == "off"
+    assert [(h.host, h.port, h.tags) for h in inv.hosts] == [("a", None, ["web"]), ("b", 2222, [])]
+    assert inv.hosts[0].password == "secret"
+
+
+def test_ndjson_inventory_streams(tmp_path: Path) -> None:
+    p = tmp_path / "inv.ndjson"
+    p.write_text(
+        '{"defaults": {"username": "deploy"}}\n'
+        '{"host": "a", "command": "uptime"}\n'
+        "\n"
+        '{"host": "b", "tags": ["db"]}\n',
+        encoding="utf-8",
+    )
+    assert [h.host for h in iter_hosts(p)] == ["a", "b"]
+    inv = load_inventory(p)
+    assert inv.defaults.username == "deploy"
+    assert inv.hosts[0].command == "uptime" and inv.hosts[1].tags == ["db"]
+
+
+def test_csv_and_tsv_inventory(tmp_path: Path) -> None:
+    csv_path = tmp_path / "inv.csv"
+    csv_path.write_text(
+        "# defaults: username=ubuntu port=2200 known_hosts=off\n"
+        "host,port,tags,command\n"
+        "web1,,web;dc1,uptime\n"
+        "db1,2201,db,\n",
+        encoding="utf-8",
+    )
+    inv = load_inventory(csv_path)
+    assert (inv.defaults.username, inv.defaults.port, inv.defaults.known_hosts) == ("ubuntu", 2200, "off")
+    web, db = inv.hosts
+    assert (web.port, web.tags, web.command) == (None, ["web", "dc1"], "uptime")
+    assert (db.port, db.tags, db.command) == (2201, ["db"], None)
+
+    tsv_path = tmp_path / "inv.tsv"
+    tsv_path.write_text("host\tusername\nh1\troot\n", encoding="utf-8")
+    assert load_inventory(tsv_path).hosts[0].username == "root"
+
+    no_host = tmp_path / "bad.csv"
+    no_host.write_text("name,port\nh1,22\n", encoding="utf-8")
+    with pytest.raises(ValueError):
+        load_inventory(no_host)
+
+
+def test_line_inventory(tmp_path: Path) -> None:
+    p = tmp_path / "fleet.txt"
+    p.write_text(
+        "# defaults: username=ops\n"
+        "# plain comment\n"
+        "web1\n"
+        "admin@web2:2222  # trailing comment\n"
+        "10.0.0.3:22\n"
+        "fe80::1\n",
+        encoding="utf-8",
+    )
+    inv = load_inventory(p)
+    assert inv.defaults.username == "ops"
+    assert [(h.host, h.username, h.port) for h in inv.hosts] == [
+        ("web1", None, None),
+        ("web2", "admin", 2222),
+        ("10.0.0.3", None, 22),
+        ("fe80::1", None, None),
+    ]
+
+
+def test_explicit_format_and_cache_variant(tmp_path: Path) -> None:
+    p = tmp_path / "inventory"
+    p.write_text("h1\nh2\n", encoding="utf-8")
+    cache = tmp_path / "cache"
+    inv = load_inventory(p, use_cache=True, cache_dir=cache, fmt="lines")
+    assert [h.host for h in inv.hosts] == ["h1", "h2"]
+    assert [h.host for h in load_inventory(p, use_cache=True, cache_dir=cache, fmt="lines").hosts] == ["h1", "h2"]
+    with pytest.raises(ValueError):
+        load_inventory(p, fmt="xml")
+
+
+def test_cli_inventory_format_option(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    p = tmp_path / "hosts"
+    p.write_text("# defaults: known_hosts=off\nalpha\nbeta\n", encoding="utf-8")
+
+    async def fake(host: str, cmd: str, options, semaphore) -> ExecResult:  # type: ignore[override]
+        return ExecResult(host=host, exit_status=0, stdout=f"{host} ok\n", stderr="", ok=True, started_at=0.0, ended_at=0.1)
+
+    monkeypatch.setattr("scatter.ssh.run_on_host", fake)
+    res = CliRunner().invoke(
+        app, ["run", "true", "--inventory", str(p), "--inventory-format", "lines", "--no-progress", "--no-inventory-cache"]
+    )
+    assert res.exit_code == 0, res.stdout
+    assert "alpha ok" in res.stdout and "beta ok" in res.stdout
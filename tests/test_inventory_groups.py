@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from scatter import config
+from scatter.config import iter_hosts, load_inventory
+
+
+def write(path: Path, text: str) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+def test_group_defaults_resolve_through_parents(tmp_path: Path) -> None:
+    inv = write(
+        tmp_path / "inv.yaml",
+        """
+        defaults:
+          username: root
+        hosts:
+          - host: standalone
+          - host: web-extra
+            group: web
+            port: 2200
+        groups:
+          prod:
+            defaults:
+              username: deploy
+              command: uptime
+          web:
+            parent: prod
+            defaults:
+              port: 2222
+              tags: [nginx]
+            hosts:
+              - host: web[1-2]
+              - host: web-admin
+                username: admin
+        """,
+    )
+    loaded = load_inventory(inv)
+    assert loaded.defaults.username == "root"
+    by_name = {h.host: h for h in loaded.hosts}
+    assert [h.host for h in loaded.hosts] == ["standalone", "web-extra", "web1", "web2", "web-admin"]
+    assert (by_name["standalone"].username, by_name["standalone"].tags) == (None, [])
+    assert (by_name["web1"].username, by_name["web1"].port, by_name["web1"].command) == ("deploy", 2222, "uptime")
+    assert by_name["web1"].tags == ["prod", "web", "nginx"]
+    assert (by_name["web-extra"].port, by_name["web-admin"].username) == (2200, "admin")
+    assert [h.host for h in iter_hosts(inv)] == [h.host for h in loaded.hosts]
+
+
+def test_group_errors(tmp_path: Path) -> None:
+    unknown = write(tmp_path / "unknown.yaml", "hosts:\n  - host: a\n    group: nope\n")
+    with pytest.raises(ValueError, match="Unknown inventory group"):
+        load_inventory(unknown)
+    cycle = write(tmp_path / "cycle.yaml", "groups:\n  a: {parent: b, hosts: [{host: x}]}\n  b: {parent: a}\n")
+    with pytest.raises(ValueError, match="cycle"):
+        load_inventory(cycle)
+
+
+def test_includes_merge_hosts_defaults_and_groups(tmp_path: Path) -> None:
+    root = write(
+        tmp_path / "inventory.yaml",
+        """
+        include:
+          - inventory.d/*.yaml
+          - extra.csv
+        defaults:
+          port: 2022
+        groups:
+          db:
+            defaults: {username: postgres}
+        hosts:
+          - host: bastion
+        """,
+    )
+    write(
+        tmp_path / "inventory.d" / "10-web.yaml",
+        "defaults: {username: web, port: 22}\nhosts:\n  - host: web1\n",
+    )
+    write(
+        tmp_path / "inventory.d" / "20-db.yaml",
+        "include: 10-web.yaml\nhosts:\n  - host: db1\n    group: db\n",
+    )
+    write(tmp_path / "extra.csv", "host,group\ndb2,db\n")
+
+    loaded = load_inventory(root)
+    assert [h.host for h in loaded.hosts] == ["bastion", "web1", "db1", "db2"]
+    # The top-level file's defaults override those of included files
+    assert (loaded.defaults.username, loaded.defaults.port) == ("web", 2022)
+    assert {h.host: h.username for h in loaded.hosts}["db2"] == "postgres"
+
+    with pytest.raises(FileNotFoundError):
+        load_inventory(write(tmp_path / "bad.yaml", "include: missing.yaml\nhosts: [{host: a}]\n"))
+
+    dup = write(tmp_path / "dup.yaml", "include: dup2.yaml\ngroups: {g: {}}\nhosts: [{host: a}]\n")
+    write(tmp_path / "dup2.yaml", "groups: {g: {}}\n")
+    with pytest.raises(ValueError, match="defined in both"):
+        load_inventory(dup)
+
+
+def test_included_files_are_cached_and_parsed_together(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    root = write(tmp_path / "inv.yaml", "include: parts/*.yaml\n")
+    for i in range(3):
+        write(tmp_path / "parts" / f"p{i}.yaml", f"hosts:\n  - host: h{i}\n")
+    cache = tmp_path / "cache"
+
+    batches = []
+    real = config._parse_files
+
+    def spy(files):
+        batches.append(sorted(p.name for p, _ in files))
+        return real(files)
+
+    monkeypatch.setattr(config, "_parse_files", spy)
+    assert [h.host for h in load_inventory(root, use_cache=True, cache_dir=cache).hosts] == ["h0", "h1", "h2"]
+    assert batches == [["inv.yaml"], ["p0.yaml", "p1.yaml", "p2.yaml"]]
+
+    batches.clear()
+    write(tmp_path / "parts" / "p1.yaml", "hosts:\n  - host: changed\n")
+    assert [h.host for h in load_inventory(root, use_cache=True, cache_dir=cache).hosts] == ["h0", "changed", "h2"]
+    assert batches == [[], ["p1.yaml"]]
+
+
+def test_parallel_parse_matches_inline(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    files = []
+    for i in range(2):
+        p = write(tmp_path / f"p{i}.yaml", "hosts:\n" + "".join(f"  - host: p{i}-{j}\n" for j in range(50)))
+        files.append((p, "yaml"))
+    monkeypatch.setattr(config, "_PARALLEL_MIN_BYTES", 0)
+    parallel = config._parse_files(files)
+    assert parallel == [config._parse_raw(p, f) for p, f in files]
@@ -4,6 +4,7 @@ import pytest
 from typer.testing import CliRunner
 
 from scatter.cli import app
+from scatter.models import HostUsage
 from scatter.ssh import ExecResult
 
 
@@ -46,3 +47,25 @@ def test_jsonl_log_contents_with_stubbed_results(runner: CliRunner, tmp_path: Pa
         assert rec["ok"] is True
         assert rec["exit_status"] == 0
         assert rec["command"] in ("echo a", "echo b")
+
+
+def test_usage_in_log_and_run_totals(runner: CliRunner, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    inv = tmp_path / "inv.yaml"
+    inv.write_text("defaults:\n  known_hosts: off\nhosts:\n  - host: a\n  - host: b\n", encoding="utf-8")
+
+    async def fake_run_on_host(host: str, cmd: str, options, semaphore) -> ExecResult:  # type: ignore[override]
+        usage = HostUsage(bytes_sent=1024, bytes_received=3 * 1024 * 1024, stdout_bytes=2, attempts=2, cpu_time=0.25)
+        return ExecResult(host, 0, f"{host}\n", "", True, 0.0, 0.1, usage=usage)
+
+    monkeypatch.setattr("scatter.ssh.run_on_host", fake_run_on_host)
+
+    logfile = tmp_path / "out.jsonl"
+    result = runner.invoke(app, ["run", "true", "--inventory", str(inv), "--no-progress", "--log-file", str(logfile)])
+
+    assert result.exit_code == 0
+    assert "Traffic: 2.0 KiB out, 6.0 MiB in (4 B output), 4 connections, 0.50s CPU" in result.stdout
+    records = [json.loads(line) for line in logfile.read_text(encoding="utf-8").splitlines()]
+    assert records[0]["usage"] == {
+        "bytes_sent": 1024, "bytes_received": 3 * 1024 * 1024, "stdout_bytes": 2, "stderr_bytes": 0,
+        "attempts": 2, "cpu_sec": 0.25, "slot_sec": 0.0,
+    }
@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+from benchmarks.memory_bench import DEFAULT_BUDGETS, check_budgets, measure_hosts
+
+
+def test_memory_per_host_within_budget() -> None:
+    stages = measure_hosts(1000, output_bytes=256)
+    assert stages["run"]["rendered"]
+    assert stages["results"]["per_output_byte"] >= 1.0
+    assert check_budgets({1000: stages}, DEFAULT_BUDGETS) == []
+
+
+def test_check_budgets_reports_overruns() -> None:
+    report = {10: {"inventory": {"per_host": 5000.0}, "run": {"per_host": 10.0}}}
+    assert check_budgets(report, {"inventory": 600, "run": 12000}) == [
+        "10 hosts: inventory uses 5000 B/host (budget 600)"
+    ]
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import asyncio
+import socket
+import threading
+import urllib.request
+from pathlib import Path
+from typing import List
+
+import pytest
+from typer.testing import CliRunner
+
+from benchmarks.simfleet import FleetConfig, start_fleet
+from scatter.cli import app
+from scatter.metrics import Histogram, RunMetrics, parse_listen
+from scatter.ssh import ExecOptions, ExecResult, execute_on_hosts, phase_observer
+
+
+def test_histogram_is_cumulative_and_fixed_size() -> None:
+    hist = Histogram((0.125, 1.0))
+    for value in (0.0625, 0.125, 0.5, 3.0) * 1000:
+        hist.observe(value)
+    assert len(hist.counts) == 3
+    assert hist.lines("h") == [
+        'h_bucket{le="0.125"} 2000',
+        'h_bucket{le="1"} 3000',
+        'h_bucket{le="+Inf"} 4000',
+        "h_sum 3687.5",
+        "h_count 4000",
+    ]
+
+
+def test_render_while_label_sets_grow() -> None:
+    metrics = RunMetrics()
+    stop = threading.Event()
+    errors: List[BaseException] = []
+
+    def scrape() -> None:
+        while not stop.is_set():
+            try:
+                metrics.render()
+            except BaseException as exc:  # noqa: BLE001
+                errors.append(exc)
+                return
+
+    scraper = threading.Thread(target=scrape)
+    scraper.start()
+    try:
+        for i in range(2000):
+            metrics.observe_phase("h", f"phase{i}", 0.0, 0.1)
+            metrics.observe_result(ExecResult("h", None, "", "", False, 0.0, 0.1, error=f"Error{i}: x"))
+    finally:
+        stop.set()
+        scraper.join()
+    assert not errors
+    assert 'scatter_hosts_failed_total{error_class="Error1999"} 1' in metrics.render()
+
+
+def test_parse_listen() -> None:
+    assert parse_listen("9464") == ("127.0.0.1", 9464)
+    assert parse_listen("0.0.0.0:9100") == ("0.0.0.0", 9100)
+    assert parse_listen("[::1]:9100") == ("::1", 9100)
+    with pytest.raises(ValueError):
+        parse_listen("host:http")
+
+
+def test_retries_and_phases_from_simulated_fleet() -> None:
+    metrics = RunMetrics()
+
+    async def scenario():
+        fleet = await start_fleet(FleetConfig(hosts=2, output_bytes=10, faults={"reset": 0.5}, fault_attempts=1))
+        options = ExecOptions(
+            username="bench",
+            port=fleet.targets[0][1],
+            identity=None,
+            password="bench",
+            known_hosts="off",
+            connect_timeout=5.0,
+            pty=False,
+            limit=2,
+            retry_attempts=2,
+        )
+        token = phase_observer.set(metrics.observe_phase)
+        try:
+            results = await execute_on_hosts([host for host, _ in fleet.targets], "true", options)
+        finally:
+            phase_observer.reset(token)
+            await fleet.wait_closed()
+        for r in results:
+            metrics.observe_result(r)
+
+    asyncio.run(scenario())
+    text = metrics.render()
+    assert "scatter_hosts_started_total 2" in text
+    assert "scatter_hosts_succeeded_total 2" in text
+    assert "scatter_retries_total 1" in text
+    assert "scatter_inflight_sessions 0" in text
+    assert 'scatter_output_bytes_total{stream="stdout"} 20' in text
+    # One host needed two connections
+    assert "scatter_connection_attempts_total 3" in text
+    assert 'scatter_transport_bytes_total{direction="received"} 0' not in text
+    for phase in ("queue", "connect", "auth", "exec"):
+        assert f'scatter_phase_duration_seconds_count{{phase="{phase}"}}' in text
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def test_cli_serves_and_writes_metrics(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    inv = tmp_path / "inventory.yaml"
+    inv.write_text("defaults:\n  known_hosts: off\nhosts:\n  - host: a\n  - host: b\n", encoding="utf-8")
+    port = _free_port()
+    scraped = []
+
+    async def fake(host: str, cmd: str, options, semaphore) -> ExecResult:  # type: ignore[override]
+        async with semaphore:
+            if host == "b":
+                url = f"http://127.0.0.1:{port}/metrics"
+                scraped.append(await asyncio.to_thread(lambda: urllib.request.urlopen(url).read().decode()))
+                return ExecResult(host, None, "", "", False, 0.0, 0.2, error="TimeoutError: ")
+            return ExecResult(host, 0, "hello\n", "", True, 0.0, 0.1)
+
+    monkeypatch.setattr("scatter.ssh.run_on_host", fake)
+    textfile = tmp_path / "metrics" / "scatter.prom"
+    res = CliRunner().invoke(
+        app,
+        [
+            "run", "true", "--inventory", str(inv), "--no-progress", "--no-inventory-cache", "--limit", "1",
+            "--metrics-listen", str(port), "--metrics-textfile", str(textfile),
+        ],
+    )
+    assert res.exit_code == 1, res.stdout
+    assert scraped and "scatter_hosts_succeeded_total 1" in scraped[0]
+    text = textfile.read_text(encoding="utf-8")
+    assert 'scatter_hosts_failed_total{error_class="TimeoutError"} 1' in text
+    assert "scatter_host_duration_seconds_count 2" in text
+    assert "scatter_run_last_completion_timestamp_seconds" in text
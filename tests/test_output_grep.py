@@ -0,0 +1,119 @@
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from scatter.cli import app
+from scatter.ssh import ExecResult
+from scatter.textindex import IndexReader, IndexWriter, required_literals, search
+
+
+@pytest.fixture()
+def runner() -> CliRunner:
+    return CliRunner()
+
+
+def test_required_literals() -> None:
+    assert required_literals("kernel: panic") == ["kernel: panic"]
+    assert required_literals("error.*disk") == ["error", "disk"]
+    assert required_literals("colou?r") == ["colo", "r"]
+    assert required_literals("foo|bar") == []
+    assert required_literals("a.b", fixed=True) == ["a.b"]
+
+
+def test_index_limits_documents_read(tmp_path: Path) -> None:
+    docs = {
+        ("h1", "stdout"): "all good\nnothing here\n",
+        ("h2", "stdout"): "disk error on sda\nretrying\n",
+        ("h2", "stderr"): "Disk Error: fatal\n",
+        ("h3", "stdout"): "error: none\n",
+    }
+    writer = IndexWriter([tmp_path / "a.idx"])
+    writer.add("h1", docs[("h1", "stdout")], "")
+    writer.add("h2", docs[("h2", "stdout")], docs[("h2", "stderr")])
+    writer.add("h3", docs[("h3", "stdout")], "")
+    writer.close()
+
+    read = []
+
+    def read_doc(host: str, stream: str) -> str:
+        read.append((host, stream))
+        return docs[(host, stream)]
+
+    with IndexReader(tmp_path / "a.idx") as idx:
+        assert idx.doc_count == 4
+        hits = list(search(idx, "disk error", read_doc))
+        assert hits == [("h2", "stdout", "disk error on sda")]
+        # Only the documents containing every trigram are read; case variants are candidates too
+        assert set(read) == {("h2", "stdout"), ("h2", "stderr")}
+
+        read.clear()
+        hits = list(search(idx, "disk error", read_doc, ignore_case=True))
+        assert [h[:2] for h in hits] == [("h2", "stdout"), ("h2", "stderr")]
+
+        assert list(search(idx, "no such text", read_doc)) == []
+
+
+def test_run_index_and_grep_command(runner: CliRunner, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    inv = tmp_path / "inv.yaml"
+    inv.write_text(
+        """
+        defaults:
+          username: u
+          known_hosts: off
+        hosts:
+          - host: web/1
+            command: dmesg
+          - host: web-2
+            command: dmesg
+        """,
+        encoding="utf-8",
+    )
+
+    async def fake(host: str, cmd: str, options, semaphore) -> ExecResult:  # type: ignore[override]
+        out = "EXT4-fs error (device sda1)\n" if host == "web/1" else "all quiet\n"
+        return ExecResult(host=host, exit_status=0, stdout=out, stderr="", ok=True, started_at=0.0, ended_at=0.1)
+
+    monkeypatch.setattr("scatter.ssh.run_on_host", fake)
+
+    outdir = tmp_path / "out"
+    arc = tmp_path / "run.scat"
+    res = runner.invoke(
+        app,
+        ["run", "--inventory", str(inv), "--no-progress", "--index", "--save-dir", str(outdir), "--archive", str(arc)],
+    )
+    assert res.exit_code == 0
+
+    for run_path in (outdir, arc):
+        res = runner.invoke(app, ["grep", str(run_path), r"fs error \(device"])
+        assert res.exit_code == 0
+        assert "web/1: EXT4-fs error (device sda1)" in res.stdout
+        assert "web-2" not in res.stdout
+
+    res = runner.invoke(app, ["grep", str(outdir), "-F", "-l", "quiet"])
+    assert res.exit_code == 0 and res.stdout.strip() == "web-2"
+
+    res = runner.invoke(app, ["grep", str(outdir), "nomatch"])
+    assert res.exit_code == 1
+
+
+def test_index_requires_an_output_location(runner: CliRunner, tmp_path: Path) -> None:
+    inv = tmp_path / "inv.yaml"
+    inv.write_text("hosts:\n  - host: h\n    command: echo\n", encoding="utf-8")
+    res = runner.invoke(app, ["run", "--inventory", str(inv), "--no-progress", "--index", "--store", str(tmp_path / "store")])
+    assert res.exit_code != 0
+    assert not (tmp_path / "store").exists()  # rejected before any sink was created
+
+
+def test_grep_closes_archive_without_index(runner: CliRunner, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    from scatter.archive import ArchiveReader, ArchiveWriter
+
+    arc = tmp_path / "run.scat"
+    with ArchiveWriter(arc) as writer:
+        writer.add("h", "out\n", "", {"ok": True})
+    closed = []
+    close = ArchiveReader.close
+    monkeypatch.setattr(ArchiveReader, "close", lambda self: (closed.append(True), close(self)))
+    res = runner.invoke(app, ["grep", str(arc), "out"])
+    assert res.exit_code != 0
+    assert closed
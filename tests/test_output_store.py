@@ -0,0 +1,74 @@
+from pathlib import Path
+from typing import Dict
+
+import pytest
+from typer.testing import CliRunner
+
+from scatter.cli import app
+from scatter.ssh import ExecResult
+from scatter.store import OutputStore
+
+
+@pytest.fixture()
+def runner() -> CliRunner:
+    return CliRunner()
+
+
+def test_store_deduplicates_blobs_across_runs(tmp_path: Path) -> None:
+    store = OutputStore(tmp_path / "store")
+
+    first = store.start_run("r1")
+    first.add("a", "same\n", "", {"exit_status": 0})
+    first.add("b", "same\n", "", {"exit_status": 0})
+    first.close()
+
+    second = store.start_run("r2")
+    second.add("a", "same\n", "", {"exit_status": 0})
+    second.add("b", "different\n", "", {"exit_status": 0})
+    second.add("c", "new\n", "", {"exit_status": 0})
+    second.close()
+
+    objects = [p for p in (tmp_path / "store" / "objects").rglob("*") if p.is_file()]
+    # "same", "", "different", "new"
+    assert len(objects) == 4
+    assert store.runs() == ["r1", "r2"]
+    assert store.get(store.manifest("r2")["hosts"]["b"]["stdout"]) == "different\n"
+    assert store.diff("r1", "r2") == {"b": "changed", "c": "added"}
+    assert store.diff("r2", "r1") == {"b": "changed", "c": "removed"}
+
+
+def test_run_store_and_diff_command(runner: CliRunner, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    inv = tmp_path / "inv.yaml"
+    inv.write_text(
+        """
+        defaults:
+          username: u
+          known_hosts: off
+        hosts:
+          - host: a
+            command: cat /etc/motd
+          - host: b
+            command: cat /etc/motd
+        """,
+        encoding="utf-8",
+    )
+    outputs: Dict[str, str] = {"a": "v1\n", "b": "v1\n"}
+
+    async def fake(host: str, cmd: str, options, semaphore) -> ExecResult:  # type: ignore[override]
+        return ExecResult(host=host, exit_status=0, stdout=outputs[host], stderr="", ok=True, started_at=0.0, ended_at=0.1)
+
+    monkeypatch.setattr("scatter.ssh.run_on_host", fake)
+
+    store_dir = tmp_path / "store"
+    args = ["run", "--inventory", str(inv), "--no-progress", "--store", str(store_dir)]
+    assert runner.invoke(app, args).exit_code == 0
+    outputs["b"] = "v2\n"
+    res = runner.invoke(app, args)
+    assert res.exit_code == 0
+    assert "Stored run:" in res.stdout
+
+    res = runner.invoke(app, ["diff", "--store", str(store_dir)])
+    assert res.exit_code == 0
+    assert "changed: b" in res.stdout
+    assert "changed: a" not in res.stdout
+    assert "Changed hosts: 1" in res.stdout
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import asyncio
+import pstats
+import time
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from scatter.cli import app
+from scatter.profiling import LoopLagMonitor, category
+from scatter.ssh import ExecResult
+
+
+def test_profile_writes_pstats_and_collapsed_stacks(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    inv = tmp_path / "inventory.yaml"
+    inv.write_text("defaults:\n  known_hosts: off\nhosts:\n  - host: a\n  - host: b\n", encoding="utf-8")
+
+    async def fake(host: str, cmd: str, options, semaphore) -> ExecResult:  # type: ignore[override]
+        async with semaphore:
+            await asyncio.sleep(0.06)
+            return ExecResult(host=host, exit_status=0, stdout="ok\n", stderr="", ok=True, started_at=0.0, ended_at=0.1)
+
+    monkeypatch.setattr("scatter.ssh.run_on_host", fake)
+    out = tmp_path / "prof" / "run.prof"
+    res = CliRunner().invoke(
+        app,
+        ["run", "true", "--inventory", str(inv), "--no-progress", "--no-inventory-cache", "--limit", "1", "--profile", str(out)],
+    )
+    assert res.exit_code == 0, res.stdout
+    assert "event loop lag:" in res.stdout and "time by package:" in res.stdout
+    stats = pstats.Stats(str(out))
+    assert any(funcname == "_run_one" for _, _, funcname in stats.stats)  # type: ignore[attr-defined]
+    collapsed = (tmp_path / "prof" / "run.collapsed").read_text(encoding="utf-8").splitlines()
+    assert collapsed and all(line.rsplit(" ", 1)[1].isdigit() for line in collapsed)
+
+
+def test_category_buckets() -> None:
+    assert category("/venv/lib/python3.11/site-packages/asyncssh/connection.py", "run") == "asyncssh"
+    assert category("/home/me/scatter/.venv/lib/site-packages/rich/table.py", "_render") == "rich"
+    assert category("/src/scatter/scatter/cli.py", "run") == "scatter"
+    assert category("~", "<method 'poll' of 'select.epoll' objects>") == "waiting"
+    assert category("~", "<built-in method builtins.len>") == "builtins"
+
+
+def test_loop_lag_monitor_sees_blocking_work() -> None:
+    monitor = LoopLagMonitor(interval=0.01)
+
+    async def scenario() -> None:
+        monitor.start()
+        await asyncio.sleep(0.03)
+        time.sleep(0.15)  # blocks the loop
+        await asyncio.sleep(0.03)
+        monitor.stop()
+
+    asyncio.run(scenario())
+    assert monitor.max >= 0.1
+    assert "max" in monitor.summary()
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+from typing import List
+
+import pytest
+from typer.testing import CliRunner
+
+from scatter.cli import app
+from scatter.history import DURATION_WEIGHT, HistoryRecorder
+from scatter.models import HostUsage
+from scatter.scheduling import load_estimates, lpt_order
+from scatter.ssh import ExecResult
+
+
+def record(db: Path, durations: dict, command: str = "audit", exit_status=0) -> None:
+    rec = HistoryRecorder(db)
+    for host, seconds in durations.items():
+        rec.add(host, "", "", {"ok": exit_status == 0, "exit_status": exit_status, "duration_sec": 99.0,
+                               "slot_sec": seconds, "command": command})
+    rec.close()
+
+
+def test_estimates_are_moving_averages_of_slot_time(tmp_path: Path) -> None:
+    db = tmp_path / "h.db"
+    record(db, {"a": 10.0, "b": 2.0})
+    record(db, {"a": 20.0})
+    record(db, {"b": 50.0}, exit_status=None)  # never ran: not a duration sample
+    record(db, {"a": 1.0}, command="uptime")
+
+    estimates = load_estimates(db, ["audit", "audit"])
+    assert estimates == {("a", "audit"): pytest.approx(10.0 + DURATION_WEIGHT * 10.0), ("b", "audit"): 2.0}
+
+
+def test_lpt_order_places_unknown_hosts_at_median() -> None:
+    specs = [(h, "cmd", None) for h in ("new1", "slow", "fast", "mid", "new2", "mid2")]
+    estimates = {("slow", "cmd"): 30.0, ("fast", "cmd"): 1.0, ("mid", "cmd"): 5.0, ("mid2", "cmd"): 5.0}
+    order, fill = lpt_order(specs, estimates)
+    assert fill == 5.0
+    # Ties (median-filled and equal estimates) keep inventory order
+    assert [specs[i][0] for i in order] == ["slow", "new1", "mid", "new2", "mid2", "fast"]
+    assert lpt_order(specs, {}) == ([0, 1, 2, 3, 4, 5], None)
+
+
+def test_cli_starts_longest_expected_first(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    db = tmp_path / "h.db"
+    record(db, {"a": 1.0, "b": 5.0, "c": 3.0}, command="true")
+    inv = tmp_path / "inventory.yaml"
+    inv.write_text("defaults:\n  known_hosts: off\nhosts:\n  - host: a\n  - host: b\n  - host: c\n  - host: d\n",
+                   encoding="utf-8")
+    started: List[str] = []
+
+    async def fake(host: str, cmd: str, options, semaphore) -> ExecResult:  # type: ignore[override]
+        async with semaphore:
+            started.append(host)
+            await asyncio.sleep(0)
+            return ExecResult(host, 0, f"{host}\n", "", True, 0.0, 0.1, usage=HostUsage(slot_time=7.0))
+
+    monkeypatch.setattr("scatter.ssh.run_on_host", fake)
+    res = CliRunner().invoke(
+        app,
+        ["run", "true", "--inventory", str(inv), "--no-progress", "--no-inventory-cache", "--limit", "1",
+         "--schedule", "lpt", "--history-db", str(db), "--show-output"],
+    )
+    assert res.exit_code == 0, res.stdout
+    assert "3/4 hosts have recorded durations" in res.stdout
+    assert started == ["b", "c", "d", "a"]
+    # Output stays in inventory order
+    assert [res.stdout.index(f"STDOUT - {h}") for h in "abcd"] == sorted(res.stdout.index(f"STDOUT - {h}") for h in "abcd")
+    assert load_estimates(db, ["true"])[("d", "true")] == 7.0
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import pytest
+
+from scatter.config import HostEntry
+from scatter.selection import HostIndex, iter_bits, to_mask
+
+
+def make_index() -> HostIndex:
+    hosts = [
+        HostEntry(host="web-1.dc1", tags=["web", "prod", "dc1"]),
+        HostEntry(host="web-2.dc2", tags=["web", "canary", "dc2"]),
+        HostEntry(host="db-1.dc1", tags=["db", "prod", "dc1"]),
+        HostEntry(host="cache-1.dc2", tags=["cache", "dc2"]),
+    ]
+    return HostIndex(hosts)
+
+
+def names(index: HostIndex, mask: int) -> list[str]:
+    return [index.hosts[p].host for p in iter_bits(mask)]
+
+
+def test_bitset_helpers() -> None:
+    assert list(iter_bits(to_mask([0, 9, 70_000], 100_000))) == [0, 9, 70_000]
+    assert list(iter_bits(0)) == []
+
+
+def test_tag_expressions() -> None:
+    idx = make_index()
+    assert names(idx, idx.tag_expr("web,db")) == ["web-1.dc1", "web-2.dc2", "db-1.dc1"]
+    assert names(idx, idx.tag_expr("web & !canary")) == ["web-1.dc1"]
+    assert names(idx, idx.tag_expr("prod and (web or cache)")) == ["web-1.dc1"]
+    assert names(idx, idx.tag_expr("not dc*")) == []
+    assert names(idx, idx.tag_expr("nosuchtag")) == []
+    for bad in ("web &", "(web", "web)", "| db"):
+        with pytest.raises(ValueError):
+            idx.tag_expr(bad)
+
+
+def test_host_patterns() -> None:
+    idx = make_index()
+    assert names(idx, idx.pattern("web-*")) == ["web-1.dc1", "web-2.dc2"]
+    assert names(idx, idx.pattern("*.dc2")) == ["web-2.dc2", "cache-1.dc2"]
+    assert names(idx, idx.pattern("*-1.*")) == ["web-1.dc1", "db-1.dc1", "cache-1.dc2"]
+    assert names(idx, idx.pattern("db-1.dc1")) == ["db-1.dc1"]
+    assert names(idx, idx.pattern("db-1")) == []
+    assert names(idx, idx.pattern("~^web-\\d\\.dc1$")) == ["web-1.dc1"]
+    assert names(idx, idx.pattern("~(?i)^CACHE")) == ["cache-1.dc2"]
+    assert names(idx, idx.pattern("~dc2$")) == ["web-2.dc2", "cache-1.dc2"]
+
+
+def test_select_keeps_inventory_order() -> None:
+    idx = make_index()
+    assert [h.host for h in idx.select(tags="dc1,dc2", exclude_tags="prod")] == ["web-2.dc2", "cache-1.dc2"]
+    assert [h.host for h in idx.select(patterns=["cache-*", "web-1*"])] == ["web-1.dc1", "cache-1.dc2"]
+    assert len(idx.select()) == 4
+
+
+def test_large_fleet_selection() -> None:
+    hosts = [HostEntry(host=f"node{i:06d}", tags=["rack%d" % (i % 500)]) for i in range(100_000)]
+    idx = HostIndex(hosts)
+    picked = idx.select(tags="rack7", patterns=["node00*"])
+    assert len(picked) == 20 and all(h.tags == ["rack7"] for h in picked)
+    assert [h.host for h in idx.select(patterns=["node01234?"])] == [f"node01234{i}" for i in range(10)]
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any
+
+import pytest
+
+from benchmarks.fleet_bench import compare, percentile
+from benchmarks.simfleet import FleetConfig, fault_schedule, parse_faults, start_fleet
+from scatter.ssh import ExecOptions, execute_on_hosts, phase_observer, run_on_host
+
+
+def run_against_fault(kind: str, fault_attempts: int = 0, **overrides: Any):
+    """Run ``true`` on a one-host fleet with ``kind`` injected; return (result, seconds, connections)."""
+
+    async def scenario():
+        fleet = await start_fleet(
+            FleetConfig(hosts=1, ports=True, faults={kind: 1.0}, fault_attempts=fault_attempts, stall=30.0)
+        )
+        host, port = fleet.targets[0]
+        base = dict(
+            username="bench",
+            port=port,
+            identity=None,
+            password="bench",
+            known_hosts="off",
+            connect_timeout=1.0,
+            pty=False,
+            limit=1,
+        )
+        base.update(overrides)
+        started = time.perf_counter()
+        try:
+            result = await run_on_host(host, "true", ExecOptions(**base), asyncio.Semaphore(1))
+            return result, time.perf_counter() - started, fleet.attempts[0]
+        finally:
+            await fleet.wait_closed()
+
+    return asyncio.run(scenario())
+
+
+def test_execute_on_hosts_against_simulated_fleet() -> None:
+    # One port per host on 127.0.0.1 works on every platform; each port gets its own run
+    async def scenario():
+        fleet = await start_fleet(FleetConfig(hosts=3, output_bytes=100, ports=True))
+        try:
+            results = []
+            for host, port in fleet.targets:
+                options = ExecOptions(
+                    username="bench",
+                    port=port,
+                    identity=None,
+                    password="bench",
+                    known_hosts="off",
+                    connect_timeout=5.0,
+                    pty=False,
+                    limit=3,
+                )
+                results.extend(await execute_on_hosts([host], "true", options))
+            return results
+        finally:
+            await fleet.wait_closed()
+
+    results = asyncio.run(scenario())
+    assert len(results) == 3
+    assert all(r.ok and r.exit_status == 0 for r in results), [r.error for r in results]
+    assert all(len(r.stdout) == 100 for r in results)
+
+
+def test_percentile_and_baseline_compare() -> None:
+    assert percentile([5.0, 1.0, 3.0, 2.0, 4.0], 50) == 3.0
+    assert percentile(list(range(1, 101)), 99) == 99
+    assert percentile([], 95) == 0.0
+
+    baseline = {"scenarios": [{"limit": 10, "hosts_per_sec": 100.0, "p95_ms": 50.0, "peak_rss_mib": None}]}
+    ok = {"scenarios": [{"limit": 10, "hosts_per_sec": 90.0, "p95_ms": 55.0, "peak_rss_mib": 40.0}]}
+    assert compare(ok, baseline, 0.2) == []
+    slow = {"scenarios": [{"limit": 10, "hosts_per_sec": 70.0, "p95_ms": 80.0}, {"limit": 99, "p95_ms": 1.0}]}
+    problems = compare(slow, baseline, 0.2)
+    assert len(problems) == 2 and all(p.startswith("limit=10 ") for p in problems)
+
+
+def test_fault_schedule_is_seeded() -> None:
+    faults = parse_faults(["reset=0.1", "stall=0.05"])
+    schedule = fault_schedule(100, faults, seed=7)
+    assert schedule == fault_schedule(100, faults, seed=7)
+    assert schedule != fault_schedule(100, faults, seed=8)
+    assert schedule.count("reset") == 10 and schedule.count("stall") == 5 and schedule.count(None) == 85
+    with pytest.raises(ValueError):
+        parse_faults(["meltdown=0.5"])
+
+
+def test_transient_reset_recovers_with_retry() -> None:
+    result, _, connections = run_against_fault("reset", fault_attempts=1)
+    assert not result.ok and "Reset" in (result.error or "")
+
+    result, _, connections = run_against_fault("reset", fault_attempts=1, retry_attempts=2)
+    assert result.ok and connections == 2
+    assert result.usage is not None and result.usage.attempts == 2
+
+
+def test_blackhole_and_stall_are_bounded_by_timeouts() -> None:
+    result, elapsed, _ = run_against_fault("blackhole")
+    assert not result.ok and "Timeout" in (result.error or "")
+    assert 0.9 < elapsed < 5
+
+    result, elapsed, _ = run_against_fault("stall", command_timeout=0.3)
+    assert not result.ok and elapsed < 5
+
+
+@pytest.mark.parametrize("observed", [False, True])
+def test_results_carry_traffic_and_cpu_usage(observed: bool) -> None:
+    async def scenario():
+        fleet = await start_fleet(FleetConfig(hosts=1, output_bytes=50_000, ports=True))
+        host, port = fleet.targets[0]
+        options = ExecOptions(
+            username="bench", port=port, identity=None, password="bench",
+            known_hosts="off", connect_timeout=5.0, pty=False, limit=1,
+        )
+        token = phase_observer.set(lambda *span: None) if observed else None
+        try:
+            return await run_on_host(host, "true", options, asyncio.Semaphore(1))
+        finally:
+            if token is not None:
+                phase_observer.reset(token)
+            await fleet.wait_closed()
+
+    result = asyncio.run(scenario())
+    assert result.ok, result.error
+    usage = result.usage
+    assert usage is not None
+    assert usage.attempts == 1 and usage.stdout_bytes == 50_000 and usage.stderr_bytes == 0
+    # Output plus handshake and per-packet overhead; the client sends version, kex, auth and the command
+    assert 50_000 < usage.bytes_received < 60_000
+    assert 1_000 < usage.bytes_sent < 10_000
+    assert usage.cpu_time > 0
@@ -224,3 +224,18 @@ def test_concurrency_limit_enforced(monkeypatch: pytest.MonkeyPatch) -> None:
     assert state["max_active"] <= 2
 
 
+def test_metering_is_skipped_without_private_transport(monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture) -> None:
+    from scatter import ssh
+    from scatter.models import HostUsage
+
+    class BareConn:
+        def data_received(self, data: bytes, datatype: Any = None) -> None:
+            pass
+
+    monkeypatch.setattr(ssh, "_metering_warned", False)
+    usage = HostUsage()
+    with caplog.at_level("WARNING", logger="scatter.ssh"):
+        ssh._MeteringClient(usage).connection_made(BareConn())  # type: ignore[arg-type]
+        ssh._MeteringClient(usage).connection_made(BareConn())  # type: ignore[arg-type]
+    assert len(caplog.records) == 1 and "not metered" in caplog.records[0].getMessage()
+    assert usage.bytes_sent == usage.bytes_received == 0
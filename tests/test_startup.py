@@ -0,0 +1,53 @@
+"""Startup-cost guards: the CLI must not import the SSH stack until it executes hosts."""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict
+
+# Cumulative import time allowed for ``scatter.cli`` (generous, to stay robust on slow CI machines;
+# importing the SSH stack as well took ~370ms on the same machine)
+IMPORT_BUDGET_MS = float(os.environ.get("SCATTER_IMPORT_BUDGET_MS", "250"))
+HEAVY_MODULES = ("asyncssh", "tenacity", "cryptography", "asyncio", "scatter.ssh")
+
+
+def import_times(code: str) -> Dict[str, int]:
+    """Run ``code`` under ``-X importtime`` and return cumulative microseconds per module."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True, check=True)
+    times: Dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        try:
+            times[name.strip()] = int(cumulative)
+        except ValueError:
+            continue  # header row
+    return times
+
+
+def test_cli_import_skips_ssh_stack_and_fits_budget() -> None:
+    times = import_times("import scatter.cli")
+    for module in HEAVY_MODULES:
+        assert module not in times, f"{module} is imported at CLI startup"
+    # Best of three, so one slow run on a busy machine does not fail the suite
+    best = min(import_times("import scatter.cli")["scatter.cli"] for _ in range(3)) / 1000
+    assert best < IMPORT_BUDGET_MS, f"scatter.cli import took {best:.1f}ms (budget {IMPORT_BUDGET_MS}ms)"
+
+
+def test_dry_run_does_not_import_ssh_stack(tmp_path: Path) -> None:
+    inv = tmp_path / "inv.yaml"
+    inv.write_text("hosts:\n  - host: h1\n    command: uptime\n", encoding="utf-8")
+    code = (
+        "import sys\n"
+        "from scatter.cli import app\n"
+        f"try:\n    app(['run', '--dry-run', '--no-inventory-cache', '--inventory', {str(inv)!r}])\n"
+        "except SystemExit:\n    pass\n"
+        f"print('heavy=' + ','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))\n"
+    )
+    proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert "h1" in proc.stdout
+    assert proc.stdout.strip().splitlines()[-1] == "heavy="
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from pathlib import Path
+
+from benchmarks.simfleet import FleetConfig, start_fleet
+from scatter.ssh import ExecOptions, execute_on_hosts, phase_observer
+from scatter.tracing import TraceRecorder
+
+
+def test_phases_recorded_against_simulated_fleet(tmp_path: Path) -> None:
+    recorder = TraceRecorder()
+
+    async def scenario():
+        fleet = await start_fleet(FleetConfig(hosts=4, output_bytes=100))
+        try:
+            port = fleet.targets[0][1]
+            options = ExecOptions(
+                username="bench",
+                port=port,
+                identity=None,
+                password="bench",
+                known_hosts="off",
+                connect_timeout=5.0,
+                pty=False,
+                limit=2,
+            )
+            token = phase_observer.set(recorder)
+            try:
+                return await execute_on_hosts([host for host, _ in fleet.targets], "true", options)
+            finally:
+                phase_observer.reset(token)
+        finally:
+            await fleet.wait_closed()
+
+    results = asyncio.run(scenario())
+    assert all(r.ok for r in results), [r.error for r in results]
+    phases = {phase for _, phase, _, _ in recorder.spans}
+    assert phases == {"queue", "slot", "dns", "connect", "handshake", "auth", "exec", "drain", "close"}
+    assert all(end >= start for _, _, start, end in recorder.spans)
+
+    out = tmp_path / "trace.json"
+    recorder.write(out, results)
+    events = json.loads(out.read_text(encoding="utf-8"))["traceEvents"]
+    host_spans = [e for e in events if e.get("cat") == "host"]
+    assert len(host_spans) == 4 and all(e["args"]["ok"] for e in host_spans)
+    # --limit 2 means at most two slot tracks
+    assert {e["tid"] for e in host_spans} <= {1, 2}
+
+
+def test_slot_assignment_reuses_lowest_free_slot() -> None:
+    recorder = TraceRecorder()
+    for host, start, end in [("a", 0.0, 2.0), ("b", 0.0, 1.0), ("c", 1.0, 3.0), ("d", 2.5, 4.0)]:
+        recorder(host, "slot", start, end)
+        recorder(host, "exec", start, end)
+    events = recorder.events()
+    tid = {e["name"]: e["tid"] for e in events if e.get("cat") == "host"}
+    assert tid == {"b": 1, "a": 2, "c": 1, "d": 2}
+    assert all(e["tid"] == tid[e["args"]["host"]] for e in events if e.get("cat") == "phase")
+    assert TraceRecorder().events() == []
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from scatter.cli import app
+from scatter.profiling import LoopWatchdog
+from scatter.ssh import ExecResult
+
+
+def _block_the_loop(seconds: float) -> None:
+    time.sleep(seconds)
+
+
+def test_watchdog_records_stall_and_its_stack() -> None:
+    async def main() -> LoopWatchdog:
+        watchdog = LoopWatchdog(threshold=0.05, interval=0.005)
+        watchdog.start()
+        await asyncio.sleep(0.03)
+        _block_the_loop(0.2)
+        await asyncio.sleep(0.03)
+        watchdog.stop()
+        return watchdog
+
+    watchdog = asyncio.run(main())
+    assert len(watchdog.stalls) == 1
+    stall = watchdog.stalls[0]
+    assert 0.15 < stall.duration < 0.5
+    assert "_block_the_loop" in stall.where
+    report = watchdog.report()
+    assert report["stalls"] == 1 and report["offenders"][0]["count"] == 1
+    assert watchdog.stalled_during(stall.start - 1, stall.start + 0.1) == pytest.approx(0.1)
+    assert watchdog.stalled_during(stall.start + stall.duration, stall.start + 5) == 0.0
+
+
+def test_watchdog_reports_in_summary_and_log(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    inv = tmp_path / "inventory.yaml"
+    inv.write_text("defaults:\n  known_hosts: off\nhosts:\n  - host: a\n  - host: b\n", encoding="utf-8")
+
+    async def fake(host: str, cmd: str, options, semaphore) -> ExecResult:  # type: ignore[override]
+        async with semaphore:
+            started = time.perf_counter()
+            await asyncio.sleep(0.02)
+            if host == "b":
+                _block_the_loop(0.15)
+            return ExecResult(host, 0, "ok\n", "", True, started, time.perf_counter())
+
+    monkeypatch.setattr("scatter.ssh.run_on_host", fake)
+    log = tmp_path / "run.jsonl"
+    res = CliRunner().invoke(
+        app,
+        ["run", "true", "--inventory", str(inv), "--no-progress", "--no-inventory-cache", "--limit", "1",
+         "--watchdog", "50", "--log-file", str(log)],
+    )
+    assert res.exit_code == 0, res.stdout
+    assert "Event loop stalls over 50ms: 1" in res.stdout and "_block_the_loop" in res.stdout
+    records = [json.loads(line) for line in log.read_text(encoding="utf-8").splitlines()]
+    by_host = {r["host"]: r for r in records if "host" in r}
+    assert by_host["a"]["loop_stall_ms"] == 0.0 and by_host["b"]["loop_stall_ms"] >= 100
+    assert records[-1]["watchdog"]["stalls"] == 1